@@ -0,0 +1,85 @@
+"""Benchmark of HTTP/1.1 against HTTP/2 with HTTPXRequester.
+
+Requests are made against a local mock API at a high concurrency, without any
+ratelimiting, to measure how much the transport (and its connection pool)
+limits throughput and latency.
+"""
+import argparse
+import time
+from typing import Any, Dict, List
+
+import anyio
+from mock_discord import MockDiscord, run_with_server
+from utils import NoOpRatelimiter, percentile
+from wumpy.rest import HTTPXRequester, Route
+
+
+async def bench(
+    server: MockDiscord,
+    *,
+    requests: int,
+    concurrency: int,
+    options: Dict[str, Any]
+) -> List[float]:
+    latencies: List[float] = []
+    route = Route('GET', '/channels/{channel_id}', channel_id=41771983423143937)
+
+    async with HTTPXRequester(
+        base_url=server.base_url, ratelimiter=NoOpRatelimiter(), **options
+    ) as api:
+        remaining = requests
+
+        async def worker() -> None:
+            nonlocal remaining
+
+            while remaining > 0:
+                remaining -= 1
+
+                start = time.perf_counter()
+                await api.request(route)
+                latencies.append(time.perf_counter() - start)
+
+        async with anyio.create_task_group() as tasks:
+            for _ in range(concurrency):
+                tasks.start_soon(worker)
+
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-n', '--requests', type=int, default=5000)
+    parser.add_argument('-c', '--concurrency', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.02)
+    parser.add_argument('--backend', choices=('asyncio', 'trio'), default='asyncio')
+    args = parser.parse_args()
+
+    print(
+        f'{args.requests} requests, concurrency {args.concurrency},'
+        f' {args.latency * 1000:.0f}ms server latency ({args.backend})'
+    )
+
+    for name, options in (
+        ('HTTP/1.1 (default pool)', {}),
+        ('HTTP/1.1 (pool of 500)', {'max_connections': 500, 'max_keepalive_connections': 500}),
+        ('HTTP/2', {'http2': True}),
+    ):
+        start = time.perf_counter()
+        latencies = run_with_server(
+            lambda server: bench(
+                server, requests=args.requests,
+                concurrency=args.concurrency, options=options
+            ),
+            latency=args.latency, backend=args.backend
+        )
+        elapsed = time.perf_counter() - start
+
+        print(
+            f'  {name:<24} {len(latencies) / elapsed:8.1f} req/s'
+            f'  p50 {percentile(latencies, 50) * 1000:7.1f}ms'
+            f'  p99 {percentile(latencies, 99) * 1000:7.1f}ms'
+        )
+
+
+if __name__ == '__main__':
+    main()
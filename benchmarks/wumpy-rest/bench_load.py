@@ -0,0 +1,189 @@
+"""Load benchmark of APIClient against a ratelimited mock Discord API.
+
+Each scenario makes a fixed set of requests at a controlled concurrency
+against a mock server simulating Discord's ratelimits, and reports:
+
+- Throughput: successful requests per second.
+- 429 rate: the share of requests the server responded to with a 429.
+- Wasted time: how much longer the run took than the lower bound set by the
+  server's ratelimits, time where the client was sleeping but didn't have to.
+- p50/p99: the latency of requests, including time spent waiting.
+"""
+import argparse
+import math
+import time
+from collections import Counter
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import anyio
+from mock_discord import MockBucket, MockDiscord, run_with_server
+from utils import percentile
+from wumpy.rest import APIClient, DictRatelimiter, HTTPException, Route
+
+
+class Scenario(NamedTuple):
+    description: str
+    routes: List[Route]
+    server: Dict[str, Any]
+    global_rate: int = 50
+
+
+def messages(channel_id: int) -> Route:
+    return Route('GET', '/channels/{channel_id}/messages', channel_id=channel_id)
+
+
+def message(channel_id: int, message_id: int) -> Route:
+    return Route(
+        'GET', '/channels/{channel_id}/messages/{message_id}',
+        channel_id=channel_id, message_id=message_id
+    )
+
+
+SHARED = MockBucket('shared', 5, 0.2)
+
+
+def scenarios(requests: int) -> Dict[str, Scenario]:
+    return {
+        'bucket': Scenario(
+            'One bucket with a limit of 5 per 200ms',
+            [messages(1) for _ in range(requests // 4)],
+            {'default_limit': (5, 0.2)},
+        ),
+        'major-params': Scenario(
+            'The same bucket across 20 channels, global limit of 200/s',
+            [messages(i % 20) for i in range(requests)],
+            {'default_limit': (5, 0.2), 'global_limit': 200},
+            global_rate=200,
+        ),
+        'shared-bucket': Scenario(
+            'Two routes sharing one bucket with a limit of 5 per 200ms',
+            [messages(1) if i % 2 else message(1, i) for i in range(requests // 4)],
+            {'buckets': {
+                'GET /channels/{channel_id}/messages': SHARED,
+                'GET /channels/{channel_id}/messages/{message_id}': SHARED,
+            }},
+        ),
+        'global': Scenario(
+            'Client configured for 50/s against a global limit of 40/s',
+            [messages(i) for i in range(requests // 4)],
+            {'default_limit': (5, 0.2), 'global_limit': 40},
+        ),
+        'errors': Scenario(
+            'One bucket with a limit of 50 per 200ms and 2% server errors',
+            [messages(1) for _ in range(requests // 4)],
+            {'default_limit': (50, 0.2), 'error_rate': 0.02},
+        ),
+    }
+
+
+def lower_bound(server: MockDiscord, routes: List[Route]) -> float:
+    """Calculate the least amount of time the requests could take."""
+    windows: Dict[str, Tuple[int, float]] = {}
+    counts: Counter = Counter()
+
+    for route in routes:
+        bucket, key = server.get_bucket(route.method, route.url)
+        if bucket is not None:
+            windows[key] = (bucket.limit, bucket.window)
+            counts[key] += 1
+
+    bound = 0.0
+    for key, count in counts.items():
+        limit, window = windows[key]
+        bound = max(bound, (math.ceil(count / limit) - 1) * window)
+
+    if server.global_limit is not None:
+        bound = max(bound, math.ceil(len(routes) / server.global_limit) - 1)
+
+    return bound + server.latency
+
+
+class Result(NamedTuple):
+    elapsed: float
+    latencies: List[float]
+    failures: int
+    requests: int
+    ratelimited: int
+    bound: float
+
+
+async def bench(server: MockDiscord, scenario: Scenario, concurrency: int) -> Result:
+    latencies: List[float] = []
+    failures = 0
+
+    pending = list(reversed(scenario.routes))
+
+    async with APIClient(
+        base_url=server.base_url,
+        ratelimiter=DictRatelimiter(global_rate=scenario.global_rate)
+    ) as api:
+        async def worker() -> None:
+            nonlocal failures
+
+            while pending:
+                route = pending.pop()
+
+                start = time.perf_counter()
+                try:
+                    await api.request(route)
+                except HTTPException:
+                    failures += 1
+                else:
+                    latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        async with anyio.create_task_group() as tasks:
+            for _ in range(concurrency):
+                tasks.start_soon(worker)
+        elapsed = time.perf_counter() - start
+
+    return Result(
+        elapsed, latencies, failures, server.requests,
+        server.ratelimited + server.global_ratelimited,
+        lower_bound(server, scenario.routes)
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('-n', '--requests', type=int, default=400)
+    parser.add_argument('-c', '--concurrency', type=int, default=50)
+    parser.add_argument('--latency', type=float, default=0.005)
+    parser.add_argument('--backend', choices=('asyncio', 'trio'), default='asyncio')
+    parser.add_argument('scenarios', nargs='*', help='The scenarios to run (default all)')
+    args = parser.parse_args()
+
+    available = scenarios(args.requests)
+    selected: Optional[List[str]] = args.scenarios or list(available)
+
+    print(
+        f'concurrency {args.concurrency}, {args.latency * 1000:.0f}ms server latency'
+        f' ({args.backend})'
+    )
+
+    for name in selected or ():
+        scenario = available[name]
+
+        result = run_with_server(
+            lambda server: bench(server, scenario, args.concurrency),
+            backend=args.backend, latency=args.latency, **scenario.server
+        )
+
+        print(f'{name}: {scenario.description}')
+        print(
+            f'  {len(result.latencies)} ok, {result.failures} failed'
+            f' in {result.elapsed:.2f}s (lower bound {result.bound:.2f}s)'
+        )
+        print(
+            f'  {len(result.latencies) / result.elapsed:8.1f} req/s'
+            f'  429 rate {result.ratelimited / max(result.requests, 1):6.1%}'
+            f'  wasted {max(0, result.elapsed - result.bound):6.2f}s'
+            f'  p50 {percentile(result.latencies, 50) * 1000:7.1f}ms'
+            f'  p99 {percentile(result.latencies, 99) * 1000:7.1f}ms'
+        )
+
+
+if __name__ == '__main__':
+    main()
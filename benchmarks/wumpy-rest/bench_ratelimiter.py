@@ -0,0 +1,65 @@
+"""Microbenchmark of the per-request overhead of the ratelimiter.
+
+This measures the time it takes to go through the ratelimiter when there are
+plenty of tokens available, which is the common path for most requests. The
+ratelimiter is compared against a no-op ratelimiter to show the overhead.
+"""
+import argparse
+import time
+from typing import Any
+
+import anyio
+from utils import NoOpRatelimiter
+from wumpy.rest import DictRatelimiter, RatelimiterContext, Route
+
+HEADERS = {
+    'X-RateLimit-Bucket': 'abc123',
+    'X-RateLimit-Limit': '1000000000',
+    'X-RateLimit-Remaining': '1000000000',
+    'X-RateLimit-Reset': str(time.time() + 3600),
+}
+
+
+async def bench(ratelimiter: Any, iterations: int, *, update: bool) -> float:
+    route = Route('GET', '/channels/{channel_id}', channel_id=41771983423143937)
+
+    async with ratelimiter:
+        # Make the ratelimiter learn about the bucket first
+        async with ratelimiter(route, RatelimiterContext()) as rl:
+            await rl(HEADERS)
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            async with ratelimiter(route, RatelimiterContext()) as rl:
+                if update:
+                    await rl(HEADERS)
+        end = time.perf_counter()
+
+    return (end - start) / iterations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-n', '--iterations', type=int, default=100_000)
+    parser.add_argument('--backend', choices=('asyncio', 'trio'), default='asyncio')
+    args = parser.parse_args()
+
+    for update in (False, True):
+        title = 'acquire + update' if update else 'acquire'
+        print(f'{title} ({args.backend}, {args.iterations} iterations)')
+
+        # The global ratelimit is based on real time, so we increase it to not
+        # measure any sleeping.
+        for name, factory in (
+            ('no-op', NoOpRatelimiter),
+            ('DictRatelimiter', lambda: DictRatelimiter(global_rate=10 ** 9)),
+        ):
+            per = anyio.run(
+                lambda: bench(factory(), args.iterations, update=update),
+                backend=args.backend
+            )
+            print(f'  {name:<16} {per * 1_000_000:8.2f} µs/request')
+
+
+if __name__ == '__main__':
+    main()
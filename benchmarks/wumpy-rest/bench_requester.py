@@ -0,0 +1,71 @@
+"""Benchmark of the per-request overhead of the requester implementations.
+
+Requests are made against a local mock API that responds immediately, without
+any ratelimiting, so that the result is dominated by the time spent in the
+client. Everything runs in one process, so the result is requests/sec for a
+single core shared between the client and the mock server.
+"""
+import argparse
+import time
+from typing import Any, Callable
+
+import anyio
+from mock_discord import MockDiscord, run_with_server
+from utils import NoOpRatelimiter
+from wumpy.rest import H11Requester, HTTPXRequester, Requester, Route
+
+
+async def bench(
+    server: MockDiscord,
+    factory: Callable[..., Requester],
+    *,
+    requests: int,
+    concurrency: int
+) -> float:
+    route = Route('GET', '/channels/{channel_id}', channel_id=41771983423143937)
+
+    async with factory(base_url=server.base_url, ratelimiter=NoOpRatelimiter()) as api:
+        # Warm up the connection pool so that connecting isn't measured
+        async with anyio.create_task_group() as tasks:
+            for _ in range(concurrency):
+                tasks.start_soon(api.request, route)
+
+        remaining = requests
+
+        async def worker() -> None:
+            nonlocal remaining
+
+            while remaining > 0:
+                remaining -= 1
+                await api.request(route)
+
+        start = time.perf_counter()
+        async with anyio.create_task_group() as tasks:
+            for _ in range(concurrency):
+                tasks.start_soon(worker)
+
+        return requests / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-n', '--requests', type=int, default=5000)
+    parser.add_argument('-c', '--concurrency', type=int, default=10)
+    parser.add_argument('--backend', choices=('asyncio', 'trio'), default='asyncio')
+    args = parser.parse_args()
+
+    print(f'{args.requests} requests, concurrency {args.concurrency} ({args.backend})')
+
+    factories: Any = (('HTTPXRequester', HTTPXRequester), ('H11Requester', H11Requester))
+    for name, factory in factories:
+        rate = run_with_server(
+            lambda server: bench(
+                server, factory, requests=args.requests, concurrency=args.concurrency
+            ),
+            latency=0, backend=args.backend
+        )
+        print(f'  {name:<16} {rate:8.1f} req/s')
+
+
+if __name__ == '__main__':
+    main()
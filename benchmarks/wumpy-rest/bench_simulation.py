@@ -0,0 +1,147 @@
+"""Simulated benchmark of ratelimiters on a virtual clock.
+
+Unlike `bench_load.py`, no requests are sent over the network: each scenario
+is replayed against a modeled Discord with a virtual clock (see
+`simulator.py`). Results are deterministic for a given seed, which means
+that they can be compared between changes to the ratelimiter exactly, and
+thousands of requests spanning minutes of ratelimits run in milliseconds.
+
+For each scenario this reports:
+
+- Throughput: successful requests per virtual second.
+- 429 rate: the share of requests the server responded to with a 429.
+- Wasted tokens: tokens of ratelimit windows which expired unused while
+  requests for them were waiting.
+- p50/p99: the virtual latency of requests, including time spent waiting.
+"""
+import argparse
+import logging
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from mock_discord import MockBucket
+from simulator import TraceEntry, burst, load_trace, simulate
+from wumpy.rest import AdaptiveRatelimiter, DictRatelimiter, Ratelimiter, Route
+
+
+class Scenario(NamedTuple):
+    description: str
+    trace: List[TraceEntry]
+    server: Dict[str, Any]
+    global_rate: int = 50
+
+
+def messages(channel_id: int) -> Route:
+    return Route('GET', '/channels/{channel_id}/messages', channel_id=channel_id)
+
+
+def message(channel_id: int, message_id: int) -> Route:
+    return Route(
+        'GET', '/channels/{channel_id}/messages/{message_id}',
+        channel_id=channel_id, message_id=message_id
+    )
+
+
+SHARED = MockBucket('shared', 5, 1)
+
+
+def scenarios(requests: int) -> Dict[str, Scenario]:
+    return {
+        'bucket': Scenario(
+            'One bucket with a limit of 5 per second',
+            burst(messages(1), requests // 10),
+            {'default_limit': (5, 1)},
+        ),
+        'major-params': Scenario(
+            'The same bucket across 100 channels, global limit of 50/s',
+            [TraceEntry(0.0, messages(i % 100)) for i in range(requests)],
+            {'default_limit': (5, 1), 'global_limit': 50},
+        ),
+        'shared-bucket': Scenario(
+            'Two routes sharing one bucket with a limit of 5 per second',
+            [
+                TraceEntry(0.0, messages(1) if i % 2 else message(1, i))
+                for i in range(requests // 10)
+            ],
+            {'buckets': {
+                'GET /channels/{channel_id}/messages': SHARED,
+                'GET /channels/{channel_id}/messages/{message_id}': SHARED,
+            }},
+        ),
+        'steady': Scenario(
+            'Requests arriving at 40/s spread over 20 channels',
+            [TraceEntry(i / 40, messages(i % 20)) for i in range(requests)],
+            {'default_limit': (5, 5), 'global_limit': 50},
+        ),
+        'global': Scenario(
+            'Client configured for 50/s against a global limit of 40/s',
+            [TraceEntry(0.0, messages(i)) for i in range(requests)],
+            {'default_limit': (5, 1), 'global_limit': 40},
+        ),
+        'errors': Scenario(
+            'One bucket with a limit of 50 per second and 2% server errors',
+            burst(messages(1), requests),
+            {'default_limit': (50, 1), 'error_rate': 0.02},
+        ),
+    }
+
+
+RATELIMITERS: Dict[str, Callable[[int], Ratelimiter]] = {
+    'dict': lambda rate: DictRatelimiter(rate),
+    'adaptive': lambda rate: AdaptiveRatelimiter(DictRatelimiter(rate)),
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('-n', '--requests', type=int, default=2000)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument(
+        '--ratelimiter', choices=list(RATELIMITERS), action='append',
+        help='The ratelimiters to simulate (default all)'
+    )
+    parser.add_argument(
+        '--trace', help='Replay a trace file instead, see load_trace() of the simulator'
+    )
+    parser.add_argument('--log', help='Write warnings logged by the ratelimiters to a file')
+    parser.add_argument('scenarios', nargs='*', help='The scenarios to run (default all)')
+    args = parser.parse_args()
+
+    # The ratelimiters log a warning for each server error they back off
+    # from, which would otherwise be printed inbetween the results.
+    if args.log:
+        logging.basicConfig(filename=args.log, level=logging.WARNING)
+    else:
+        logging.getLogger('wumpy.rest').setLevel(logging.ERROR)
+
+    available = scenarios(args.requests)
+    if args.trace:
+        available = {'trace': Scenario(
+            f'Replay of {args.trace}', load_trace(args.trace), {'default_limit': (5, 1)}
+        )}
+
+    selected: Optional[List[str]] = args.scenarios or list(available)
+    ratelimiters: List[str] = args.ratelimiter or list(RATELIMITERS)
+
+    print(f'{args.latency * 1000:.0f}ms server latency, seed {args.seed}')
+
+    for name in selected or ():
+        scenario = available[name]
+        print(f'{name}: {scenario.description}')
+
+        for ratelimiter in ratelimiters:
+            factory = RATELIMITERS[ratelimiter]
+
+            result = simulate(
+                lambda: factory(scenario.global_rate), scenario.trace,
+                seed=args.seed, latency=args.latency, **scenario.server
+            )
+
+            summary = result.summary().replace('\n', '\n' + ' ' * 2)
+            print(f'  {ratelimiter:<10} {summary}')
+
+
+if __name__ == '__main__':
+    main()
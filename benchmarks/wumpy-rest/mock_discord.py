@@ -0,0 +1,438 @@
+"""Local mock of the Discord REST API, speaking both HTTP/1.1 and HTTP/2.
+
+HTTP/2 is only supported with prior knowledge (which is what HTTPX uses for
+plain `http://` URLs), the protocol is detected by the connection preface.
+
+The server can optionally simulate Discord's ratelimits: per-bucket limits
+with `X-RateLimit-*` headers (including buckets shared between routes and
+separate windows per major parameter), a global limit responding with global
+429s, as well as random 5xx server errors.
+
+The server is started as an asynchronous context manager:
+
+```python
+async with MockDiscord() as server:
+    async with APIClient(base_url=server.base_url) as api:
+        ...
+```
+"""
+import hashlib
+import json
+import random
+import time
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+from urllib.parse import urlsplit
+
+import anyio
+import anyio.abc
+import h2.config
+import h2.connection
+import h2.events
+import h11
+from wumpy.rest._proxy import API_PREFIX, _parse_route
+
+__all__ = (
+    'MockResponse',
+    'MockBucket',
+    'MockDiscord',
+    'run_with_server',
+)
+
+
+H2_PREFACE = b'PRI * HTTP/2.0\r\n\r\nSM\r\n\r\n'
+
+MockResponse = Tuple[int, Dict[str, str], bytes]
+
+
+class MockBucket:
+    """Ratelimit bucket of the mock server.
+
+    Routes configured with the same bucket share its ratelimit, although each
+    major parameter still gets its own window.
+
+    Attributes:
+        name: The hash of the bucket, sent in `X-RateLimit-Bucket`.
+        limit: The amount of requests allowed per window.
+        window: The length of a window in seconds.
+    """
+
+    name: str
+    limit: int
+    window: float
+
+    __slots__ = ('name', 'limit', 'window')
+
+    def __init__(self, name: str, limit: int, window: float) -> None:
+        self.name = name
+        self.limit = limit
+        self.window = window
+
+
+class _Window:
+    __slots__ = ('remaining', 'reset_at')
+
+    def __init__(self, remaining: int, reset_at: float) -> None:
+        self.remaining = remaining
+        self.reset_at = reset_at
+
+
+class MockDiscord:
+    """Mock Discord API server listening on localhost.
+
+    Attributes:
+        latency:
+            The amount of seconds the server takes to respond, simulating the
+            time it takes for Discord to process the request.
+        buckets:
+            Mapping of endpoints (such as `GET /channels/{channel_id}`) to the
+            bucket they are ratelimited by. IDs in the path are named after the
+            segment before them, see `_parse_route()` of the proxy.
+        default_limit:
+            Tuple of the limit and window for endpoints not in `buckets`, each
+            endpoint getting its own bucket. None disables ratelimiting them.
+        global_limit: The amount of requests allowed per second, or None.
+        error_rate: The probability of responding with a 5xx error.
+        requests: The amount of requests handled.
+        ratelimited: The amount of 429 responses because of a bucket.
+        global_ratelimited: The amount of 429 responses because of the global limit.
+        errors: The amount of simulated 5xx responses.
+    """
+
+    latency: float
+    buckets: Mapping[str, MockBucket]
+    default_limit: Optional[Tuple[int, float]]
+    global_limit: Optional[int]
+    error_rate: float
+
+    requests: int
+    ratelimited: int
+    global_ratelimited: int
+    errors: int
+
+    def __init__(
+        self,
+        *,
+        latency: float = 0.02,
+        buckets: Mapping[str, MockBucket] = {},
+        default_limit: Optional[Tuple[int, float]] = None,
+        global_limit: Optional[int] = None,
+        error_rate: float = 0.0,
+        seed: int = 0
+    ) -> None:
+        self.latency = latency
+        self.buckets = buckets
+        self.default_limit = default_limit
+        self.global_limit = global_limit
+        self.error_rate = error_rate
+
+        self.requests = 0
+        self.ratelimited = 0
+        self.global_ratelimited = 0
+        self.errors = 0
+
+        self._random = random.Random(seed)
+        self._windows: Dict[str, _Window] = {}
+        self._global = _Window(global_limit or 0, 0.0)
+
+        self._listener: Optional[anyio.abc.SocketListener] = None
+        self._tasks: Optional[anyio.abc.TaskGroup] = None
+
+    async def __aenter__(self) -> 'MockDiscord':
+        self._listener = await anyio.create_tcp_listener(local_host='127.0.0.1')
+
+        self._tasks = await anyio.create_task_group().__aenter__()
+        self._tasks.start_soon(self._listener.serve, self._serve)
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        assert self._tasks is not None and self._listener is not None
+
+        self._tasks.cancel_scope.cancel()
+        await self._tasks.__aexit__(*args)
+        await self._listener.aclose()
+
+    @property
+    def port(self) -> int:
+        assert self._listener is not None
+        return self._listener.extra(anyio.abc.SocketAttribute.local_port)
+
+    @property
+    def base_url(self) -> str:
+        return f'http://127.0.0.1:{self.port}/api/v10'
+
+    async def handle(
+        self,
+        method: str,
+        path: str,
+        headers: Dict[str, str],
+        body: bytes
+    ) -> MockResponse:
+        """Handle a request and return the response.
+
+        Override this method to customize the responses of the server.
+        """
+        # Discord applies the ratelimits as the request arrives
+        ratelimited, res_headers = self.ratelimit(method, path)
+
+        await anyio.sleep(self.latency)
+
+        if ratelimited is not None:
+            return ratelimited
+
+        if self.error_rate and self._random.random() < self.error_rate:
+            self.errors += 1
+            return self._random.choice((500, 502, 504)), {}, b''
+
+        return (
+            200, {'Content-Type': 'application/json', **res_headers},
+            json.dumps({'id': '0'}).encode()
+        )
+
+    def get_bucket(self, method: str, path: str) -> Tuple[Optional[MockBucket], str]:
+        """Get the bucket of a request, and the key of its window."""
+        route = _parse_route(method, API_PREFIX.sub('', urlsplit(path).path))
+
+        bucket = self.buckets.get(route.endpoint)
+        if bucket is None and self.default_limit is not None:
+            name = hashlib.sha1(route.endpoint.encode()).hexdigest()[:16]
+            bucket = MockBucket(name, *self.default_limit)
+
+        if bucket is None:
+            return None, ''
+
+        return bucket, bucket.name + route.major_params
+
+    def ratelimit(
+        self,
+        method: str,
+        path: str
+    ) -> Tuple[Optional[MockResponse], Dict[str, str]]:
+        """Apply the ratelimits to a request.
+
+        Returns:
+            A tuple of a 429 response (or None if the request is allowed) and
+            the ratelimit headers to add to the response.
+        """
+        now = time.time()
+
+        if self.global_limit is not None:
+            if now >= self._global.reset_at:
+                self._global = _Window(self.global_limit, now + 1)
+
+            if self._global.remaining <= 0:
+                self.global_ratelimited += 1
+
+                retry = self._global.reset_at - now
+                return self._too_many_requests(retry, {
+                    'X-RateLimit-Global': 'true', 'X-RateLimit-Scope': 'global',
+                }, globally=True), {}
+
+            self._global.remaining -= 1
+
+        bucket, key = self.get_bucket(method, path)
+        if bucket is None:
+            return None, {}
+
+        window = self._windows.get(key)
+        if window is None or now >= window.reset_at:
+            window = self._windows[key] = _Window(bucket.limit, now + bucket.window)
+
+        if window.remaining > 0:
+            window.remaining -= 1
+            ratelimited = False
+        else:
+            ratelimited = True
+
+        headers = {
+            'X-RateLimit-Bucket': bucket.name,
+            'X-RateLimit-Limit': str(bucket.limit),
+            'X-RateLimit-Remaining': str(window.remaining),
+            'X-RateLimit-Reset': f'{window.reset_at:.3f}',
+            'X-RateLimit-Reset-After': f'{window.reset_at - now:.3f}',
+        }
+
+        if ratelimited:
+            self.ratelimited += 1
+
+            headers['X-RateLimit-Scope'] = 'user'
+            return self._too_many_requests(window.reset_at - now, headers, globally=False), {}
+
+        return None, headers
+
+    @staticmethod
+    def _too_many_requests(
+        retry: float,
+        headers: Dict[str, str],
+        *,
+        globally: bool
+    ) -> MockResponse:
+        body = json.dumps({
+            'message': 'You are being rate limited.',
+            'retry_after': round(retry, 3),
+            'global': globally,
+        }).encode()
+
+        return 429, {
+            'Content-Type': 'application/json', 'Retry-After': str(max(1, round(retry))),
+            **headers
+        }, body
+
+    async def _respond(
+        self,
+        method: str,
+        path: str,
+        headers: Dict[str, str],
+        body: bytes
+    ) -> MockResponse:
+        self.requests += 1
+        return await self.handle(method, path, headers, body)
+
+    async def _serve(self, stream: anyio.abc.SocketStream) -> None:
+        async with stream:
+            try:
+                data = await stream.receive()
+            except (anyio.EndOfStream, anyio.BrokenResourceError):
+                return
+
+            if data[:len(H2_PREFACE)] == H2_PREFACE[:len(data)]:
+                await self._serve_h2(stream, data)
+            else:
+                await self._serve_h11(stream, data)
+
+    async def _serve_h11(self, stream: anyio.abc.SocketStream, data: bytes) -> None:
+        conn = h11.Connection(h11.SERVER)
+        conn.receive_data(data)
+
+        while True:
+            request: Optional[h11.Request] = None
+            body: List[bytes] = []
+
+            while True:
+                event = conn.next_event()
+
+                if event is h11.NEED_DATA:
+                    try:
+                        conn.receive_data(await stream.receive())
+                    except (anyio.EndOfStream, anyio.BrokenResourceError):
+                        return
+                elif isinstance(event, h11.Request):
+                    request = event
+                elif isinstance(event, h11.Data):
+                    body.append(event.data)
+                elif isinstance(event, h11.EndOfMessage):
+                    break
+                elif isinstance(event, h11.ConnectionClosed) or event is h11.PAUSED:
+                    return
+
+            assert request is not None
+            status, headers, content = await self._respond(
+                request.method.decode(), request.target.decode(),
+                {k.decode(): v.decode() for k, v in request.headers}, b''.join(body)
+            )
+
+            headers = {**headers, 'Content-Length': str(len(content))}
+            try:
+                await stream.send(conn.send(h11.Response(
+                    status_code=status, headers=list(headers.items())
+                )))
+                if request.method != b'HEAD':
+                    await stream.send(conn.send(h11.Data(data=content)))
+                await stream.send(conn.send(h11.EndOfMessage()))
+            except (anyio.EndOfStream, anyio.BrokenResourceError):
+                return
+
+            if conn.our_state is h11.MUST_CLOSE:
+                return
+
+            conn.start_next_cycle()
+
+    async def _serve_h2(self, stream: anyio.abc.SocketStream, data: bytes) -> None:
+        conn = h2.connection.H2Connection(h2.config.H2Configuration(client_side=False))
+        conn.initiate_connection()
+
+        lock = anyio.Lock()
+        pending: Dict[int, Tuple[Dict[str, str], List[bytes]]] = {}
+
+        async def flush() -> None:
+            async with lock:
+                outgoing = conn.data_to_send()
+                if outgoing:
+                    await stream.send(outgoing)
+
+        async def respond(stream_id: int, headers: Dict[str, str], body: bytes) -> None:
+            status, res_headers, content = await self._respond(
+                headers[':method'], headers[':path'], headers, body
+            )
+
+            conn.send_headers(stream_id, [
+                (':status', str(status)),
+                ('content-length', str(len(content))),
+                *((k.lower(), v) for k, v in res_headers.items()),
+            ])
+            if headers[':method'] == 'HEAD':
+                conn.end_stream(stream_id)
+            else:
+                conn.send_data(stream_id, content, end_stream=True)
+
+            try:
+                await flush()
+            except (anyio.EndOfStream, anyio.BrokenResourceError):
+                pass
+
+        async with anyio.create_task_group() as tasks:
+            while True:
+                for event in conn.receive_data(data) if data else ():
+                    handled = self._h2_event(conn, event, pending)
+                    if handled is not None:
+                        tasks.start_soon(respond, *handled)
+                    elif isinstance(event, h2.events.ConnectionTerminated):
+                        tasks.cancel_scope.cancel()
+                        return
+
+                try:
+                    await flush()
+                    data = await stream.receive()
+                except (anyio.EndOfStream, anyio.BrokenResourceError):
+                    tasks.cancel_scope.cancel()
+                    return
+
+    @staticmethod
+    def _h2_event(
+        conn: h2.connection.H2Connection,
+        event: h2.events.Event,
+        pending: Dict[int, Tuple[Dict[str, str], List[bytes]]]
+    ) -> Optional[Tuple[int, Dict[str, str], bytes]]:
+        if isinstance(event, h2.events.RequestReceived):
+            headers = {
+                (k.decode() if isinstance(k, bytes) else k):
+                (v.decode() if isinstance(v, bytes) else v)
+                for k, v in event.headers
+            }
+            pending[event.stream_id] = (headers, [])
+
+        elif isinstance(event, h2.events.DataReceived):
+            pending[event.stream_id][1].append(event.data)
+            conn.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+
+        elif isinstance(event, h2.events.StreamEnded):
+            headers, body = pending.pop(event.stream_id)
+            return event.stream_id, headers, b''.join(body)
+
+        return None
+
+
+def run_with_server(
+    func: Callable[[MockDiscord], Any],
+    *,
+    backend: str = 'asyncio',
+    **kwargs: Any
+) -> Any:
+    """Run an asynchronous function with a mock server running.
+
+    The keyword-arguments are passed to `MockDiscord`.
+    """
+    async def runner() -> Any:
+        async with MockDiscord(**kwargs) as server:
+            return await func(server)
+
+    return anyio.run(runner, backend=backend)
@@ -0,0 +1,289 @@
+"""Deterministic simulation of ratelimiters against a modeled Discord.
+
+Requests are replayed through a ratelimiter against `MockDiscord`, without
+any sockets, on Trio with a virtual clock. The clock jumps forward whenever
+all tasks are waiting, so a trace spanning minutes of ratelimits finishes in
+milliseconds, and the same trace and seed always give the same result.
+
+The ratelimiters read the time with `time.perf_counter()`, `time.time()` and
+`datetime.now()`. While simulating, these are redirected to the virtual
+clock in the modules of wumpy-rest and the mock server:
+
+```python
+result = simulate(DictRatelimiter, burst(messages(1), 1000), default_limit=(5, 1))
+print(result.throughput, result.wasted_tokens)
+```
+"""
+import contextlib
+import json
+import math
+import sys
+import time
+from datetime import datetime, tzinfo
+from functools import partial
+from types import ModuleType
+from typing import (
+    Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional,
+    Sequence, Tuple
+)
+
+import anyio
+import trio
+import trio.testing
+from mock_discord import MockDiscord
+from utils import percentile
+from wumpy.rest import (
+    HTTPException, RateLimited, Ratelimiter, RatelimiterContext, Route,
+    ServerException
+)
+from wumpy.rest._proxy import _parse_route
+
+__all__ = (
+    'TraceEntry',
+    'SimulationResult',
+    'burst',
+    'load_trace',
+    'simulate',
+)
+
+
+# The UNIX timestamp the virtual clock starts at, fixed so that the
+# ratelimit headers are the same between runs.
+EPOCH = 1_700_000_000.0
+
+
+class TraceEntry(NamedTuple):
+    """A request to replay, made `at` seconds after the simulation starts."""
+
+    at: float
+    route: Route
+
+
+def burst(route: Route, count: int, *, at: float = 0.0) -> List[TraceEntry]:
+    """Create a trace of the same request made many times at once."""
+    return [TraceEntry(at, route) for _ in range(count)]
+
+
+def load_trace(path: str) -> List[TraceEntry]:
+    """Load a trace from a file with one JSON object per line.
+
+    Each line has the time of the request (`at`), the `method` and the
+    `path`, for example `{"at": 0.5, "method": "GET", "path": "/channels/1"}`.
+    """
+    trace = []
+    with open(path) as file:
+        for line in file:
+            if not line.strip():
+                continue
+
+            entry = json.loads(line)
+            trace.append(TraceEntry(
+                float(entry.get('at', 0.0)), _parse_route(entry['method'], entry['path'])
+            ))
+
+    trace.sort(key=lambda entry: entry.at)
+    return trace
+
+
+class SimulationResult(NamedTuple):
+    elapsed: float
+    latencies: List[float]
+    failures: int
+    requests: int
+    ratelimited: int
+    wasted_tokens: int
+    wall: float
+
+    @property
+    def throughput(self) -> float:
+        """Successful requests per virtual second."""
+        return len(self.latencies) / self.elapsed if self.elapsed else math.inf
+
+    def summary(self) -> str:
+        return (
+            f'{len(self.latencies)} ok, {self.failures} failed in {self.elapsed:.2f}s'
+            f' virtual ({self.wall * 1000:.0f}ms real)\n'
+            f'  {self.throughput:8.1f} req/s'
+            f'  429 rate {self.ratelimited / max(self.requests, 1):6.1%}'
+            f'  wasted tokens {self.wasted_tokens:5d}'
+            f'  p50 {percentile(self.latencies, 50) * 1000:7.1f}ms'
+            f'  p99 {percentile(self.latencies, 99) * 1000:7.1f}ms'
+        )
+
+
+class _VirtualTime:
+    """Stand-in for the `time` module, reading the virtual clock."""
+
+    def perf_counter(self) -> float:
+        return trio.current_time()
+
+    monotonic = perf_counter
+
+    def time(self) -> float:
+        return EPOCH + trio.current_time()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(time, name)
+
+
+class _VirtualDatetime(datetime):
+    @classmethod
+    def now(cls, tz: Optional[tzinfo] = None) -> '_VirtualDatetime':
+        return cls.fromtimestamp(EPOCH + trio.current_time(), tz)
+
+
+@contextlib.contextmanager
+def virtual_time() -> Iterator[None]:
+    """Redirect the clocks of wumpy-rest and the mock server to Trio's clock."""
+    patched: List[Tuple[ModuleType, str, Any]] = []
+
+    modules = [
+        module for name, module in sys.modules.items()
+        if name.startswith('wumpy.rest') or name == 'mock_discord'
+    ]
+    for module in modules:
+        if getattr(module, 'time', None) is time:
+            patched.append((module, 'time', time))
+            setattr(module, 'time', _VirtualTime())
+
+        if getattr(module, 'datetime', None) is datetime:
+            patched.append((module, 'datetime', datetime))
+            setattr(module, 'datetime', _VirtualDatetime)
+
+    try:
+        yield
+    finally:
+        for module, name, original in patched:
+            setattr(module, name, original)
+
+
+def _now() -> float:
+    return EPOCH + trio.current_time()
+
+
+class _SimulatedDiscord(MockDiscord):
+    """Mock server which also tracks tokens left unused while there was demand."""
+
+    def __init__(self, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+
+        self.wasted_tokens = 0
+
+        self._pending: Dict[str, int] = {}
+        self._pending_since: Dict[str, float] = {}
+
+    def begin(self, route: Route) -> None:
+        _, key = self.get_bucket(route.method, route.url)
+        if self._pending.get(key, 0) == 0:
+            self._pending_since[key] = _now()
+        self._pending[key] = self._pending.get(key, 0) + 1
+
+    def end(self, route: Route) -> None:
+        _, key = self.get_bucket(route.method, route.url)
+        self._pending[key] -= 1
+        if self._pending[key] == 0:
+            del self._pending_since[key]
+
+    def ratelimit(self, method: str, path: str) -> Any:
+        bucket, key = self.get_bucket(method, path)
+
+        window = self._windows.get(key)
+        if (
+            bucket is not None and window is not None
+            and _now() >= window.reset_at
+            and self._pending_since.get(key, math.inf) <= window.reset_at
+        ):
+            # The window expired with tokens left, while a request for it
+            # was already waiting to be made.
+            self.wasted_tokens += window.remaining
+
+        return super().ratelimit(method, path)
+
+
+async def _replay(
+    factory: Callable[[], Ratelimiter],
+    server: _SimulatedDiscord,
+    trace: Sequence[TraceEntry],
+) -> Tuple[float, List[float], int]:
+    latencies: List[float] = []
+    failures = 0
+
+    async def request(ratelimiter: Ratelimiter, entry: TraceEntry) -> None:
+        nonlocal failures
+
+        await anyio.sleep(entry.at - trio.current_time())
+
+        route = entry.route
+        ctx = RatelimiterContext()
+
+        server.begin(route)
+        start = trio.current_time()
+        try:
+            # Mirrors the retry loop of the requesters
+            for attempt in range(5):
+                async with ratelimiter(route, ctx) as update:
+                    status, headers, body = await server.handle(
+                        route.method, route.url, {}, b''
+                    )
+                    await update(headers)
+
+                    if status == 429:
+                        raise RateLimited(status, headers, json.loads(body), attempt=attempt)
+                    elif status >= 500:
+                        raise ServerException(status, headers, None, attempt=attempt)
+
+                    latencies.append(trio.current_time() - start)
+                    return
+
+            failures += 1
+        except HTTPException:
+            failures += 1
+        finally:
+            server.end(route)
+
+    async with factory() as ratelimiter:
+        async with anyio.create_task_group() as tasks:
+            for entry in trace:
+                tasks.start_soon(request, ratelimiter, entry)
+
+        return trio.current_time(), latencies, failures
+
+
+def simulate(
+    factory: Callable[[], Ratelimiter],
+    trace: Iterable[TraceEntry],
+    *,
+    seed: int = 0,
+    **kwargs: Any
+) -> SimulationResult:
+    """Replay a trace through a ratelimiter against a simulated Discord.
+
+    Parameters:
+        factory: Callable creating the ratelimiter to simulate.
+        trace: The requests to replay.
+        seed: The seed for the server's errors and Trio's scheduling.
+        **kwargs: Passed to `MockDiscord` to configure the ratelimits.
+
+    Returns:
+        The result of the simulation, with times measured on the virtual
+        clock (except `wall`).
+    """
+    trace = sorted(trace, key=lambda entry: entry.at)
+    server = _SimulatedDiscord(seed=seed, **kwargs)
+
+    # Trio randomizes the order of tasks woken up at the same time, seeding
+    # it makes the simulation deterministic.
+    trio._core._run._r.seed(seed)
+
+    start = time.perf_counter()
+    with virtual_time():
+        elapsed, latencies, failures = anyio.run(
+            partial(_replay, factory, server, trace), backend='trio',
+            backend_options={'clock': trio.testing.MockClock(autojump_threshold=0)}
+        )
+    wall = time.perf_counter() - start
+
+    return SimulationResult(
+        elapsed, latencies, failures, len(trace),
+        server.ratelimited + server.global_ratelimited, server.wasted_tokens, wall
+    )
@@ -0,0 +1,50 @@
+"""Utilities shared between the benchmarks."""
+from types import TracebackType
+from typing import Any, Mapping, Optional, Sequence, Type
+
+from wumpy.rest import RatelimiterContext, Route
+
+__all__ = (
+    'NoOpRatelimiter',
+    'percentile',
+)
+
+
+class _NoOpLock:
+    async def __aenter__(self) -> Any:
+        return _update
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_val: Optional[BaseException],
+        exc_tb: Optional[TracebackType]
+    ) -> None:
+        pass
+
+
+async def _update(headers: Mapping[str, str]) -> None:
+    pass
+
+
+class NoOpRatelimiter:
+    """Ratelimiter that does nothing, used to measure everything else."""
+
+    async def __aenter__(self) -> 'NoOpRatelimiter':
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        pass
+
+    def __call__(self, route: Route, ctx: RatelimiterContext) -> _NoOpLock:
+        return _NoOpLock()
+
+
+def percentile(values: Sequence[float], percent: float) -> float:
+    """Get the value at a percentile (0-100) of the values."""
+    ordered = sorted(values)
+    if not ordered:
+        return float('nan')
+
+    index = min(len(ordered) - 1, int(round(percent / 100 * (len(ordered) - 1))))
+    return ordered[index]
@@ -1,4 +1,5 @@
-from typing import Optional
+import os
+from typing import TYPE_CHECKING, Optional, Union
 from urllib.parse import parse_qs, urlencode, urlsplit
 
 import attrs
@@ -6,6 +7,9 @@ from typing_extensions import Literal, Self
 
 from .._utils import get_api
 
+if TYPE_CHECKING:
+    from wumpy.rest import AssetStream
+
 __all__ = (
     'Asset',
 )
@@ -56,6 +60,51 @@ class Asset:
 
         return self.__class__(f'{url.scheme}://{url.netloc}{path}?{query}')
 
-    async def read(self) -> bytes:
-        """Read the asset's content and return it as bytes."""
-        return await get_api().read_asset(self.url)
+    async def read(self, *, max_size: Optional[int] = None) -> bytes:
+        """Read the asset's content and return it as bytes.
+
+        Parameters:
+            max_size:
+                The maximum size of the asset in bytes, `AssetTooLarge` is
+                raised if it is larger.
+        """
+        return await get_api().read_asset(self.url, max_size=max_size)
+
+    def stream(
+        self,
+        *,
+        max_size: Optional[int] = None,
+        chunk_size: int = 64 * 1024
+    ) -> 'AssetStream':
+        """Stream the asset's content in chunks.
+
+        Parameters:
+            max_size:
+                The maximum size of the asset in bytes, `AssetTooLarge` is
+                raised as soon as it is known to be larger.
+            chunk_size: The size of the chunks to read.
+
+        Returns:
+            An asynchronous iterator of the chunks, which can also be used as
+            an asynchronous context manager.
+        """
+        return get_api().read_asset_stream(self.url, max_size=max_size, chunk_size=chunk_size)
+
+    async def save(
+        self,
+        path: Union[str, 'os.PathLike[str]'],
+        *,
+        max_size: Optional[int] = None
+    ) -> int:
+        """Download the asset to a file, without holding it in memory.
+
+        Parameters:
+            path: The path of the file to write the asset to.
+            max_size:
+                The maximum size of the asset in bytes, `AssetTooLarge` is
+                raised and nothing is saved if it is larger.
+
+        Returns:
+            The amount of bytes written.
+        """
+        return await get_api().save_asset(self.url, path, max_size=max_size)
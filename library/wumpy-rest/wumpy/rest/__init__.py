@@ -1,6 +1,35 @@
+from ._adaptive import (
+    AdaptiveLimit,
+    AdaptiveRatelimiter,
+)
+from ._asset import (
+    AssetStream,
+)
+from ._breaker import (
+    CircuitState,
+    CircuitBreaker,
+)
+from ._buckets import (
+    KNOWN_BUCKETS,
+)
+from ._budget import (
+    InvalidRequestBudget,
+)
+from ._bulk import (
+    BulkOperation,
+    BulkProgress,
+    BulkResult,
+    BulkExecutor,
+)
+from ._cache import (
+    AssetCache,
+)
 from ._config import (
+    Priority,
     RatelimiterContext,
     abort_if_ratelimited,
+    max_wait,
+    request_priority,
 )
 from ._errors import (
     HTTPException,
@@ -8,40 +37,95 @@ from ._errors import (
     Forbidden,
     NotFound,
     ServerException,
+    CircuitOpen,
+    AssetTooLarge,
+)
+from ._export import (
+    ExportResult,
+    HistoryExporter,
+)
+from ._files import (
+    File,
+)
+from ._h11 import (
+    H11Requester,
+)
+from ._hooks import (
+    RequestEvent,
+    RequestHook,
+    RouteStats,
+    RouteMetrics,
 )
 from ._impl import (
     HTTPXRequester,
     APIClient,
     get_api,
 )
+from ._proxy import (
+    PassthroughRatelimiter,
+    RatelimitProxy,
+)
 from ._ratelimiter import (
     Ratelimiter,
     DictRatelimiter,
 )
 from ._requester import (
+    RawResponse,
     Requester,
 )
 from ._route import (
     Route,
 )
+from ._sender import (
+    WebhookSender,
+)
 from ._utils import (
     MISSING,
 )
 
 __all__ = (
+    'AdaptiveLimit',
+    'AdaptiveRatelimiter',
+    'AssetStream',
+    'CircuitState',
+    'CircuitBreaker',
+    'KNOWN_BUCKETS',
+    'InvalidRequestBudget',
+    'BulkOperation',
+    'BulkProgress',
+    'BulkResult',
+    'BulkExecutor',
+    'AssetCache',
+    'Priority',
     'RatelimiterContext',
     'abort_if_ratelimited',
+    'max_wait',
+    'request_priority',
     'HTTPException',
     'RateLimited',
     'Forbidden',
     'NotFound',
     'ServerException',
+    'CircuitOpen',
+    'AssetTooLarge',
+    'ExportResult',
+    'HistoryExporter',
+    'File',
+    'H11Requester',
+    'RequestEvent',
+    'RequestHook',
+    'RouteStats',
+    'RouteMetrics',
     'HTTPXRequester',
     'APIClient',
     'get_api',
+    'PassthroughRatelimiter',
+    'RatelimitProxy',
     'Ratelimiter',
     'DictRatelimiter',
+    'RawResponse',
     'Requester',
     'Route',
+    'WebhookSender',
     'MISSING',
 )
@@ -0,0 +1,418 @@
+import heapq
+import logging
+import time
+from types import TracebackType
+from typing import (
+    AsyncContextManager, Awaitable, Callable, Dict, List, Mapping, Optional,
+    Tuple, Type
+)
+
+import anyio
+import anyio.lowlevel
+from typing_extensions import Self
+
+from ._config import RatelimiterContext
+from ._errors import RateLimited, ServerException
+from ._ratelimiter import DictRatelimiter, Ratelimiter, _RouteRatelimit
+from ._route import Route
+
+__all__ = (
+    'AdaptiveLimit',
+    'AdaptiveRatelimiter',
+)
+
+
+_log = logging.getLogger(__name__)
+
+
+class AdaptiveLimit:
+    """Concurrency window which adapts with additive-increase/multiplicative-decrease.
+
+    The window grows by `increase` requests for each window's worth of
+    healthy responses while it is fully used, and shrinks by `backoff` on
+    signs of congestion. A response is healthy if its latency is within
+    `tolerance` times the baseline latency, which is the lowest latency
+    observed (slowly drifting upwards so that it follows lasting changes).
+
+    Congestion only shrinks the window once per round-trip: requests that
+    were started before the last decrease do not decrease it again.
+
+    Slots are handed to waiters by priority, like the ratelimit locks.
+
+    Attributes:
+        limit: The current size of the window, fractional while it grows.
+        min_limit: The smallest the window shrinks to.
+        max_limit: The largest the window grows to.
+        increase: The amount of requests added per round-trip.
+        backoff: The factor the window is multiplied by on congestion.
+        tolerance: Multiple of the baseline latency considered healthy.
+        in_flight: The amount of requests currently holding a slot.
+        baseline: The baseline latency in seconds, or None if not yet known.
+    """
+
+    limit: float
+    min_limit: int
+    max_limit: int
+    increase: float
+    backoff: float
+    tolerance: float
+
+    in_flight: int
+    baseline: Optional[float]
+
+    _last_decrease: float
+    _waiters: List[Tuple[int, int, anyio.Event]]
+    _counter: int
+
+    __slots__ = (
+        'limit', 'min_limit', 'max_limit', 'increase', 'backoff', 'tolerance',
+        'in_flight', 'baseline', '_last_decrease', '_waiters', '_counter',
+    )
+
+    def __init__(
+        self,
+        initial: int = 4,
+        *,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        increase: float = 1.0,
+        backoff: float = 0.5,
+        tolerance: float = 2.0
+    ) -> None:
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.backoff = backoff
+        self.tolerance = tolerance
+
+        self.in_flight = 0
+        self.baseline = None
+
+        self._last_decrease = float('-inf')
+
+        # Heap of (-priority, counter, event), like _PriorityLock
+        self._waiters = []
+        self._counter = 0
+
+    def __repr__(self) -> str:
+        return f'<AdaptiveLimit limit={self.limit:.1f} in_flight={self.in_flight}>'
+
+    @property
+    def waiting(self) -> int:
+        """The amount of tasks waiting for a slot."""
+        return len(self._waiters)
+
+    def _wake(self) -> None:
+        while self._waiters and self.in_flight < int(self.limit):
+            # The slot is handed directly to the waiter
+            _, _, event = heapq.heappop(self._waiters)
+            self.in_flight += 1
+            event.set()
+
+    def acquire_nowait(self) -> None:
+        """Acquire a slot without waiting.
+
+        Raises:
+            WouldBlock: There are no free slots in the window.
+        """
+        if self._waiters or self.in_flight >= int(self.limit):
+            raise anyio.WouldBlock()
+
+        self.in_flight += 1
+
+    async def acquire(self, priority: int = 0) -> None:
+        """Acquire a slot, waiting for one by the priority if necessary."""
+        await anyio.lowlevel.checkpoint_if_cancelled()
+
+        try:
+            self.acquire_nowait()
+        except anyio.WouldBlock:
+            pass
+        else:
+            await anyio.lowlevel.cancel_shielded_checkpoint()
+            return
+
+        event = anyio.Event()
+        entry = (-priority, self._counter, event)
+        self._counter += 1
+
+        heapq.heappush(self._waiters, entry)
+        try:
+            await event.wait()
+        except BaseException:
+            if event.is_set():
+                # The slot was handed to us as we were cancelled
+                self.release()
+            else:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+            raise
+
+    def release(self) -> None:
+        """Release a slot, handing it to the next waiter if the window allows."""
+        self.in_flight -= 1
+        self._wake()
+
+    def record_success(self, latency: float) -> None:
+        """Record the latency of a request which received a response.
+
+        This should be called before releasing the slot of the request.
+
+        Parameters:
+            latency: The amount of seconds until the response was received.
+        """
+        if self.baseline is None or latency < self.baseline:
+            self.baseline = latency
+        else:
+            self.baseline *= 1.01
+
+        if latency > self.baseline * self.tolerance:
+            self.record_congestion(time.perf_counter() - latency)
+            return
+
+        # Growing the window when it isn't fully used says nothing about
+        # whether a larger window would be healthy.
+        if self.in_flight >= int(self.limit):
+            self.limit = min(self.max_limit, self.limit + self.increase / self.limit)
+            self._wake()
+
+    def record_congestion(self, started: float) -> None:
+        """Record that a request saw congestion, shrinking the window.
+
+        Parameters:
+            started: The `time.perf_counter()` time the request was made.
+        """
+        if started <= self._last_decrease:
+            return
+
+        self._last_decrease = time.perf_counter()
+        self.limit = max(self.min_limit, self.limit * self.backoff)
+
+        _log.debug(f'Shrinking adaptive concurrency window to {self.limit:.1f} requests')
+
+
+class _AdaptiveLock:
+    """Proxy acquiring the adaptive windows around the inner ratelimiter."""
+
+    __slots__ = (
+        '_parent', '_route', '_ctx', '_limits', '_inner', '_update', '_started', '_latency',
+    )
+
+    def __init__(self, parent: 'AdaptiveRatelimiter', route: Route, ctx: RatelimiterContext) -> None:
+        self._parent = parent
+        self._route = route
+        self._ctx = ctx
+
+        # The route's window is tried first, so that a request which has to
+        # wait for it doesn't hold a slot of the global window meanwhile.
+        self._limits = (parent.route_limit(route), parent.global_limit)
+
+        self._started = 0.0
+        self._latency: Optional[float] = None
+
+    def _acquire_nowait(self, held: List[AdaptiveLimit]) -> Optional[AdaptiveLimit]:
+        """Acquire a slot of all windows not already held, or none of them.
+
+        Returns:
+            The window without a free slot, or None if all were acquired.
+        """
+        acquired: List[AdaptiveLimit] = []
+        for limit in self._limits:
+            if limit in held:
+                continue
+
+            try:
+                limit.acquire_nowait()
+            except anyio.WouldBlock:
+                for other in acquired:
+                    other.release()
+                return limit
+
+            acquired.append(limit)
+
+        return None
+
+    async def __aenter__(self) -> Callable[[Mapping[str, str]], Awaitable[object]]:
+        ctx = self._ctx
+
+        # The bucket (and a global token) is never held while waiting for a
+        # slot, since that would block the bucket without making a request.
+        # Slots which had to be waited for are kept though: releasing them
+        # hands them straight to the next waiter, and the request would never
+        # get all of them at once. In turn, the bucket is then only taken if
+        # that doesn't wait - a slot is no more useful to an exhausted bucket.
+        held: List[AdaptiveLimit] = []
+        try:
+            while True:
+                inner = self._parent.inner(self._route, ctx)
+                if held:
+                    ctx.abort_if_ratelimited = True
+                    try:
+                        update = await inner.__aenter__()
+                    except RateLimited:
+                        for limit in held:
+                            limit.release()
+                        held.clear()
+                        continue
+                    finally:
+                        ctx.abort_if_ratelimited = False
+                else:
+                    update = await inner.__aenter__()
+
+                full = self._acquire_nowait(held)
+                if full is None:
+                    break
+
+                # No request was made, so the tokens taken should be given
+                # back - otherwise each retry would waste one.
+                if isinstance(inner, _RouteRatelimit):
+                    inner.abandon()
+                else:
+                    await inner.__aexit__(None, None, None)
+
+                if ctx.abort_if_ratelimited:
+                    raise RateLimited(429, {})
+
+                remaining = ctx.remaining()
+                with anyio.move_on_after(remaining if remaining is not None else float('inf')):
+                    await full.acquire(ctx.priority)
+                    held.append(full)
+
+                if full not in held:
+                    raise RateLimited(408, {})
+        except BaseException:
+            for limit in held:
+                limit.release()
+            raise
+
+        self._inner = inner
+        self._update = update
+
+        self._started = time.perf_counter()
+        return self.update
+
+    async def update(self, headers: Mapping[str, str]) -> None:
+        self._latency = time.perf_counter() - self._started
+        await self._update(headers)
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_val: Optional[BaseException],
+        exc_tb: Optional[TracebackType]
+    ) -> Optional[bool]:
+        # The slots are released before the inner ratelimiter, which may
+        # sleep before the request is retried.
+        try:
+            self._record(exc_val)
+        finally:
+            for limit in self._limits:
+                limit.release()
+
+        return await self._inner.__aexit__(exc_type, exc_val, exc_tb)
+
+    def _record(self, exc: Optional[BaseException]) -> None:
+        route, global_ = self._limits
+
+        if exc is not None and not isinstance(exc, Exception):
+            # Cancelled, which says nothing about Discord
+            return
+
+        if isinstance(exc, RateLimited):
+            route.record_congestion(self._started)
+            if exc.headers.get('X-RateLimit-Scope') == 'global':
+                global_.record_congestion(self._started)
+        elif self._latency is None or isinstance(exc, ServerException):
+            # Either a network error, or a 5xx response meaning that Discord
+            # is struggling with the load.
+            route.record_congestion(self._started)
+        else:
+            route.record_success(self._latency)
+            global_.record_success(self._latency)
+
+
+class AdaptiveRatelimiter:
+    """Ratelimiter limiting concurrency with windows adapting to congestion.
+
+    Respecting the ratelimit buckets is not always enough: sending hundreds
+    of requests at once raises latency, and shared or undocumented limits
+    still cause occasional 429 responses. This ratelimiter wraps another
+    ratelimiter (a `DictRatelimiter` by default) and additionally limits the
+    amount of concurrent requests with an `AdaptiveLimit` for each endpoint
+    and one for all requests.
+
+    The windows grow while responses are fast and shrink when latency rises,
+    requests are ratelimited, or fail with server or network errors. This
+    finds the maximum stable concurrency without manual tuning.
+
+    ```python
+    async with APIClient(token, ratelimiter=AdaptiveRatelimiter()) as api:
+        ...
+    ```
+
+    Attributes:
+        inner: The wrapped ratelimiter which handles the ratelimit buckets.
+        global_limit: The window shared by all requests.
+        routes: The windows of each endpoint, see `Route.endpoint`.
+    """
+
+    inner: Ratelimiter
+    global_limit: AdaptiveLimit
+    routes: Dict[str, AdaptiveLimit]
+
+    _route_initial: int
+    _route_max: int
+
+    __slots__ = ('inner', 'global_limit', 'routes', '_route_initial', '_route_max')
+
+    def __init__(
+        self,
+        inner: Optional[Ratelimiter] = None,
+        *,
+        initial: int = 16,
+        max_limit: int = 256,
+        route_initial: int = 4,
+        route_max_limit: int = 64
+    ) -> None:
+        self.inner = inner if inner is not None else DictRatelimiter()
+
+        self.global_limit = AdaptiveLimit(initial, max_limit=max_limit)
+        self.routes = {}
+
+        self._route_initial = route_initial
+        self._route_max = route_max_limit
+
+    async def __aenter__(self) -> Self:
+        await self.inner.__aenter__()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]] = None,
+        exc_val: Optional[BaseException] = None,
+        exc_tb: Optional[TracebackType] = None
+    ) -> Optional[bool]:
+        return await self.inner.__aexit__(exc_type, exc_val, exc_tb)
+
+    def __call__(self, route: Route, ctx: RatelimiterContext) -> AsyncContextManager[
+        Callable[[Mapping[str, str]], Awaitable[object]]
+    ]:
+        return _AdaptiveLock(self, route, ctx)
+
+    def route_limit(self, route: Route) -> AdaptiveLimit:
+        """Get the adaptive window of a route.
+
+        Parameters:
+            route: The route to get the window of.
+
+        Returns:
+            The window shared by all routes to the same endpoint.
+        """
+        limit = self.routes.get(route.endpoint)
+        if limit is None:
+            limit = self.routes[route.endpoint] = AdaptiveLimit(
+                self._route_initial, max_limit=self._route_max
+            )
+
+        return limit
@@ -0,0 +1,150 @@
+from types import TracebackType
+from typing import AsyncIterator, Awaitable, Callable, Mapping, Optional, Type
+
+from typing_extensions import Protocol, Self
+
+from ._errors import AssetTooLarge
+
+__all__ = (
+    'AssetStream',
+)
+
+
+class _StreamedResponse(Protocol):
+    """Response with a body which has not been read yet.
+
+    This is the subset of `httpx.Response` used by `AssetStream`, so that
+    requesters can open asset streams with their own HTTP client.
+    """
+
+    @property
+    def headers(self) -> Mapping[str, str]:
+        ...
+
+    def aiter_bytes(self, chunk_size: Optional[int] = None) -> AsyncIterator[bytes]:
+        ...
+
+    async def aclose(self) -> None:
+        ...
+
+
+class AssetStream:
+    """Asynchronous iterator over the chunks of a CDN asset.
+
+    The request is made when iteration starts (or when entered), and the
+    connection is released once the asset has been fully read. Use it as an
+    asynchronous context manager to make sure the connection is also released
+    when not reading the whole asset:
+
+    ```python
+    async with api.read_asset_stream(url, max_size=8 * 1024 * 1024) as stream:
+        async for chunk in stream:
+            hasher.update(chunk)
+    ```
+
+    Attributes:
+        url: The URL of the asset.
+        max_size:
+            The maximum amount of bytes to read before raising
+            `AssetTooLarge`, or None for no limit.
+        received: The amount of bytes read so far.
+    """
+
+    url: str
+    max_size: Optional[int]
+    received: int
+
+    _open: Callable[[], Awaitable[_StreamedResponse]]
+    _chunk_size: int
+    _response: Optional[_StreamedResponse]
+    _chunks: Optional[AsyncIterator[bytes]]
+
+    __slots__ = ('url', 'max_size', 'received', '_open', '_chunk_size', '_response', '_chunks')
+
+    def __init__(
+        self,
+        url: str,
+        open: Callable[[], Awaitable[_StreamedResponse]],
+        *,
+        max_size: Optional[int] = None,
+        chunk_size: int = 64 * 1024
+    ) -> None:
+        self.url = url
+        self.max_size = max_size
+        self.received = 0
+
+        self._open = open
+        self._chunk_size = chunk_size
+        self._response = None
+        self._chunks = None
+
+    def __repr__(self) -> str:
+        return f'<AssetStream url={self.url!r} received={self.received}>'
+
+    async def __aenter__(self) -> Self:
+        await self._start()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_val: Optional[BaseException],
+        exc_tb: Optional[TracebackType]
+    ) -> None:
+        await self.aclose()
+
+    @property
+    def size(self) -> Optional[int]:
+        """The size of the asset according to the Content-Length header.
+
+        This is None before the request has been made, or if the CDN did not
+        send the header.
+        """
+        if self._response is None:
+            return None
+
+        length = self._response.headers.get('Content-Length')
+        return int(length) if length is not None else None
+
+    async def _start(self) -> Optional[AsyncIterator[bytes]]:
+        # Once the response has been closed there is nothing more to read
+        if self._response is not None:
+            return self._chunks
+
+        self._response = await self._open()
+
+        size = self.size
+        if self.max_size is not None and size is not None and size > self.max_size:
+            await self.aclose()
+            raise AssetTooLarge(self.url, self.max_size)
+
+        self._chunks = self._response.aiter_bytes(self._chunk_size)
+        return self._chunks
+
+    def __aiter__(self) -> Self:
+        return self
+
+    async def __anext__(self) -> bytes:
+        chunks = await self._start()
+        if chunks is None:
+            raise StopAsyncIteration
+
+        try:
+            chunk = await chunks.__anext__()
+        except StopAsyncIteration:
+            await self.aclose()
+            raise
+
+        self.received += len(chunk)
+        if self.max_size is not None and self.received > self.max_size:
+            await self.aclose()
+            raise AssetTooLarge(self.url, self.max_size)
+
+        return chunk
+
+    async def aclose(self) -> None:
+        """Release the connection, without reading the rest of the asset."""
+        if self._response is not None:
+            await self._response.aclose()
+
+        self._chunks = None
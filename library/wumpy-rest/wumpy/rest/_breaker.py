@@ -0,0 +1,233 @@
+import enum
+import logging
+import time
+from typing import Dict, Optional
+
+from ._route import Route
+
+__all__ = (
+    'CircuitState',
+    'CircuitBreaker',
+)
+
+
+_log = logging.getLogger(__name__)
+
+
+class CircuitState(enum.Enum):
+    """The state of the circuit of a route.
+
+    Requests are made as usual while the circuit is closed. When the circuit
+    is open requests fail fast, until a single trial request is let through
+    in the half-open state to check whether the route has recovered.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+
+class _Circuit:
+    __slots__ = ('failures', 'opened_at', 'trial_at')
+
+    def __init__(self) -> None:
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_at: Optional[float] = None
+
+
+class CircuitBreaker:
+    """Per-route circuit breaker with a shared retry budget.
+
+    During a Discord incident, retrying every failing request multiplies the
+    load on Discord and ties up tasks sleeping between attempts. The circuit
+    breaker tracks consecutive server errors (5xx responses and network
+    errors) per endpoint, and once `failure_threshold` is reached the circuit
+    opens and requests to the endpoint raise `CircuitOpen` without being
+    made. After `reset_timeout` seconds one trial request is let through,
+    which closes the circuit again if it succeeds.
+
+    Retries are additionally limited by a budget shared between all routes.
+    Each request deposits `retry_ratio` retries into the budget, up to
+    `max_retries`, and each retry withdraws one. This means that in the long
+    run at most a `retry_ratio` share of requests are retries, while still
+    allowing short bursts of retries. When the budget is exhausted, errors
+    are raised on the first attempt.
+
+    Attributes:
+        failure_threshold: Consecutive failures after which the circuit opens.
+        reset_timeout: Seconds the circuit stays open before a trial request.
+        retry_ratio: The share of requests which may be retried.
+        max_retries: The maximum amount of retries that can be saved up.
+        opened: How many times a circuit has been opened.
+        rejected: How many requests have been failed fast by an open circuit.
+        retries_denied: How many retries have been denied by the retry budget.
+    """
+
+    failure_threshold: int
+    reset_timeout: float
+    retry_ratio: float
+    max_retries: float
+
+    opened: int
+    rejected: int
+    retries_denied: int
+
+    _circuits: Dict[str, _Circuit]
+    _retry_tokens: float
+
+    __slots__ = (
+        'failure_threshold', 'reset_timeout', 'retry_ratio', 'max_retries', 'opened',
+        'rejected', 'retries_denied', '_circuits', '_retry_tokens',
+    )
+
+    def __init__(
+        self,
+        *,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        retry_ratio: float = 0.1,
+        max_retries: float = 10.0,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.retry_ratio = retry_ratio
+        self.max_retries = max_retries
+
+        self.opened = 0
+        self.rejected = 0
+        self.retries_denied = 0
+
+        self._circuits = {}
+        self._retry_tokens = max_retries
+
+    def __repr__(self) -> str:
+        return f'<CircuitBreaker open={len(self.open_endpoints)} retries={self.retry_tokens:.1f}>'
+
+    @property
+    def retry_tokens(self) -> float:
+        """The amount of retries currently left in the retry budget."""
+        return self._retry_tokens
+
+    @property
+    def open_endpoints(self) -> Dict[str, CircuitState]:
+        """The endpoints whose circuit is not closed, mapped to their state."""
+        states = {}
+        for endpoint in self._circuits:
+            state = self.state(endpoint)
+            if state is not CircuitState.CLOSED:
+                states[endpoint] = state
+
+        return states
+
+    def state(self, endpoint: str) -> CircuitState:
+        """Get the state of the circuit of an endpoint.
+
+        Parameters:
+            endpoint: The endpoint of the route, see `Route.endpoint`.
+
+        Returns:
+            The current state of the circuit.
+        """
+        circuit = self._circuits.get(endpoint)
+        if circuit is None or circuit.opened_at is None:
+            return CircuitState.CLOSED
+
+        if time.perf_counter() - circuit.opened_at < self.reset_timeout:
+            return CircuitState.OPEN
+
+        return CircuitState.HALF_OPEN
+
+    def allow(self, route: Route) -> Optional[float]:
+        """Check whether a request to the route may be made.
+
+        The first request after the reset timeout is let through as the trial
+        request. If it does not complete (for example because it was
+        cancelled) another one is let through after a reset timeout.
+
+        Parameters:
+            route: The route the request is made to.
+
+        Returns:
+            None if the request may be made, otherwise the amount of seconds
+            until a trial request will be let through.
+        """
+        # Every request deposits into the retry budget, regardless of the
+        # state of its circuit.
+        self._retry_tokens = min(self.max_retries, self._retry_tokens + self.retry_ratio)
+
+        circuit = self._circuits.get(route.endpoint)
+        if circuit is None or circuit.opened_at is None:
+            return None
+
+        now = time.perf_counter()
+
+        remaining = circuit.opened_at + self.reset_timeout - now
+        if remaining <= 0:
+            if circuit.trial_at is None or now - circuit.trial_at >= self.reset_timeout:
+                circuit.trial_at = now
+                return None
+
+            remaining = circuit.trial_at + self.reset_timeout - now
+
+        self.rejected += 1
+        return remaining
+
+    def record_success(self, route: Route) -> None:
+        """Record that a request to the route received a response.
+
+        Client errors (4xx responses) count as successes, since they say
+        nothing about whether Discord is healthy.
+
+        Parameters:
+            route: The route the request was made to.
+        """
+        circuit = self._circuits.pop(route.endpoint, None)
+        if circuit is not None and circuit.opened_at is not None:
+            _log.info(f'Requests to {route.endpoint} are succeeding again; closing circuit.')
+
+    def record_failure(self, route: Route) -> None:
+        """Record that a request to the route failed with a server error.
+
+        Parameters:
+            route: The route the request was made to.
+        """
+        circuit = self._circuits.get(route.endpoint)
+        if circuit is None:
+            circuit = self._circuits[route.endpoint] = _Circuit()
+
+        circuit.failures += 1
+
+        if circuit.opened_at is not None:
+            # The trial request failed, keep the circuit open for another
+            # reset timeout.
+            if circuit.trial_at is not None:
+                circuit.opened_at = time.perf_counter()
+                circuit.trial_at = None
+        elif circuit.failures >= self.failure_threshold:
+            _log.warning(
+                f'{circuit.failures} consecutive requests to {route.endpoint} failed;'
+                f' opening circuit for {self.reset_timeout} seconds.'
+            )
+            circuit.opened_at = time.perf_counter()
+            self.opened += 1
+
+    def retry(self, route: Route) -> bool:
+        """Withdraw a retry from the budget after a failed request.
+
+        Parameters:
+            route: The route of the request to retry.
+
+        Returns:
+            Whether the request may be retried. This is False if the retry
+            budget is exhausted, or if the circuit of the route is open.
+        """
+        if self.state(route.endpoint) is not CircuitState.CLOSED:
+            return False
+
+        if self._retry_tokens < 1:
+            self.retries_denied += 1
+            return False
+
+        self._retry_tokens -= 1
+        return True
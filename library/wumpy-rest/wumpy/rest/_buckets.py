@@ -0,0 +1,43 @@
+from typing import Dict, Tuple
+
+__all__ = (
+    'KNOWN_BUCKETS',
+)
+
+
+# The bucket names are not the hashes Discord uses, which are not documented
+# and may change. They only need to group the endpoints that share a bucket
+# until the first response tells the ratelimiter the real hash.
+KNOWN_BUCKETS: Dict[str, Tuple[str, int]] = {
+    'POST /channels/{channel_id}/messages': ('static:create-message', 5),
+    'GET /channels/{channel_id}/messages': ('static:fetch-messages', 5),
+    'GET /channels/{channel_id}/messages/{message_id}': ('static:fetch-messages', 5),
+    'PATCH /channels/{channel_id}/messages/{message_id}': ('static:edit-message', 5),
+    'DELETE /channels/{channel_id}/messages/{message_id}': ('static:delete-message', 5),
+    'POST /channels/{channel_id}/messages/bulk-delete': ('static:bulk-delete', 1),
+    'POST /channels/{channel_id}/typing': ('static:typing', 5),
+
+    # Reactions are limited to one every 0.25 seconds
+    'PUT /channels/{channel_id}/messages/{message_id}/reactions/{emoji}/@me': (
+        'static:reactions', 1
+    ),
+
+    'PUT /channels/{channel_id}/pins/{message_id}': ('static:pins', 5),
+    'DELETE /channels/{channel_id}/pins/{message_id}': ('static:pins', 5),
+
+    'PUT /guilds/{guild_id}/members/{user_id}/roles/{role_id}': ('static:member-roles', 5),
+    'DELETE /guilds/{guild_id}/members/{user_id}/roles/{role_id}': ('static:member-roles', 5),
+    'PATCH /guilds/{guild_id}/members/{user_id}': ('static:edit-member', 5),
+
+    'POST /webhooks/{webhook_id}/{webhook_token}': ('static:execute-webhook', 5),
+    'POST /webhooks/{application_id}/{interaction_token}': ('static:followup', 5),
+    'POST /interactions/{interaction_id}/{interaction_token}/callback': (
+        'static:interaction-callback', 5
+    ),
+    'PATCH /webhooks/{application_id}/{interaction_token}/messages/@original': (
+        'static:original-response', 5
+    ),
+    'DELETE /webhooks/{application_id}/{interaction_token}/messages/@original': (
+        'static:original-response', 5
+    ),
+}
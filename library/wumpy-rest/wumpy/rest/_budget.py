@@ -0,0 +1,170 @@
+import collections
+import logging
+import time
+from typing import Deque, List, Mapping
+
+from ._config import Priority
+
+__all__ = (
+    'InvalidRequestBudget',
+)
+
+
+_log = logging.getLogger(__name__)
+
+
+# Status codes which count towards Discord's invalid request limit
+INVALID_STATUS_CODES = frozenset({401, 403, 429})
+
+
+class InvalidRequestBudget:
+    """Sliding-window counter of invalid requests, shedding requests near the limit.
+
+    Discord temporarily bans IP addresses that make too many invalid requests
+    (401, 403 and 429 responses), 10,000 per 10 minutes at the time of writing.
+    Such a ban takes down every process on the host, so once the count
+    approaches the limit the requester starts failing requests fast instead
+    of sending them:
+
+    - At `shed_at` of the limit, requests with a priority lower than
+      `shed_below` are shed.
+    - At `block_at` of the limit, all requests are shed. This leaves a margin
+      for requests which are already in-flight.
+
+    Shed requests raise `RateLimited` without being sent, which means that
+    they are caught by `abort_if_ratelimited()` and `max_wait()`. 429
+    responses with a `shared` scope are not counted, as Discord does not count
+    them either.
+
+    The same instance can be passed to multiple requesters to share the count
+    between them, as long as they are used in the same process.
+
+    Examples:
+
+        ```python
+        budget = InvalidRequestBudget()
+
+        async with APIClient(token, invalid_requests=budget) as api:
+            ...
+
+        print(f'{budget.count} invalid requests in the last 10 minutes')
+        ```
+
+    Attributes:
+        limit: The amount of invalid requests allowed in the window.
+        window: The length of the sliding window in seconds.
+        shed_at: The fraction of the limit at which low priority requests are shed.
+        block_at: The fraction of the limit at which all requests are shed.
+        shed_below: The priority requests need to not be shed at `shed_at`.
+    """
+
+    limit: int
+    window: float
+    shed_at: float
+    block_at: float
+    shed_below: int
+
+    _resolution: float
+    _slots: Deque[List[float]]
+    _count: int
+
+    __slots__ = (
+        'limit', 'window', 'shed_at', 'block_at', 'shed_below', '_resolution',
+        '_slots', '_count',
+    )
+
+    def __init__(
+        self,
+        limit: int = 10_000,
+        window: float = 600.0,
+        *,
+        shed_at: float = 0.8,
+        block_at: float = 0.95,
+        shed_below: int = Priority.NORMAL,
+    ) -> None:
+        if not 0 < shed_at <= block_at <= 1:
+            raise ValueError("'shed_at' and 'block_at' must satisfy 0 < shed_at <= block_at <= 1")
+
+        self.limit = limit
+        self.window = window
+        self.shed_at = shed_at
+        self.block_at = block_at
+        self.shed_below = shed_below
+
+        # Invalid requests are counted in slots of this many seconds, this
+        # keeps memory constant. Requests are expired at the end of their
+        # slot, so the count errs on the side of being too high.
+        self._resolution = window / 60
+        self._slots = collections.deque()
+        self._count = 0
+
+    def __repr__(self) -> str:
+        return f'<InvalidRequestBudget count={self.count} limit={self.limit}>'
+
+    def _expire(self, now: float) -> None:
+        while self._slots and self._slots[0][0] + self.window <= now:
+            self._count -= int(self._slots.popleft()[1])
+
+    @property
+    def count(self) -> int:
+        """The amount of invalid requests made in the current window."""
+        self._expire(time.perf_counter())
+        return self._count
+
+    def add(self, amount: int = 1) -> None:
+        """Count invalid requests.
+
+        Parameters:
+            amount: The amount of invalid requests to count.
+        """
+        now = time.perf_counter()
+        self._expire(now)
+
+        start = now - now % self._resolution
+        if self._slots and self._slots[-1][0] == start:
+            self._slots[-1][1] += amount
+        else:
+            self._slots.append([start, amount])
+
+        before = self._count
+        self._count += amount
+
+        if before < self.limit * self.shed_at <= self._count:
+            _log.warning(
+                f'{self._count} invalid requests made in the last {self.window:g} seconds;'
+                f' shedding requests with a priority lower than {self.shed_below}.'
+            )
+
+    def record(self, status_code: int, headers: Mapping[str, str]) -> bool:
+        """Count a response if it is an invalid request.
+
+        Parameters:
+            status_code: The status code of the response.
+            headers: The headers of the response.
+
+        Returns:
+            Whether the response was counted as an invalid request.
+        """
+        if status_code not in INVALID_STATUS_CODES:
+            return False
+
+        if status_code == 429 and headers.get('X-RateLimit-Scope') == 'shared':
+            return False
+
+        self.add()
+        return True
+
+    def should_shed(self, priority: int) -> bool:
+        """Check whether a request should be shed.
+
+        Parameters:
+            priority: The priority of the request.
+
+        Returns:
+            Whether the request should fail fast instead of being sent.
+        """
+        count = self.count
+        if count >= self.limit * self.block_at:
+            return True
+
+        return count >= self.limit * self.shed_at and priority < self.shed_below
@@ -0,0 +1,305 @@
+import logging
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+import anyio
+import anyio.abc
+
+from ._ratelimiter import DictRatelimiter, Ratelimiter
+from ._requester import Requester
+from ._route import Route
+
+__all__ = (
+    'BulkOperation',
+    'BulkProgress',
+    'BulkResult',
+    'BulkExecutor',
+)
+
+
+_log = logging.getLogger(__name__)
+
+
+class BulkOperation:
+    """A single request to make as part of a bulk execution.
+
+    The keyword-arguments are passed directly to `Requester.request()`
+    together with the route when the operation is executed.
+
+    Examples:
+
+        ```python
+        op = BulkOperation(
+            Route(
+                'PUT', '/guilds/{guild_id}/members/{user_id}/roles/{role_id}',
+                guild_id=guild, user_id=user, role_id=role
+            ),
+            reason='Mass-role assignment'
+        )
+        ```
+
+    Attributes:
+        route: The route to make the request to.
+        kwargs: Keyword-arguments passed to `Requester.request()`.
+    """
+
+    route: Route
+    kwargs: Dict[str, Any]
+
+    __slots__ = ('route', 'kwargs')
+
+    def __init__(self, route: Route, **kwargs: Any) -> None:
+        self.route = route
+        self.kwargs = kwargs
+
+    def __repr__(self) -> str:
+        return f'<BulkOperation {self.route}>'
+
+
+class BulkProgress:
+    """Progress of a currently running bulk execution.
+
+    Attributes:
+        total: The total amount of operations.
+        completed: The amount of operations that completed successfully.
+        failed: The amount of operations that raised an exception.
+        started_at: The `time.perf_counter()` time the execution started.
+    """
+
+    total: int
+    completed: int
+    failed: int
+    started_at: float
+
+    __slots__ = ('total', 'completed', 'failed', 'started_at')
+
+    def __init__(self, total: int) -> None:
+        self.total = total
+        self.completed = 0
+        self.failed = 0
+        self.started_at = time.perf_counter()
+
+    def __repr__(self) -> str:
+        return (
+            f'<BulkProgress completed={self.completed} failed={self.failed}'
+            f' total={self.total}>'
+        )
+
+    @property
+    def done(self) -> int:
+        """The amount of operations that have finished, failed or not."""
+        return self.completed + self.failed
+
+    @property
+    def remaining(self) -> int:
+        """The amount of operations that have not yet finished."""
+        return self.total - self.done
+
+    @property
+    def elapsed(self) -> float:
+        """The amount of seconds since the execution started."""
+        return time.perf_counter() - self.started_at
+
+    @property
+    def eta(self) -> Optional[float]:
+        """The estimated amount of seconds until all operations are finished.
+
+        This is extrapolated from the rate at which operations have finished
+        so far, and is None until the first operation has finished.
+        """
+        if self.done == 0:
+            return None
+
+        return self.remaining * (self.elapsed / self.done)
+
+
+class BulkResult:
+    """The result of a finished bulk execution.
+
+    Attributes:
+        results:
+            The return values of the operations, in the same order as they
+            were passed. Operations that failed have a value of None.
+        failures: The operations that failed, together with their exception.
+        progress: The final progress of the execution.
+    """
+
+    results: List[Any]
+    failures: List[Tuple[BulkOperation, Exception]]
+    progress: BulkProgress
+
+    __slots__ = ('results', 'failures', 'progress')
+
+    def __init__(
+        self,
+        results: List[Any],
+        failures: List[Tuple[BulkOperation, Exception]],
+        progress: BulkProgress
+    ) -> None:
+        self.results = results
+        self.failures = failures
+        self.progress = progress
+
+    def __repr__(self) -> str:
+        return f'<BulkResult results={len(self.results)} failures={len(self.failures)}>'
+
+
+class _BucketGroup:
+    """Operations sharing the same ratelimit lock, with their workers."""
+
+    __slots__ = ('route', 'pending', 'workers')
+
+    def __init__(self, route: Route) -> None:
+        self.route = route
+        self.pending: Deque[Tuple[int, BulkOperation]] = deque()
+        self.workers = 0
+
+
+class BulkExecutor:
+    """Execute many requests concurrently, fanning out across buckets.
+
+    Sending thousands of requests through a task group piles all of them up
+    as waiters on the same ratelimit lock. Instead, the bulk executor groups
+    operations by the ratelimit lock they would use and only runs as many
+    workers per lock as the limit of its bucket allows. Different buckets
+    (and major parameters) are executed in parallel.
+
+    The limit of a bucket is only known after the first response, so each
+    group starts with a single worker and spawns more as the ratelimiter
+    learns about the bucket.
+
+    Examples:
+
+        ```python
+        executor = BulkExecutor(api, on_progress=print)
+
+        result = await executor.run(
+            BulkOperation(Route(
+                'PUT', '/guilds/{guild_id}/members/{user_id}/roles/{role_id}',
+                guild_id=guild, user_id=user, role_id=role
+            ))
+            for user in users
+        )
+        print(f'{len(result.failures)} operations failed')
+        ```
+
+    Attributes:
+        api: The requester to make the requests with.
+        max_concurrency:
+            The maximum amount of requests in-flight at once, across all
+            buckets.
+        on_progress:
+            Callback called with the current progress each time an operation
+            finishes. Exceptions raised by it are logged and otherwise ignored.
+    """
+
+    api: Requester
+    max_concurrency: int
+    on_progress: Optional[Callable[[BulkProgress], object]]
+
+    __slots__ = ('api', 'max_concurrency', 'on_progress', '_ratelimiter')
+
+    def __init__(
+        self,
+        api: Requester,
+        *,
+        max_concurrency: int = 50,
+        ratelimiter: Optional[Ratelimiter] = None,
+        on_progress: Optional[Callable[[BulkProgress], object]] = None
+    ) -> None:
+        self.api = api
+        self.max_concurrency = max_concurrency
+        self.on_progress = on_progress
+
+        if ratelimiter is None:
+            ratelimiter = getattr(api, 'ratelimiter', None)
+
+        self._ratelimiter = ratelimiter
+
+    def _get_key(self, route: Route) -> str:
+        if isinstance(self._ratelimiter, DictRatelimiter):
+            return self._ratelimiter.get_key(route)
+
+        # Without bucket information all we can do is to group the routes
+        # that are most likely to share the same lock.
+        return route.key
+
+    def _get_limit(self, route: Route) -> int:
+        if isinstance(self._ratelimiter, DictRatelimiter):
+            return self._ratelimiter.get_limit(route) or 1
+
+        return 1
+
+    async def run(self, operations: Iterable[BulkOperation]) -> BulkResult:
+        """Execute all operations and wait for them to finish.
+
+        Exceptions raised by operations are not propagated, they are instead
+        collected in the `failures` of the result.
+
+        Parameters:
+            operations: The operations to execute.
+
+        Returns:
+            The result of the execution.
+        """
+        groups: Dict[str, _BucketGroup] = {}
+        total = 0
+
+        for i, op in enumerate(operations):
+            key = self._get_key(op.route)
+
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = _BucketGroup(op.route)
+
+            group.pending.append((i, op))
+            total += 1
+
+        results: List[Any] = [None] * total
+        failures: List[Tuple[BulkOperation, Exception]] = []
+        progress = BulkProgress(total)
+
+        limiter = anyio.CapacityLimiter(self.max_concurrency)
+
+        async def worker(tasks: anyio.abc.TaskGroup, group: _BucketGroup) -> None:
+            try:
+                while group.pending:
+                    i, op = group.pending.popleft()
+
+                    async with limiter:
+                        try:
+                            results[i] = await self.api.request(op.route, **op.kwargs)
+                        except Exception as exc:
+                            _log.debug(f'Bulk operation to {op.route} failed: {exc!r}')
+                            failures.append((op, exc))
+                            progress.failed += 1
+                        else:
+                            progress.completed += 1
+
+                    if self.on_progress is not None:
+                        # A broken callback shouldn't cancel the operations
+                        try:
+                            self.on_progress(progress)
+                        except Exception:
+                            _log.exception('Exception in bulk progress callback')
+
+                    # The limit may have been learnt from the response, in
+                    # which case we can start running more requests at once.
+                    spawn(tasks, group)
+            finally:
+                group.workers -= 1
+
+        def spawn(tasks: anyio.abc.TaskGroup, group: _BucketGroup) -> None:
+            wanted = min(self._get_limit(group.route), len(group.pending))
+
+            while group.workers < wanted:
+                group.workers += 1
+                tasks.start_soon(worker, tasks, group)
+
+        async with anyio.create_task_group() as tasks:
+            for group in groups.values():
+                group.workers += 1
+                tasks.start_soon(worker, tasks, group)
+
+        return BulkResult(results, failures, progress)
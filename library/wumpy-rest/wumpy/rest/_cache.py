@@ -0,0 +1,286 @@
+import collections
+import contextlib
+import hashlib
+import logging
+import os
+import re
+from typing import Any, Dict, Optional, Tuple, Union
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import anyio
+import anyio.to_thread
+
+__all__ = (
+    'AssetCache',
+)
+
+
+_log = logging.getLogger(__name__)
+
+
+# The format of the keys returned by AssetCache.key(), only files with such
+# names are considered to be part of the cache.
+KEY_PATTERN = re.compile(r'[0-9a-f]{64}')
+
+
+def _normalize_url(url: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """Normalize the URL of an asset, for use as the key in the cache.
+
+    The scheme and host are lowercased and the query parameters sorted, so
+    that URLs produced differently (for example by `Asset.replace()` or by
+    passing `size` separately) map to the same key.
+    """
+    parts = urlsplit(url)
+
+    query = dict(parse_qsl(parts.query))
+    query.update({k: str(v) for k, v in (params or {}).items()})
+
+    return urlunsplit((
+        parts.scheme.lower(), parts.netloc.lower(), parts.path,
+        urlencode(sorted(query.items())), ''
+    ))
+
+
+class AssetCache:
+    """Size-bounded cache of CDN assets, on disk and in memory.
+
+    The hashes in the URLs of assets change when the asset does, so cached
+    assets never need to be invalidated. Assets are kept in two tiers: the
+    most recently used assets are kept in memory, and all cached assets are
+    stored on disk. Both tiers evict the least recently used asset first once
+    their size limit is reached.
+
+    Pass an instance to the requester to use it for `read_asset()` (and by
+    extension `Asset.read()`):
+
+    ```python
+    cache = AssetCache('.cache/assets', max_size=512 * 1024 * 1024)
+
+    async with APIClient(token, asset_cache=cache) as api:
+        ...
+    ```
+
+    The disk tier survives restarts, the recency of files is kept through
+    their modification time. Only files named like the keys of the cache
+    are indexed (and evicted), other files in the directory are left alone.
+
+    Attributes:
+        directory: The directory the assets are stored in.
+        max_size: The maximum amount of bytes stored on disk.
+        memory_size: The maximum amount of bytes kept in memory.
+        hits: The amount of lookups found in either tier.
+        misses: The amount of lookups that were not found.
+    """
+
+    directory: str
+    max_size: int
+    memory_size: int
+
+    hits: int
+    misses: int
+
+    _memory: 'collections.OrderedDict[str, bytes]'
+    _memory_used: int
+    _index: Optional['collections.OrderedDict[str, int]']
+    _disk_used: int
+
+    __slots__ = (
+        'directory', 'max_size', 'memory_size', 'hits', 'misses', '_memory',
+        '_memory_used', '_index', '_disk_used',
+    )
+
+    def __init__(
+        self,
+        directory: Union[str, 'os.PathLike[str]'],
+        *,
+        max_size: int = 256 * 1024 * 1024,
+        memory_size: int = 16 * 1024 * 1024
+    ) -> None:
+        self.directory = os.fspath(directory)
+        self.max_size = max_size
+        self.memory_size = memory_size
+
+        self.hits = 0
+        self.misses = 0
+
+        self._memory = collections.OrderedDict()
+        self._memory_used = 0
+
+        # Loaded from the directory on first use, since it requires I/O
+        self._index = None
+        self._disk_used = 0
+
+    def __repr__(self) -> str:
+        return f'<AssetCache directory={self.directory!r} hits={self.hits} misses={self.misses}>'
+
+    @staticmethod
+    def key(url: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """Get the key of an asset in the cache.
+
+        Parameters:
+            url: The URL of the asset.
+            params: Additional query parameters, such as `size`.
+
+        Returns:
+            The key the asset is stored under.
+        """
+        return hashlib.sha256(_normalize_url(url, params).encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> str:
+        if not KEY_PATTERN.fullmatch(key):
+            raise ValueError(f'Invalid key {key!r}, keys should be created with key()')
+
+        return os.path.join(self.directory, key)
+
+    def _scan(self) -> Tuple['collections.OrderedDict[str, int]', int]:
+        os.makedirs(self.directory, exist_ok=True)
+
+        entries = []
+        for entry in os.scandir(self.directory):
+            name, ext = os.path.splitext(entry.name)
+            if not KEY_PATTERN.fullmatch(name):
+                continue
+
+            # Partially written files are left behind if the process crashed
+            if ext == '.part':
+                with contextlib.suppress(OSError):
+                    os.remove(entry.path)
+                continue
+
+            if not ext and entry.is_file():
+                stat = entry.stat()
+                entries.append((stat.st_mtime, entry.name, stat.st_size))
+
+        entries.sort()
+        return (
+            collections.OrderedDict((name, size) for _, name, size in entries),
+            sum(size for _, _, size in entries)
+        )
+
+    async def _load_index(self) -> 'collections.OrderedDict[str, int]':
+        if self._index is None:
+            index, used = await anyio.to_thread.run_sync(self._scan)
+
+            # Another task may have loaded it while this one was scanning
+            if self._index is None:
+                self._index, self._disk_used = index, used
+
+        assert self._index is not None
+        return self._index
+
+    def _remember(self, key: str, data: bytes) -> None:
+        if len(data) > self.memory_size:
+            return
+
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_used -= len(previous)
+
+        self._memory[key] = data
+        self._memory_used += len(data)
+
+        while self._memory_used > self.memory_size:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_used -= len(evicted)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        """Look up an asset in the cache.
+
+        Parameters:
+            key: The key of the asset, see `key()`.
+
+        Returns:
+            The content of the asset, or None if it is not cached.
+        """
+        data = self._memory.get(key)
+        if data is not None:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return data
+
+        index = await self._load_index()
+        if key not in index:
+            self.misses += 1
+            return None
+
+        path = self._path(key)
+
+        def read() -> Optional[bytes]:
+            try:
+                with open(path, 'rb') as file:
+                    content = file.read()
+                # Keep track of the recency for the next time the index is
+                # loaded from the directory.
+                os.utime(path)
+            except FileNotFoundError:
+                return None
+
+            return content
+
+        data = await anyio.to_thread.run_sync(read)
+        if data is None:
+            # The file was removed from under us
+            self._disk_used -= index.pop(key, 0)
+            self.misses += 1
+            return None
+
+        index.move_to_end(key)
+        self._remember(key, data)
+        self.hits += 1
+        return data
+
+    async def put(self, key: str, data: bytes) -> None:
+        """Store an asset in the cache.
+
+        Parameters:
+            key: The key of the asset, see `key()`.
+            data: The content of the asset.
+
+        Raises:
+            ValueError: The key was not created with `key()`.
+        """
+        path = self._path(key)
+        self._remember(key, data)
+
+        if len(data) > self.max_size:
+            return
+
+        index = await self._load_index()
+        if key in index:
+            index.move_to_end(key)
+            return
+
+        def write() -> None:
+            partial = path + '.part'
+            with open(partial, 'wb') as file:
+                file.write(data)
+            os.replace(partial, path)
+
+        try:
+            await anyio.to_thread.run_sync(write)
+        except OSError:
+            _log.warning(f'Failed to write asset to cache at {path}', exc_info=True)
+            return
+
+        if key not in index:
+            index[key] = len(data)
+            self._disk_used += len(data)
+
+        evicted = []
+        while self._disk_used > self.max_size and index:
+            name, size = index.popitem(last=False)
+            self._disk_used -= size
+            evicted.append(self._path(name))
+
+        if evicted:
+            def remove() -> None:
+                for path in evicted:
+                    with contextlib.suppress(OSError):
+                        os.remove(path)
+
+            await anyio.to_thread.run_sync(remove)
+
+    def clear_memory(self) -> None:
+        """Clear the in-memory tier, keeping the assets stored on disk."""
+        self._memory.clear()
+        self._memory_used = 0
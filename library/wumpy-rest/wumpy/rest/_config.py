@@ -1,4 +1,6 @@
+import time
 from contextvars import ContextVar, Token
+from enum import IntEnum
 from types import TracebackType
 from typing import Optional, Type
 
@@ -7,12 +9,30 @@ from typing_extensions import Self
 from ._errors import RequestException
 
 __all__ = (
+    'Priority',
     'RatelimiterContext',
     'abort_if_ratelimited',
+    'max_wait',
+    'request_priority',
 )
 
 
 _abort_if_ratelimited: ContextVar[bool] = ContextVar('_abort_if_ratelimited', default=False)
+_max_wait: ContextVar[Optional[float]] = ContextVar('_max_wait', default=None)
+_priority: ContextVar[int] = ContextVar('_priority', default=0)
+
+
+class Priority(IntEnum):
+    """Common priorities for requests.
+
+    Requests with a higher priority are served first by the ratelimiter when
+    multiple requests are waiting. Any integer can be used as a priority, these
+    are only provided as sensible defaults.
+    """
+
+    BACKGROUND = -10
+    NORMAL = 0
+    INTERACTIVE = 10
 
 
 class RatelimiterContext:
@@ -46,23 +66,81 @@ class RatelimiterContext:
             This ratelimiting configuration is what powers the context manager
             of the same name (`abort_if_ratelimited()`). It allows the user to
             specify that they wish to abort requests if they get ratelimited.
+        priority:
+            The priority of the request when waiting for ratelimits.
+
+            This is configured with the `request_priority()` context manager.
+            Waiting requests with a higher priority are served before waiting
+            requests with a lower priority, requests with the same priority
+            are served in the order they started waiting.
+        max_wait:
+            The maximum amount of seconds the request may wait for ratelimits.
+
+            This is configured with the `max_wait()` context manager. If the
+            ratelimiter expects the request to wait longer than this, it
+            should abort the request immediately rather than wait. None means
+            that there is no limit.
+        deadline:
+            The `time.perf_counter()` time by which the request must have
+            been made, `max_wait` seconds after this context was created.
+
+            The same context is used for all attempts of a request, so that
+            retries and backoff sleeps share the budget of `max_wait` rather
+            than each getting a new one. See `remaining()`.
+        bucket_wait:
+            The amount of seconds the request waited for its bucket.
+
+            Unlike the attributes above, this is set by the ratelimiter once
+            the request may be made. It is used for instrumentation and stays
+            at 0 if the ratelimiter does not support it.
+        global_wait:
+            The amount of seconds the request waited for the global ratelimit,
+            set by the ratelimiter similar to `bucket_wait`.
     """
 
     abort_if_ratelimited: bool
+    priority: int
+    max_wait: Optional[float]
+    deadline: Optional[float]
+
+    bucket_wait: float
+    global_wait: float
 
     def __new__(cls) -> Self:
         self = super().__new__(cls)
 
         self.abort_if_ratelimited = _abort_if_ratelimited.get()
+        self.priority = _priority.get()
+        self.max_wait = _max_wait.get()
+        self.deadline = None
+        if self.max_wait is not None:
+            self.deadline = time.perf_counter() + self.max_wait
+
+        self.bucket_wait = 0.0
+        self.global_wait = 0.0
 
         return self
 
+    def remaining(self) -> Optional[float]:
+        """Calculate how much of `max_wait` is left for the request.
+
+        Returns:
+            The amount of seconds left until `deadline`, which may be negative
+            if it has passed, or None if there is no deadline.
+        """
+        if self.deadline is None:
+            return None
+
+        return self.deadline - time.perf_counter()
+
 
 class _AbortRatelimitsManager:
 
     _aborted: Optional[bool]
     _previous: Token
 
+    _name = 'abort_if_ratelimited()'
+
     def __init__(self) -> None:
         self._aborted = None
 
@@ -79,6 +157,9 @@ class _AbortRatelimitsManager:
     ) -> Optional[bool]:
         _abort_if_ratelimited.reset(self._previous)
 
+        return self._suppress(exc_val)
+
+    def _suppress(self, exc_val: Optional[BaseException]) -> Optional[bool]:
         if isinstance(exc_val, RequestException) and exc_val.status_code in {408, 429}:
             self._aborted = True
             return True
@@ -89,12 +170,45 @@ class _AbortRatelimitsManager:
     def aborted(self) -> bool:
         if self._aborted is None:
             raise RuntimeError(
-                "Cannot access 'aborted' before 'abort_if_ratelimited()' has been exited"
+                f"Cannot access 'aborted' before '{self._name}' has been exited"
             )
 
         return self._aborted
 
 
+class _MaxWaitManager(_AbortRatelimitsManager):
+
+    _seconds: float
+
+    _name = 'max_wait()'
+
+    def __init__(self, seconds: float) -> None:
+        super().__init__()
+
+        self._seconds = seconds
+
+    def __enter__(self) -> Self:
+        # If there's an outer deadline that is shorter, we should not allow
+        # requests to wait longer than it just because we're nested.
+        outer = _max_wait.get()
+        if outer is not None and outer < self._seconds:
+            self._previous = _max_wait.set(outer)
+        else:
+            self._previous = _max_wait.set(self._seconds)
+
+        return self
+
+    def __exit__(
+            self,
+            exc_type: Optional[Type[BaseException]] = None,
+            exc_val: Optional[BaseException] = None,
+            traceback: Optional[TracebackType] = None
+    ) -> Optional[bool]:
+        _max_wait.reset(self._previous)
+
+        return self._suppress(exc_val)
+
+
 def abort_if_ratelimited() -> _AbortRatelimitsManager:
     """Abort requests if they are ratelimited.
 
@@ -141,3 +255,102 @@ def abort_if_ratelimited() -> _AbortRatelimitsManager:
         A context manager which skips requests if they will be ratelimited.
     """
     return _AbortRatelimitsManager()
+
+
+def max_wait(seconds: float) -> _MaxWaitManager:
+    """Abort requests if they would wait too long for ratelimits.
+
+    This function returns a context manager, that when entered, limits how
+    long requests may wait for ratelimits. Unlike `abort_if_ratelimited()`,
+    requests are allowed to wait as long as the ratelimiter expects the wait
+    to be shorter than `seconds`. If the wait is expected to take longer the
+    request fails fast, without waiting at all.
+
+    This is useful for responding to interactions, which has to happen within
+    a certain time, where you would rather fall back to something else than
+    wait past the deadline:
+
+    ```python
+    with max_wait(2) as deadline:
+        await api.send_message(channel, content='Heavy response...')
+
+    if deadline.aborted:
+        await api.create_interaction_response(...)  # Fall back to this
+    ```
+
+    Just like `abort_if_ratelimited()`, this works by catching the
+    `Ratelimited` exception. This means that code after the request inside of
+    the context manager does not run if the request is aborted.
+
+    !!! info
+        Unlike `abort_if_ratelimited()` this also includes the global
+        ratelimit. If the request would have to wait longer than `seconds` for
+        the global ratelimit, it is aborted as well.
+
+    When nested, the shortest maximum wait is used.
+
+    Parameters:
+        seconds: The maximum amount of seconds requests may wait.
+
+    Returns:
+        A context manager which aborts requests that would wait too long.
+    """
+    return _MaxWaitManager(seconds)
+
+
+class _PriorityManager:
+
+    _priority: int
+    _previous: Token
+
+    def __init__(self, priority: int) -> None:
+        self._priority = priority
+
+    def __enter__(self) -> Self:
+        self._previous = _priority.set(self._priority)
+
+        return self
+
+    def __exit__(
+            self,
+            exc_type: Optional[Type[BaseException]] = None,
+            exc_val: Optional[BaseException] = None,
+            traceback: Optional[TracebackType] = None
+    ) -> None:
+        _priority.reset(self._previous)
+
+
+def request_priority(priority: int) -> _PriorityManager:
+    """Set the priority of requests when waiting for ratelimits.
+
+    This function returns a context manager, that when entered, will set the
+    priority of all requests made inside of it. When multiple requests are
+    waiting on the same ratelimit (including the global ratelimit), requests
+    with a higher priority are allowed through first. This is useful for
+    making sure that latency-sensitive requests such as interaction responses
+    don't wait behind background work.
+
+    ```python
+    async def sync_members(guild):
+        with request_priority(Priority.BACKGROUND):
+            async for member in ...:
+                await api.add_member_role(guild, member, role)
+    ```
+
+    Similar to `abort_if_ratelimited()` this can be nested, in which case the
+    innermost priority is used.
+
+    !!! note
+        A request that has already been allowed through cannot be interrupted
+        by a request of a higher priority. The priority only decides the order
+        of requests that are waiting.
+
+    Parameters:
+        priority:
+            The priority of the requests, see `Priority` for common values.
+            Higher values are served first.
+
+    Returns:
+        A context manager which sets the priority of requests.
+    """
+    return _PriorityManager(priority)
@@ -8,6 +8,8 @@ __all__ = (
     'Forbidden',
     'NotFound',
     'ServerException',
+    'CircuitOpen',
+    'AssetTooLarge',
 )
 
 
@@ -21,6 +23,8 @@ class HTTPException(Exception):
             ├── Forbidden
             ├── NotFound
         └── ServerException
+        └── CircuitOpen
+        └── AssetTooLarge
     """
 
     __slots__ = ()
@@ -118,3 +122,53 @@ class ServerException(RequestException):
     """Exception raised when the requester hits a 500 range response."""
 
     __slots__ = ()
+
+
+class CircuitOpen(HTTPException):
+    """Exception raised when requests to a failing route are failed fast.
+
+    This is raised without making a request when the circuit breaker of the
+    requester has opened the circuit of the route, after too many requests to
+    it failed with server errors.
+
+    Attributes:
+        endpoint: The endpoint of the route that is failing.
+        retry_after: The amount of seconds until requests are attempted again.
+    """
+
+    endpoint: str
+    retry_after: float
+
+    __slots__ = ('endpoint', 'retry_after')
+
+    def __init__(self, endpoint: str, retry_after: float) -> None:
+        self.endpoint = endpoint
+        self.retry_after = retry_after
+
+        super().__init__(
+            f'Requests to {endpoint} are failing, retrying in {retry_after:.2f} seconds'
+        )
+
+
+class AssetTooLarge(HTTPException):
+    """Exception raised when a CDN asset is larger than the allowed size.
+
+    This is raised as soon as the size is known to be too large, either from
+    the Content-Length header or while reading the asset, so the rest of the
+    asset is never downloaded.
+
+    Attributes:
+        url: The URL of the asset.
+        max_size: The maximum size in bytes that was allowed.
+    """
+
+    url: str
+    max_size: int
+
+    __slots__ = ('url', 'max_size')
+
+    def __init__(self, url: str, max_size: int) -> None:
+        self.url = url
+        self.max_size = max_size
+
+        super().__init__(f'Asset at {url} is larger than {max_size} bytes')
@@ -0,0 +1,366 @@
+import contextlib
+import gzip
+import logging
+import os
+import time
+from typing import (
+    Any, Callable, Dict, Iterable, List, Optional, SupportsInt, Union
+)
+
+import anyio
+import anyio.to_thread
+
+from ._utils import dump_json, load_json, timestamp_snowflake
+from .endpoints import ChannelEndpoints
+
+__all__ = (
+    'ExportResult',
+    'HistoryExporter',
+)
+
+
+_log = logging.getLogger(__name__)
+
+
+# The maximum amount of messages Discord returns in one page
+PAGE_SIZE = 100
+
+
+class _Segment:
+    """A range of snowflakes of a channel, exported with its own cursor."""
+
+    __slots__ = ('end', 'cursor', 'offset', 'count', 'done')
+
+    def __init__(
+        self,
+        end: int,
+        cursor: int,
+        offset: int = 0,
+        count: int = 0,
+        done: bool = False
+    ) -> None:
+        self.end = end
+        self.cursor = cursor
+        self.offset = offset
+        self.count = count
+        self.done = done
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'end': self.end, 'cursor': self.cursor, 'offset': self.offset,
+            'count': self.count, 'done': self.done,
+        }
+
+
+def _truncate(path: str, offset: int) -> None:
+    # Anything past the offset was written after the last checkpoint, and
+    # will be fetched and written again.
+    with open(path, 'ab') as file:
+        file.truncate(offset)
+
+
+def _append(path: str, data: bytes) -> int:
+    with open(path, 'ab') as file:
+        file.write(data)
+        file.flush()
+        os.fsync(file.fileno())
+        return file.tell()
+
+
+class ExportResult:
+    """The result of exporting the history of multiple channels.
+
+    Attributes:
+        messages: The amount of messages exported, by channel ID.
+        failures: The exceptions of channels that failed, by channel ID.
+    """
+
+    messages: Dict[int, int]
+    failures: Dict[int, Exception]
+
+    __slots__ = ('messages', 'failures')
+
+    def __init__(self, messages: Dict[int, int], failures: Dict[int, Exception]) -> None:
+        self.messages = messages
+        self.failures = failures
+
+    def __repr__(self) -> str:
+        return f'<ExportResult messages={sum(self.messages.values())} failures={len(self.failures)}>'
+
+
+class HistoryExporter:
+    """Resumable exporter of the message history of channels.
+
+    The messages of each channel are written oldest first to a file with one
+    JSON-encoded message per line (NDJSON), optionally gzip-compressed. The
+    history up until the export started is split into segments by time, which
+    are fetched concurrently with their own cursors. This means that several
+    pages are in-flight at once within the ratelimit bucket of the channel,
+    instead of waiting for each page before requesting the next.
+
+    Progress is checkpointed after every page, so an export that is
+    interrupted (for example because the process crashed) continues where it
+    left off when started again with the same directory.
+
+    Examples:
+
+        ```python
+        exporter = HistoryExporter(api, 'archive/', compress=True)
+
+        result = await exporter.export([41771983423143937, 41771983423143938])
+        for channel, exc in result.failures.items():
+            print(f'Failed to export {channel}: {exc!r}')
+        ```
+
+    Attributes:
+        api: The API to fetch messages with.
+        directory: The directory the exports are written to.
+        compress: Whether to gzip-compress the exports.
+        segments: The amount of segments each channel is split into.
+        max_concurrency: The maximum amount of channels exported at once.
+        on_progress:
+            Callback called with the channel ID and the amount of messages
+            exported so far each time a page has been written.
+    """
+
+    api: ChannelEndpoints
+    directory: str
+    compress: bool
+    segments: int
+    max_concurrency: int
+    on_progress: Optional[Callable[[int, int], object]]
+
+    __slots__ = (
+        'api', 'directory', 'compress', 'segments', 'max_concurrency', 'on_progress',
+    )
+
+    def __init__(
+        self,
+        api: ChannelEndpoints,
+        directory: Union[str, 'os.PathLike[str]'],
+        *,
+        compress: bool = False,
+        segments: int = 4,
+        max_concurrency: int = 10,
+        on_progress: Optional[Callable[[int, int], object]] = None
+    ) -> None:
+        self.api = api
+        self.directory = os.fspath(directory)
+        self.compress = compress
+        self.segments = segments
+        self.max_concurrency = max_concurrency
+        self.on_progress = on_progress
+
+    def path(self, channel: SupportsInt) -> str:
+        """Get the path of the finished export of a channel.
+
+        Parameters:
+            channel: The ID of the channel.
+
+        Returns:
+            The path the export is written to once finished.
+        """
+        ext = '.ndjson.gz' if self.compress else '.ndjson'
+        return os.path.join(self.directory, f'{int(channel)}{ext}')
+
+    def _part_path(self, channel: int, segment: int) -> str:
+        return os.path.join(self.directory, f'{channel}.{segment}.part')
+
+    def _checkpoint_path(self, channel: int) -> str:
+        return os.path.join(self.directory, f'{channel}.checkpoint')
+
+    def _load_checkpoint(self, channel: int) -> Optional[List[_Segment]]:
+        try:
+            with open(self._checkpoint_path(channel), 'rb') as file:
+                state = load_json(file.read())
+        except FileNotFoundError:
+            return None
+
+        if state['compress'] != self.compress:
+            raise ValueError(
+                f'Cannot resume export of {channel} with compress={self.compress},'
+                f" it was started with compress={state['compress']}"
+            )
+
+        return [_Segment(**segment) for segment in state['segments']]
+
+    def _save_checkpoint(self, channel: int, state: bytes) -> None:
+        path = self._checkpoint_path(channel)
+        with open(path + '.tmp', 'wb') as file:
+            file.write(state)
+        os.replace(path + '.tmp', path)
+
+    def _finish(self, channel: int, segments: List[_Segment]) -> None:
+        # Concatenating the parts in order works for gzip too, since a gzip
+        # file can consist of multiple members.
+        partial = self.path(channel) + '.tmp'
+        with open(partial, 'wb') as output:
+            for i in range(len(segments)):
+                with contextlib.suppress(FileNotFoundError):
+                    with open(self._part_path(channel, i), 'rb') as part:
+                        while True:
+                            chunk = part.read(1024 * 1024)
+                            if not chunk:
+                                break
+                            output.write(chunk)
+
+        os.replace(partial, self.path(channel))
+
+        for i in range(len(segments)):
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(self._part_path(channel, i))
+        os.remove(self._checkpoint_path(channel))
+
+    async def export(self, channels: Iterable[SupportsInt]) -> ExportResult:
+        """Export the history of multiple channels concurrently.
+
+        Exceptions raised while exporting a channel do not stop the export of
+        the other channels, they are collected in the result instead.
+
+        Parameters:
+            channels: The IDs of the channels to export.
+
+        Returns:
+            The result of the export.
+        """
+        messages: Dict[int, int] = {}
+        failures: Dict[int, Exception] = {}
+
+        limiter = anyio.CapacityLimiter(self.max_concurrency)
+
+        async def export(channel: int) -> None:
+            async with limiter:
+                try:
+                    messages[channel] = await self.export_channel(channel)
+                except Exception as exc:
+                    _log.warning(f'Failed to export channel {channel}: {exc!r}')
+                    failures[channel] = exc
+
+        async with anyio.create_task_group() as tasks:
+            for channel in channels:
+                tasks.start_soon(export, int(channel))
+
+        return ExportResult(messages, failures)
+
+    async def export_channel(self, channel: SupportsInt) -> int:
+        """Export the history of a single channel.
+
+        If the channel has already been exported, it is not exported again.
+
+        Parameters:
+            channel: The ID of the channel to export.
+
+        Returns:
+            The amount of messages in the export.
+        """
+        channel = int(channel)
+
+        segments = await anyio.to_thread.run_sync(self._load_checkpoint, channel)
+        if segments is None:
+            if os.path.exists(self.path(channel)):
+                _log.info(f'Channel {channel} has already been exported, skipping.')
+                return 0
+
+            await anyio.to_thread.run_sync(
+                lambda: os.makedirs(self.directory, exist_ok=True)
+            )
+
+            # Channel IDs are created before any message in the channel, so
+            # the history spans from the channel ID until now.
+            end = timestamp_snowflake(time.time())
+            step = max((end - channel) // self.segments, 1)
+
+            segments = [
+                _Segment(
+                    end=end if i == self.segments - 1 else channel + step * (i + 1),
+                    cursor=channel + step * i
+                )
+                for i in range(self.segments)
+            ]
+        # The segments share one checkpoint file, which must not be written
+        # by multiple threads at once.
+        lock = anyio.Lock()
+        if not os.path.exists(self._checkpoint_path(channel)):
+            await self._checkpoint(channel, segments, lock)
+
+        failure: Optional[Exception] = None
+
+        async def export(i: int) -> None:
+            nonlocal failure
+
+            try:
+                await self._export_segment(channel, segments, i, lock)
+            except Exception as exc:
+                # Raise the first error as-is rather than a group of errors
+                # from all segments failing at once.
+                if failure is None:
+                    failure = exc
+                tasks.cancel_scope.cancel()
+
+        async with anyio.create_task_group() as tasks:
+            for i, segment in enumerate(segments):
+                if not segment.done:
+                    tasks.start_soon(export, i)
+
+        if failure is not None:
+            raise failure
+
+        await anyio.to_thread.run_sync(self._finish, channel, segments)
+        return sum(segment.count for segment in segments)
+
+    async def _checkpoint(
+        self,
+        channel: int,
+        segments: List[_Segment],
+        lock: anyio.Lock
+    ) -> None:
+        # Shielded so that a cancelled export leaves a complete checkpoint
+        # behind, which matches what has been written to the parts.
+        with anyio.CancelScope(shield=True):
+            async with lock:
+                state = dump_json({
+                    'compress': self.compress,
+                    'segments': [segment.to_dict() for segment in segments],
+                })
+                await anyio.to_thread.run_sync(self._save_checkpoint, channel, state)
+
+    async def _export_segment(
+        self,
+        channel: int,
+        segments: List[_Segment],
+        i: int,
+        lock: anyio.Lock
+    ) -> None:
+        segment = segments[i]
+        path = self._part_path(channel, i)
+
+        await anyio.to_thread.run_sync(_truncate, path, segment.offset)
+
+        while not segment.done:
+            messages = await self.api.fetch_messages(
+                channel, after=segment.cursor, limit=PAGE_SIZE
+            )
+
+            page = sorted(
+                (m for m in messages if int(m['id']) <= segment.end),
+                key=lambda m: int(m['id'])
+            )
+
+            if page:
+                data = b''.join(dump_json(m) + b'\n' for m in page)
+                if self.compress:
+                    data = gzip.compress(data)
+
+                segment.offset = await anyio.to_thread.run_sync(_append, path, data)
+                segment.cursor = int(page[-1]['id'])
+                segment.count += len(page)
+
+            # Either the end of the history, or the messages continued into
+            # the next segment.
+            if len(messages) < PAGE_SIZE or len(page) < len(messages):
+                segment.done = True
+
+            await self._checkpoint(channel, segments, lock)
+
+            if self.on_progress is not None:
+                self.on_progress(channel, sum(s.count for s in segments))
@@ -0,0 +1,229 @@
+import mimetypes
+import os
+import uuid
+from typing import (
+    IO, Any, AsyncIterable, AsyncIterator, List, Mapping, Optional, Sequence,
+    Tuple, Union
+)
+
+import anyio
+
+__all__ = (
+    'File',
+)
+
+
+class File:
+    """A file to upload, read in chunks while the request is sent.
+
+    Passing a file path or an asynchronous iterable of bytes means that the
+    file is never held in memory as a whole. Files created from a path are
+    re-opened for every request, which means that one instance can be sent
+    to many channels - or retried - while memory usage stays flat:
+
+    ```python
+    video = File('assets/trailer.mp4')
+
+    for channel in channels:
+        await api.send_message(channel, files=[video])
+    ```
+
+    An asynchronous iterable can only be sent once, as it cannot be rewound.
+
+    Parameters:
+        source:
+            The path of the file, the contents of the file, or an
+            asynchronous iterable of chunks of the file.
+        filename:
+            The name of the file shown by Discord. Defaults to the name of
+            the path, or `upload` if there is none.
+        content_type:
+            The MIME type of the file, guessed from the filename by default.
+        chunk_size: The amount of bytes to read from the disk at a time.
+
+    Attributes:
+        filename: The name of the file shown by Discord.
+        content_type: The MIME type of the file.
+    """
+
+    filename: str
+    content_type: str
+
+    _source: Union[str, bytes, AsyncIterable[bytes]]
+    _chunk_size: int
+    _consumed: bool
+
+    __slots__ = ('filename', 'content_type', '_source', '_chunk_size', '_consumed')
+
+    def __init__(
+        self,
+        source: Union[str, 'os.PathLike[str]', bytes, AsyncIterable[bytes]],
+        filename: Optional[str] = None,
+        *,
+        content_type: Optional[str] = None,
+        chunk_size: int = 256 * 1024
+    ) -> None:
+        if isinstance(source, os.PathLike):
+            source = os.fspath(source)
+
+        if filename is None:
+            filename = os.path.basename(source) if isinstance(source, str) else 'upload'
+
+        self.filename = filename
+        self.content_type = (
+            content_type or mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        )
+
+        self._source = source
+        self._chunk_size = chunk_size
+        self._consumed = False
+
+    def __repr__(self) -> str:
+        return f'<File filename={self.filename!r} size={self.size}>'
+
+    @property
+    def size(self) -> Optional[int]:
+        """The size of the file in bytes, or None if it is not known upfront."""
+        if isinstance(self._source, str):
+            return os.stat(self._source).st_size
+        elif isinstance(self._source, bytes):
+            return len(self._source)
+
+        return None
+
+    def __aiter__(self) -> AsyncIterator[bytes]:
+        return self._chunks()
+
+    async def _chunks(self) -> AsyncIterator[bytes]:
+        source = self._source
+
+        if isinstance(source, bytes):
+            if source:
+                yield source
+            return
+
+        if isinstance(source, str):
+            # Reads happen in a worker thread, so that a slow disk doesn't
+            # block the event loop.
+            async with await anyio.open_file(source, 'rb') as file:
+                while True:
+                    chunk = await file.read(self._chunk_size)
+                    if not chunk:
+                        return
+
+                    yield chunk
+
+        if self._consumed:
+            raise RuntimeError(f'{self!r} was created from a stream and has already been sent')
+
+        self._consumed = True
+        async for chunk in source:
+            yield chunk
+
+
+# Files which cannot be handled by HTTPX, and need a streaming body
+_STREAMED = (File, os.PathLike)
+
+
+def _is_streamed(file: Any) -> bool:
+    return isinstance(file, _STREAMED) or hasattr(file, '__aiter__')
+
+
+def _file_items(files: Any) -> Sequence[Tuple[str, Any]]:
+    if isinstance(files, Mapping):
+        return list(files.items())
+    return files or ()
+
+
+class _MultipartStream:
+    """Multipart form-data body which streams its files.
+
+    Iterating over the body yields the form fields and the chunks of the
+    files in order. It can be iterated multiple times (for example when the
+    request is retried) as long as none of the files are single-use streams.
+    """
+
+    __slots__ = ('boundary', '_parts')
+
+    def __init__(
+        self,
+        data: Optional[Mapping[str, Any]],
+        files: Any
+    ) -> None:
+        self.boundary = uuid.uuid4().hex
+        boundary = self.boundary.encode('ascii')
+
+        parts: List[Union[bytes, File]] = []
+
+        for name, value in (data or {}).items():
+            if not isinstance(value, bytes):
+                value = str(value).encode('utf-8')
+
+            parts.append(
+                b'--' + boundary + b'\r\n'
+                b'Content-Disposition: form-data; name="' + name.encode('utf-8') + b'"\r\n\r\n'
+                + value + b'\r\n'
+            )
+
+        for name, file in _file_items(files):
+            file = _as_file(file)
+
+            parts.append(
+                b'--' + boundary + b'\r\n'
+                b'Content-Disposition: form-data; name="' + name.encode('utf-8')
+                + b'"; filename="' + file.filename.encode('utf-8') + b'"\r\n'
+                b'Content-Type: ' + file.content_type.encode('ascii') + b'\r\n\r\n'
+            )
+            parts.append(file)
+            parts.append(b'\r\n')
+
+        parts.append(b'--' + boundary + b'--\r\n')
+        self._parts = parts
+
+    @property
+    def content_type(self) -> str:
+        return f'multipart/form-data; boundary={self.boundary}'
+
+    @property
+    def length(self) -> Optional[int]:
+        """The length of the body, or None if a file has an unknown size."""
+        length = 0
+        for part in self._parts:
+            size = len(part) if isinstance(part, bytes) else part.size
+            if size is None:
+                return None
+
+            length += size
+
+        return length
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        for part in self._parts:
+            if isinstance(part, bytes):
+                yield part
+            else:
+                async for chunk in part:
+                    yield chunk
+
+
+def _as_file(file: Union[IO[bytes], bytes, File, 'os.PathLike[str]', AsyncIterable[bytes]]) -> File:
+    if isinstance(file, File):
+        return file
+    elif isinstance(file, (bytes, os.PathLike)) or hasattr(file, '__aiter__'):
+        return File(file)  # type: ignore
+
+    # A file object, which is read into memory like HTTPX does
+    name = os.path.basename(str(getattr(file, 'name', 'upload')))
+    return File(_read_file(file), name)  # type: ignore
+
+
+def _read_file(file: IO[bytes]) -> bytes:
+    # The body is built again for every attempt at a request, so the file
+    # is rewound like HTTPX does - otherwise retries would upload nothing.
+    try:
+        file.seek(0)
+    except (AttributeError, OSError):
+        # Not seekable, such as a pipe, which can only be read once anyways
+        pass
+
+    return file.read()
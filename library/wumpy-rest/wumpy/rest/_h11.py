@@ -0,0 +1,781 @@
+import base64
+import contextlib
+import logging
+import mimetypes
+import os
+import ssl
+import sys
+import time
+import uuid
+from types import TracebackType
+from typing import (
+    Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, Iterator, List,
+    Mapping, Optional, Sequence, Tuple, Type, Union
+)
+from urllib.parse import urlencode, urlsplit
+
+import anyio
+import anyio.abc
+import h11
+from typing_extensions import Self
+
+from ._asset import AssetStream
+from ._breaker import CircuitBreaker
+from ._budget import InvalidRequestBudget
+from ._cache import AssetCache
+from ._errors import (
+    Forbidden, NotFound, RateLimited, RequestException, ServerException
+)
+from ._files import _file_items, _is_streamed, _MultipartStream, _read_file
+from ._hooks import RequestEvent, RequestHook
+from ._impl import HTTPXRequester
+from ._ratelimiter import Ratelimiter
+from ._requester import (
+    FileContent, HTTPXFiles, RawResponse, _RetryingRequester
+)
+from ._route import Route
+from ._utils import MISSING, dump_json, load_json
+
+__all__ = (
+    'H11Requester',
+)
+
+
+_log = logging.getLogger(__name__)
+
+
+# Errors that mean the request failed because of the connection, these are
+# retried the same way as httpx.RequestError is by HTTPXRequester.
+NETWORK_ERRORS = (
+    OSError, anyio.BrokenResourceError, anyio.EndOfStream, anyio.ClosedResourceError,
+    h11.ProtocolError,
+)
+
+
+class _Headers(Mapping[str, str]):
+    """Case-insensitive, read-only mapping of response headers.
+
+    The ratelimiter and exceptions look up headers by their canonical names
+    (for example `X-RateLimit-Bucket`), while h11 lowercases all names.
+    """
+
+    __slots__ = ('_headers',)
+
+    def __init__(self, headers: Sequence[Tuple[bytes, bytes]]) -> None:
+        self._headers = {k.decode('ascii'): v.decode('latin-1') for k, v in headers}
+
+    def __getitem__(self, key: str) -> str:
+        return self._headers[key.lower()]
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and key.lower() in self._headers
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._headers)
+
+    def __len__(self) -> int:
+        return len(self._headers)
+
+    def __repr__(self) -> str:
+        return f'<Headers {self._headers!r}>'
+
+
+class _Response:
+    __slots__ = ('status_code', 'headers', 'content')
+
+    def __init__(self, status_code: int, headers: _Headers, content: bytes) -> None:
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+
+class _Connection:
+    """A single HTTP/1.1 connection, used for one request at a time."""
+
+    __slots__ = ('stream', 'conn', 'idle_since', 'received')
+
+    def __init__(self, stream: anyio.abc.ByteStream) -> None:
+        self.stream = stream
+        self.conn = h11.Connection(h11.CLIENT)
+        self.idle_since = time.perf_counter()
+
+        # Whether any data has been received for the current request
+        self.received = False
+
+    async def aclose(self) -> None:
+        with anyio.CancelScope(shield=True):
+            await self.stream.aclose()
+
+    async def send_request(
+        self,
+        method: bytes,
+        target: bytes,
+        headers: List[Tuple[bytes, bytes]],
+        body: Union[bytes, _MultipartStream]
+    ) -> None:
+        """Send a request, without reading the response."""
+        conn = self.conn
+        self.received = False
+
+        data = conn.send(h11.Request(method=method, target=target, headers=headers))
+        if isinstance(body, bytes):
+            if body:
+                data += conn.send(h11.Data(data=body))
+        else:
+            await self.stream.send(data)
+            data = b''
+
+            async for chunk in body:
+                await self.stream.send(conn.send(h11.Data(data=chunk)))
+
+        data += conn.send(h11.EndOfMessage())
+
+        await self.stream.send(data)
+
+    async def _next_event(self) -> Any:
+        conn = self.conn
+
+        while True:
+            event = conn.next_event()
+
+            if event is h11.NEED_DATA:
+                try:
+                    conn.receive_data(await self.stream.receive())
+                    self.received = True
+                except anyio.EndOfStream:
+                    # This tells h11 that the connection was closed, it will
+                    # raise a RemoteProtocolError if it was done so early.
+                    conn.receive_data(b'')
+            elif isinstance(event, h11.ConnectionClosed):
+                raise anyio.EndOfStream()
+            else:
+                return event
+
+    async def receive_response(self) -> h11.Response:
+        """Read the status line and headers of the response."""
+        while True:
+            event = await self._next_event()
+            if isinstance(event, h11.Response):
+                return event
+
+    async def receive_data(self) -> Optional[bytes]:
+        """Read the next chunk of the body, or None once it has been read."""
+        while True:
+            event = await self._next_event()
+            if isinstance(event, h11.Data):
+                return event.data
+            elif isinstance(event, h11.EndOfMessage):
+                return None
+
+    def finish(self) -> bool:
+        """Prepare the connection for the next request.
+
+        Returns:
+            Whether the connection can be re-used.
+        """
+        conn = self.conn
+
+        reusable = conn.our_state is h11.DONE and conn.their_state is h11.DONE
+        if reusable:
+            conn.start_next_cycle()
+            self.idle_since = time.perf_counter()
+
+        return reusable
+
+
+class _StreamedResponse:
+    """Response which body is read from the connection as it is iterated.
+
+    The connection (and its slot in the pool) is held until the response is
+    closed, or the body has been read - at which point it is returned to the
+    pool.
+    """
+
+    __slots__ = ('status_code', 'headers', '_pool', '_conn', '_token', '_timeout')
+
+    def __init__(
+        self,
+        pool: '_ConnectionPool',
+        conn: _Connection,
+        response: h11.Response,
+        token: object,
+        *,
+        timeout: float
+    ) -> None:
+        self.status_code = response.status_code
+        self.headers = _Headers(response.headers)
+
+        self._pool = pool
+        self._conn: Optional[_Connection] = conn
+        self._token = token
+        self._timeout = timeout
+
+    async def aiter_bytes(self, chunk_size: Optional[int] = None) -> AsyncIterator[bytes]:
+        while self._conn is not None:
+            try:
+                with anyio.fail_after(self._timeout):
+                    data = await self._conn.receive_data()
+            except BaseException:
+                await self.aclose()
+                raise
+
+            if data is None:
+                await self._release(self._conn.finish())
+                return
+
+            step = chunk_size or len(data)
+            for i in range(0, len(data), step):
+                yield data[i:i + step]
+
+    async def _release(self, reusable: bool) -> None:
+        conn = self._conn
+        if conn is None:
+            return
+
+        self._conn = None
+        await self._pool.release(conn, self._token, reusable=reusable)
+
+    async def aclose(self) -> None:
+        # The rest of the body is still on the connection, so it cannot be
+        # used for another request.
+        await self._release(False)
+
+
+class _ConnectionPool:
+    """Pool of persistent connections to one origin."""
+
+    __slots__ = ('host', 'port', 'tls', 'keepalive_expiry', '_idle', '_limiter')
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        *,
+        tls: bool,
+        max_connections: int,
+        keepalive_expiry: float
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.tls = tls
+        self.keepalive_expiry = keepalive_expiry
+
+        self._idle: List[_Connection] = []
+        self._limiter = anyio.CapacityLimiter(max_connections)
+
+    async def _connect(self) -> _Connection:
+        if self.tls:
+            context = ssl.create_default_context()
+            context.set_alpn_protocols(['http/1.1'])
+
+            stream = await anyio.connect_tcp(
+                self.host, self.port, ssl_context=context, tls_standard_compatible=False
+            )
+        else:
+            stream = await anyio.connect_tcp(self.host, self.port)
+
+        return _Connection(stream)
+
+    async def _get_idle(self) -> Optional[_Connection]:
+        now = time.perf_counter()
+
+        while self._idle:
+            # The most recently used connection is the least likely to have
+            # been closed by the server.
+            conn = self._idle.pop()
+
+            if now - conn.idle_since < self.keepalive_expiry:
+                return conn
+
+            await conn.aclose()
+
+        return None
+
+    async def _open(
+        self,
+        method: bytes,
+        target: bytes,
+        headers: List[Tuple[bytes, bytes]],
+        body: Union[bytes, _MultipartStream]
+    ) -> Tuple[_Connection, h11.Response]:
+        """Send a request and read the response up to its body.
+
+        This should be called while holding a slot of the pool's limiter.
+        """
+        conn = await self._get_idle()
+
+        while True:
+            reused = conn is not None
+            if conn is None:
+                conn = await self._connect()
+
+            try:
+                await conn.send_request(method, target, headers, body)
+                return conn, await conn.receive_response()
+            except NETWORK_ERRORS:
+                await conn.aclose()
+
+                # The server may close an idle connection at any moment,
+                # in which case nothing has been read from it. This is not
+                # a failure of the request, so it is retried once on a
+                # new connection.
+                if reused and not conn.received:
+                    conn = None
+                    continue
+                raise
+            except BaseException:
+                await conn.aclose()
+                raise
+
+    async def request(
+        self,
+        method: bytes,
+        target: bytes,
+        headers: List[Tuple[bytes, bytes]],
+        body: Union[bytes, _MultipartStream]
+    ) -> _Response:
+        async with self._limiter:
+            conn, response = await self._open(method, target, headers, body)
+
+            try:
+                chunks: List[bytes] = []
+                while True:
+                    chunk = await conn.receive_data()
+                    if chunk is None:
+                        break
+
+                    chunks.append(chunk)
+            except BaseException:
+                await conn.aclose()
+                raise
+
+            if conn.finish():
+                self._idle.append(conn)
+            else:
+                await conn.aclose()
+
+            return _Response(response.status_code, _Headers(response.headers), b''.join(chunks))
+
+    async def stream(
+        self,
+        method: bytes,
+        target: bytes,
+        headers: List[Tuple[bytes, bytes]],
+        *,
+        timeout: float
+    ) -> _StreamedResponse:
+        """Send a request and return the response without reading its body."""
+        # The slot is released by the response, possibly from another task
+        token = object()
+        await self._limiter.acquire_on_behalf_of(token)
+
+        try:
+            with anyio.fail_after(timeout):
+                conn, response = await self._open(method, target, headers, b'')
+        except BaseException:
+            self._limiter.release_on_behalf_of(token)
+            raise
+
+        return _StreamedResponse(self, conn, response, token, timeout=timeout)
+
+    async def release(self, conn: _Connection, token: object, *, reusable: bool) -> None:
+        """Release the connection of a streamed response, see `stream()`."""
+        try:
+            if reusable:
+                self._idle.append(conn)
+            else:
+                await conn.aclose()
+        finally:
+            self._limiter.release_on_behalf_of(token)
+
+    async def aclose(self) -> None:
+        while self._idle:
+            await self._idle.pop().aclose()
+
+
+def _encode_params(params: Mapping[str, Any]) -> str:
+    def primitive(value: Any) -> str:
+        if value is True:
+            return 'true'
+        elif value is False:
+            return 'false'
+        elif value is None:
+            return ''
+        return str(value)
+
+    return urlencode([
+        (k, primitive(item))
+        for k, v in params.items()
+        for item in (v if isinstance(v, (list, tuple)) else (v,))
+    ])
+
+
+def _encode_multipart(
+    data: Optional[Mapping[str, Any]],
+    files: Optional[HTTPXFiles]
+) -> Tuple[str, bytes]:
+    boundary = uuid.uuid4().hex.encode('ascii')
+    parts: List[bytes] = []
+
+    for name, value in (data or {}).items():
+        if not isinstance(value, bytes):
+            value = str(value).encode('utf-8')
+
+        parts.append(
+            b'--' + boundary + b'\r\n'
+            b'Content-Disposition: form-data; name="' + name.encode('utf-8') + b'"\r\n\r\n'
+            + value + b'\r\n'
+        )
+
+    items: Sequence[Tuple[str, FileContent]]
+    if isinstance(files, Mapping):
+        items = list(files.items())
+    else:
+        items = files or ()
+
+    for name, file in items:
+        filename = os.path.basename(str(getattr(file, 'name', 'upload')))
+        content = file if isinstance(file, bytes) else _read_file(file)
+        content_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+
+        parts.append(
+            b'--' + boundary + b'\r\n'
+            b'Content-Disposition: form-data; name="' + name.encode('utf-8')
+            + b'"; filename="' + filename.encode('utf-8') + b'"\r\n'
+            b'Content-Type: ' + content_type.encode('ascii') + b'\r\n\r\n'
+            + content + b'\r\n'
+        )
+
+    parts.append(b'--' + boundary + b'--\r\n')
+    return f'multipart/form-data; boundary={boundary.decode()}', b''.join(parts)
+
+
+class H11Requester(_RetryingRequester):
+    """Lightweight requester implementation built directly on h11 and AnyIO.
+
+    Compared to `HTTPXRequester` this skips most of the generic machinery of
+    HTTPX, since the requester only ever talks JSON to the same host. Only
+    HTTP/1.1 is supported, with persistent connections kept in a pool per
+    origin. Proxies and redirects are not supported.
+
+    Parameters:
+        token: The bot token to authorize requests with.
+        headers: Additional headers to send with every request.
+        ratelimiter: The ratelimiter to use, defaults to `DictRatelimiter`.
+        base_url: The base URL that routes are appended to.
+        timeout: The timeout of a request in seconds, including connecting.
+        max_connections: The maximum number of concurrent connections per host.
+        keepalive_expiry:
+            The number of seconds idle connections are kept in the pool for.
+        hooks:
+            Callables called with a `RequestEvent` after every attempt at a
+            request, see `HTTPXRequester`.
+        invalid_requests:
+            The counter of invalid requests used to shed requests, see
+            `HTTPXRequester`.
+        circuit_breaker:
+            The circuit breaker and retry budget used to fail requests fast,
+            see `HTTPXRequester`.
+        asset_cache:
+            The cache to look up CDN assets in before downloading them with
+            `read_asset()`, see `AssetCache`.
+    """
+
+    _network_errors = NETWORK_ERRORS
+
+    _stack: contextlib.AsyncExitStack
+
+    __slots__ = (
+        '_stack', '_base_url', '_headers', '_pools', '_timeout', '_max_connections',
+        '_keepalive_expiry',
+    )
+
+    def __init__(
+        self,
+        token: Optional[str] = None,
+        *,
+        headers: Dict[str, str] = {},
+        ratelimiter: Optional[Ratelimiter] = None,
+        base_url: str = 'https://discord.com/api/v10',
+        timeout: float = 5.0,
+        max_connections: int = 100,
+        keepalive_expiry: float = 5.0,
+        hooks: Iterable[RequestHook] = (),
+        invalid_requests: Optional[InvalidRequestBudget] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        asset_cache: Optional[AssetCache] = None,
+    ) -> None:
+        super().__init__(
+            ratelimiter=ratelimiter, hooks=hooks, invalid_requests=invalid_requests,
+            circuit_breaker=circuit_breaker, asset_cache=asset_cache
+        )
+
+        self._stack = contextlib.AsyncExitStack()
+
+        default_headers = {'User-Agent': self.build_user_agent()}
+        if token is not None:
+            default_headers['Authorization'] = f'Bot {token}'
+
+        self._headers = [
+            (k.encode('ascii'), v.encode('latin-1'))
+            for k, v in {**default_headers, **headers}.items()
+        ]
+
+        self._base_url = base_url.rstrip('/')
+        self._pools: Dict[Tuple[str, str, int], _ConnectionPool] = {}
+
+        self._timeout = timeout
+        self._max_connections = max_connections
+        self._keepalive_expiry = keepalive_expiry
+
+    async def __aenter__(self) -> Self:
+        await super().__aenter__()
+
+        try:
+            self._stack.push_async_callback(self._close_pools)
+            await self._stack.enter_async_context(self._ratelimiter)
+        except BaseException:
+            await self._stack.__aexit__(*sys.exc_info())
+            self._opened = False
+            raise
+
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_val: Optional[BaseException],
+        traceback: Optional[TracebackType]
+    ) -> None:
+        try:
+            await self._stack.__aexit__(exc_type, exc_val, traceback)
+        finally:
+            await super().__aexit__(exc_type, exc_val, traceback)
+
+    async def _close_pools(self) -> None:
+        pools = list(self._pools.values())
+        self._pools.clear()
+
+        for pool in pools:
+            await pool.aclose()
+
+    build_user_agent = staticmethod(HTTPXRequester.build_user_agent)
+
+    def _prepare(
+        self,
+        method: str,
+        url: str,
+        headers: Mapping[str, str],
+        params: Optional[Mapping[str, Any]],
+        content: Union[bytes, _MultipartStream]
+    ) -> Tuple[_ConnectionPool, bytes, List[Tuple[bytes, bytes]]]:
+        """Get the pool of the URL's origin, and the target and headers to send."""
+        parts = urlsplit(url)
+        tls = parts.scheme == 'https'
+
+        if parts.hostname is None:
+            raise ValueError(f'Invalid URL {url!r}, no host')
+
+        host = parts.hostname
+        port = parts.port or (443 if tls else 80)
+
+        pool = self._pools.get((parts.scheme, host, port))
+        if pool is None:
+            pool = self._pools[(parts.scheme, host, port)] = _ConnectionPool(
+                host, port, tls=tls, max_connections=self._max_connections,
+                keepalive_expiry=self._keepalive_expiry,
+            )
+
+        target = parts.path or '/'
+        query = '&'.join(q for q in (parts.query, _encode_params(params or {})) if q)
+        if query:
+            target += '?' + query
+
+        rheaders = [(b'Host', parts.netloc.encode('ascii')), *self._headers]
+        rheaders.extend((k.encode('ascii'), v.encode('latin-1')) for k, v in headers.items())
+
+        if not isinstance(content, bytes):
+            length = content.length
+            if length is None:
+                rheaders.append((b'Transfer-Encoding', b'chunked'))
+            else:
+                rheaders.append((b'Content-Length', str(length).encode('ascii')))
+        elif content or method not in {'GET', 'HEAD', 'DELETE'}:
+            rheaders.append((b'Content-Length', str(len(content)).encode('ascii')))
+
+        return pool, target.encode('ascii'), rheaders
+
+    async def _send(
+        self,
+        method: str,
+        url: str,
+        headers: Mapping[str, str],
+        *,
+        params: Optional[Mapping[str, Any]] = None,
+        content: Union[bytes, _MultipartStream] = b''
+    ) -> _Response:
+        """Send a request to a full URL using the pool of its origin."""
+        pool, target, rheaders = self._prepare(method, url, headers, params, content)
+
+        with anyio.fail_after(self._timeout):
+            return await pool.request(method.encode('ascii'), target, rheaders, content)
+
+    async def _request(
+        self,
+        route: Route,
+        headers: Dict[str, str],
+        ratelimit: Callable[[Mapping[str, str]], Awaitable[object]],
+        *,
+        json: Optional[Any] = None,
+        content: Optional[bytes] = None,
+        data: Optional[Dict[Any, Any]] = None,
+        files: Optional[HTTPXFiles] = None,
+        params: Optional[Dict[str, Any]] = None,
+        auth: Optional[Tuple[Union[str, bytes], Union[str, bytes]]] = None,
+        raw: bool = False,
+        event: Optional[RequestEvent] = None
+    ) -> Optional[Any]:
+        """Make one attempt at a successful request with h11.
+
+        See `_RetryingRequester._request()` for the parameters and exceptions.
+        """
+        body: Union[bytes, _MultipartStream, None] = content
+
+        if json is not None:
+            body = dump_json(json)
+            headers = {'Content-Type': 'application/json', **headers}
+        elif files is not None and any(_is_streamed(f) for _, f in _file_items(files)):
+            body = _MultipartStream(data, files)
+            headers = {'Content-Type': body.content_type, **headers}
+        elif data is not None or files is not None:
+            content_type, body = _encode_multipart(data, files)
+            headers = {'Content-Type': content_type, **headers}
+
+        if auth is not None:
+            username, password = (
+                v if isinstance(v, bytes) else v.encode('latin-1') for v in auth
+            )
+            credentials = base64.b64encode(username + b':' + password).decode('ascii')
+            headers = {'Authorization': f'Basic {credentials}', **headers}
+
+        start = time.perf_counter()
+        res = await self._send(
+            route.method, self._base_url + route.url, headers,
+            params=params, content=body or b''
+        )
+
+        if event is not None:
+            event.status_code = res.status_code
+            event.latency = time.perf_counter() - start
+            event.bytes_sent = (
+                len(body or b'') if not isinstance(body, _MultipartStream) else body.length or 0
+            )
+            event.bytes_received = len(res.content)
+
+        self._invalid_requests.record(res.status_code, res.headers)
+
+        await ratelimit(res.headers)
+
+        if res.status_code in {403, 404, 500, 502, 503, 504}:
+            if res.status_code == 403:
+                raise Forbidden(res.status_code, res.headers)
+            elif res.status_code == 404:
+                raise NotFound(res.status_code, res.headers)
+            else:
+                raise ServerException(res.status_code, res.headers)
+
+        if raw and 300 > res.status_code >= 200:
+            return RawResponse(res.status_code, res.headers, res.content)
+
+        payload: Union[Dict[str, Any], str] = ''
+
+        if res.headers.get('Content-Type') == 'application/json':
+            payload = load_json(res.content)
+        else:
+            payload = res.content.decode('utf-8')
+
+        if 300 > res.status_code >= 200:
+            return payload
+
+        if res.status_code == 429:
+            raise RateLimited(res.status_code, res.headers, payload)
+
+        raise RequestException(res.status_code, res.headers, payload)
+
+    async def _bypass_request(
+        self,
+        method: str,
+        url: str,
+        *,
+        json: Optional[Any] = None,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> bytes:
+        """Bypass retrying, ratelimit handling and json serialization.
+
+        Parameters:
+            method: The HTTP method to use.
+            url: The URL to make the request to.
+            json: JSON body for the request.
+            params: Query string parameters to use in the request.
+
+        Returns:
+            The response body read as bytes.
+        """
+        headers: Dict[str, str] = {}
+        content = b''
+
+        if json is not None:
+            content = dump_json(self._clean_dict(json))
+            headers['Content-Type'] = 'application/json'
+        if params is not None:
+            params = self._clean_dict(params)
+
+        res = await self._send(method, url, headers, params=params, content=content)
+
+        if 300 > res.status_code >= 200:
+            return res.content
+
+        if res.status_code == 403:
+            raise Forbidden(res.status_code, res.headers)
+        elif res.status_code == 404:
+            raise NotFound(res.status_code, res.headers)
+        elif res.status_code == 503:
+            raise ServerException(res.status_code, res.headers)
+        else:
+            raise RequestException(res.status_code, res.headers)
+
+    # Asset endpoint
+
+    def read_asset_stream(
+        self,
+        url: str,
+        *,
+        size: int = MISSING,
+        max_size: Optional[int] = None,
+        chunk_size: int = 64 * 1024
+    ) -> AssetStream:
+        """Stream the bytes of a CDN asset in chunks.
+
+        See `_RetryingRequester.read_asset_stream()` for the parameters.
+        """
+        async def open() -> _StreamedResponse:
+            pool, target, rheaders = self._prepare(
+                'GET', url, {}, self._clean_dict({'size': size}), b''
+            )
+            res = await pool.stream(b'GET', target, rheaders, timeout=self._timeout)
+
+            if not 300 > res.status_code >= 200:
+                await res.aclose()
+
+                if res.status_code == 403:
+                    raise Forbidden(res.status_code, res.headers)
+                elif res.status_code == 404:
+                    raise NotFound(res.status_code, res.headers)
+                elif res.status_code == 503:
+                    raise ServerException(res.status_code, res.headers)
+                else:
+                    raise RequestException(res.status_code, res.headers)
+
+            return res
+
+        return AssetStream(url, open, max_size=max_size, chunk_size=chunk_size)
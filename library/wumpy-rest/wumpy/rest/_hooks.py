@@ -0,0 +1,249 @@
+import bisect
+import logging
+from typing import Callable, Dict, List, Optional, Sequence
+
+from ._config import RatelimiterContext
+from ._errors import RateLimited
+from ._route import Route
+
+__all__ = (
+    'RequestEvent',
+    'RequestHook',
+    'RouteStats',
+    'RouteMetrics',
+)
+
+
+_log = logging.getLogger(__name__)
+
+
+class RequestEvent:
+    """Information about a single attempt at making a request.
+
+    An event is passed to the hooks of the requester after every attempt,
+    which means that a request that is retried produces multiple events.
+
+    Attributes:
+        route: The route the request was made to.
+        attempt: The attempt number of the request, starting at 0.
+        status_code:
+            The status code of the response, or None if no response was
+            received (for example because of a network error).
+        latency:
+            The amount of seconds the HTTP request took, excluding the time
+            spent waiting for ratelimits.
+        bucket_wait: The amount of seconds spent waiting for the bucket.
+        global_wait: The amount of seconds spent waiting for the global ratelimit.
+        ratelimited:
+            Whether the response was a 429, and if so whether it was because
+            of the bucket (`'bucket'`) or the global ratelimit (`'global'`).
+        bytes_sent: The size of the request body in bytes.
+        bytes_received: The size of the response body in bytes.
+        error: The exception raised by the attempt, if any.
+    """
+
+    route: Route
+    attempt: int
+    status_code: Optional[int]
+    latency: float
+    bucket_wait: float
+    global_wait: float
+    ratelimited: Optional[str]
+    bytes_sent: int
+    bytes_received: int
+    error: Optional[BaseException]
+
+    __slots__ = (
+        'route', 'attempt', 'status_code', 'latency', 'bucket_wait', 'global_wait',
+        'ratelimited', 'bytes_sent', 'bytes_received', 'error',
+    )
+
+    def __init__(self, route: Route, attempt: int) -> None:
+        self.route = route
+        self.attempt = attempt
+
+        self.status_code = None
+        self.latency = 0.0
+        self.bucket_wait = 0.0
+        self.global_wait = 0.0
+        self.ratelimited = None
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.error = None
+
+    def __repr__(self) -> str:
+        return (
+            f'<RequestEvent route={self.route} attempt={self.attempt}'
+            f' status_code={self.status_code}>'
+        )
+
+    def set_error(self, error: BaseException) -> None:
+        """Record the exception raised by the attempt.
+
+        Parameters:
+            error: The exception raised.
+        """
+        self.error = error
+
+        if isinstance(error, RateLimited):
+            # The scope header is the most reliable, but older API versions
+            # (and Cloudflare) only set the global header or body key.
+            if (
+                error.headers.get('X-RateLimit-Scope') == 'global'
+                or error.headers.get('X-RateLimit-Global') == 'true'
+                or (isinstance(error.data, dict) and error.data.get('global'))
+            ):
+                self.ratelimited = 'global'
+            else:
+                self.ratelimited = 'bucket'
+
+
+RequestHook = Callable[[RequestEvent], object]
+
+
+# Upper bounds (in seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class RouteStats:
+    """Aggregated statistics of the requests made to one route.
+
+    Attributes:
+        requests: The amount of attempts made, including retries.
+        retries: The amount of attempts which were retries.
+        errors: The amount of attempts that raised an exception.
+        bucket_ratelimited: The amount of 429 responses because of the bucket.
+        global_ratelimited: The amount of 429 responses because of the global ratelimit.
+        latency_buckets: The upper bounds of the latency histogram in seconds.
+        latency_counts:
+            The amount of attempts with a latency less than or equal to the
+            bound at the same index, the last count is for those above all
+            bounds.
+        latency_sum: The total latency of all attempts.
+        bucket_wait: The total time spent waiting for the bucket.
+        global_wait: The total time spent waiting for the global ratelimit.
+        bytes_sent: The total amount of bytes sent.
+        bytes_received: The total amount of bytes received.
+    """
+
+    requests: int
+    retries: int
+    errors: int
+    bucket_ratelimited: int
+    global_ratelimited: int
+
+    latency_buckets: Sequence[float]
+    latency_counts: List[int]
+    latency_sum: float
+
+    bucket_wait: float
+    global_wait: float
+
+    bytes_sent: int
+    bytes_received: int
+
+    __slots__ = (
+        'requests', 'retries', 'errors', 'bucket_ratelimited', 'global_ratelimited',
+        'latency_buckets', 'latency_counts', 'latency_sum', 'bucket_wait', 'global_wait',
+        'bytes_sent', 'bytes_received',
+    )
+
+    def __init__(self, latency_buckets: Sequence[float] = LATENCY_BUCKETS) -> None:
+        self.requests = 0
+        self.retries = 0
+        self.errors = 0
+        self.bucket_ratelimited = 0
+        self.global_ratelimited = 0
+
+        self.latency_buckets = latency_buckets
+        self.latency_counts = [0] * (len(latency_buckets) + 1)
+        self.latency_sum = 0.0
+
+        self.bucket_wait = 0.0
+        self.global_wait = 0.0
+
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    def __repr__(self) -> str:
+        return f'<RouteStats requests={self.requests} errors={self.errors}>'
+
+    def add(self, event: RequestEvent) -> None:
+        """Add an event to the statistics.
+
+        Parameters:
+            event: The event to add.
+        """
+        self.requests += 1
+        if event.attempt > 0:
+            self.retries += 1
+        if event.error is not None:
+            self.errors += 1
+
+        if event.ratelimited == 'bucket':
+            self.bucket_ratelimited += 1
+        elif event.ratelimited == 'global':
+            self.global_ratelimited += 1
+
+        self.latency_counts[bisect.bisect_left(self.latency_buckets, event.latency)] += 1
+        self.latency_sum += event.latency
+
+        self.bucket_wait += event.bucket_wait
+        self.global_wait += event.global_wait
+
+        self.bytes_sent += event.bytes_sent
+        self.bytes_received += event.bytes_received
+
+
+class RouteMetrics:
+    """In-memory aggregator of request events, grouped by route.
+
+    Pass an instance as a hook to the requester and read the statistics from
+    `routes`, for example periodically to export them:
+
+    ```python
+    metrics = RouteMetrics()
+
+    async with APIClient(token, hooks=[metrics]) as api:
+        ...
+
+    for endpoint, stats in metrics.routes.items():
+        print(f'{endpoint}: {stats.requests} requests, {stats.bucket_ratelimited} 429s')
+    ```
+
+    Attributes:
+        routes:
+            Statistics by the endpoint of the route, which is the HTTP method
+            and path template (such as `GET /channels/{channel_id}`).
+    """
+
+    routes: Dict[str, RouteStats]
+
+    __slots__ = ('routes', '_latency_buckets')
+
+    def __init__(self, *, latency_buckets: Sequence[float] = LATENCY_BUCKETS) -> None:
+        self.routes = {}
+        self._latency_buckets = tuple(sorted(latency_buckets))
+
+    def __call__(self, event: RequestEvent) -> None:
+        stats = self.routes.get(event.route.endpoint)
+        if stats is None:
+            stats = self.routes[event.route.endpoint] = RouteStats(self._latency_buckets)
+
+        stats.add(event)
+
+    def reset(self) -> None:
+        """Clear all statistics collected so far."""
+        self.routes.clear()
+
+
+def _dispatch(hooks: Sequence[RequestHook], event: RequestEvent, ctx: RatelimiterContext) -> None:
+    """Fill in the ratelimiter's timings and call all hooks with the event."""
+    event.bucket_wait = ctx.bucket_wait
+    event.global_wait = ctx.global_wait
+
+    for hook in hooks:
+        try:
+            hook(event)
+        except Exception:
+            _log.exception(f'Ignoring exception in request hook {hook!r}')
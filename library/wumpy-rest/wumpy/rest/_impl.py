@@ -1,12 +1,12 @@
 import contextlib
 import logging
 import sys
+import time
 from types import TracebackType
 from typing import (
-    Any, Awaitable, Callable, Dict, Mapping, Optional, Tuple, Type, TypeVar,
-    Union, cast, overload
+    Any, Awaitable, Callable, Dict, Iterable, Mapping, Optional, Tuple, Type,
+    TypeVar, Union, cast, overload
 )
-from urllib.parse import quote as urlquote
 
 import anyio
 import anyio.abc
@@ -14,13 +14,19 @@ import httpx
 from typing_extensions import Self
 
 from . import endpoints
-from ._config import RatelimiterContext
+from ._asset import AssetStream
+from ._breaker import CircuitBreaker
+from ._budget import InvalidRequestBudget
+from ._cache import AssetCache
 from ._errors import (
-    Forbidden, HTTPException, NotFound, RateLimited, RequestException,
-    ServerException
+    Forbidden, NotFound, RateLimited, RequestException, ServerException
+)
+from ._files import _file_items, _is_streamed, _MultipartStream
+from ._hooks import RequestEvent, RequestHook
+from ._ratelimiter import Ratelimiter
+from ._requester import (
+    HTTPXFiles, RawResponse, _current_api, _RetryingRequester
 )
-from ._ratelimiter import DictRatelimiter, Ratelimiter
-from ._requester import HTTPXFiles, Requester, _current_api
 from ._route import Route
 from ._utils import MISSING, dump_json, load_json
 
@@ -34,14 +40,72 @@ _log = logging.getLogger(__name__)
 T = TypeVar('T')
 
 
-class HTTPXRequester(Requester):
+class HTTPXRequester(_RetryingRequester):
+    """Requester implementation using HTTPX to make the requests.
+
+    The connection pool used by HTTPX can be tuned with the parameters below.
+    Since all requests are made to the same host, the size of the pool limits
+    how many requests can be in-flight at once when using HTTP/1.1. HTTP/2
+    instead multiplexes all requests over a single connection.
+
+    Parameters:
+        token: The bot token to authorize requests with.
+        headers: Additional headers to send with every request.
+        ratelimiter: The ratelimiter to use, defaults to `DictRatelimiter`.
+        base_url: The base URL that routes are appended to.
+        proxy: The URL of a proxy to send requests through.
+        timeout:
+            The timeout of requests in seconds, or a `httpx.Timeout` instance
+            to configure separate timeouts for connecting, reading, writing
+            and acquiring a connection from the pool.
+        http2:
+            Whether to use HTTP/2 when the server supports it. If the base URL
+            uses plain `http://` (such as a local proxy), HTTP/2 is used with
+            prior knowledge since HTTPX does not support upgrading to it.
+        max_connections:
+            The maximum number of concurrent connections, None for no limit.
+        max_keepalive_connections:
+            The maximum number of idle connections kept in the pool, None for
+            no limit.
+        keepalive_expiry:
+            The number of seconds idle connections are kept in the pool for.
+        warmup_connections:
+            The number of connections to open to the base URL in the
+            background when entered. This means that the first request does
+            not need to wait for DNS resolution and TCP and TLS handshakes.
+        keep_warm:
+            The number of seconds of no requests after which the connections
+            are kept warm by making a lightweight request. This should be
+            lower than `keepalive_expiry`, and requires `warmup_connections`.
+        hooks:
+            Callables called with a `RequestEvent` after every attempt at a
+            request, such as `RouteMetrics`, to instrument requests.
+        invalid_requests:
+            The counter of invalid requests, used to shed requests before
+            Discord bans the IP address. A new `InvalidRequestBudget` is
+            created by default, pass an instance to configure it or to share
+            it between requesters.
+        circuit_breaker:
+            The circuit breaker and retry budget used to fail requests fast
+            when Discord is having problems. A new `CircuitBreaker` is created
+            by default, pass an instance to configure it.
+        asset_cache:
+            The cache to look up CDN assets in before downloading them with
+            `read_asset()`, see `AssetCache`.
+    """
+
+    _network_errors = (httpx.RequestError,)
 
     _session: httpx.AsyncClient
-    _ratelimiter: Ratelimiter
     _stack: contextlib.AsyncExitStack
 
+    _warmup_connections: int
+    _keep_warm: Optional[float]
+    _last_request: float
+
     __slots__ = (
-        '_ratelimiter', '_session', '_stack', '_base_url',
+        '_session', '_stack', '_base_url', '_warmup_connections', '_keep_warm',
+        '_last_request',
     )
 
     def __init__(
@@ -52,9 +116,25 @@ class HTTPXRequester(Requester):
         ratelimiter: Optional[Ratelimiter] = None,
         base_url: str = 'https://discord.com/api/v10',
         proxy: Optional[str] = None,
-        timeout: float = 5.0,
+        timeout: Union[float, httpx.Timeout] = 5.0,
+        http2: bool = False,
+        max_connections: Optional[int] = 100,
+        max_keepalive_connections: Optional[int] = 20,
+        keepalive_expiry: Optional[float] = 5.0,
+        warmup_connections: int = 0,
+        keep_warm: Optional[float] = None,
+        hooks: Iterable[RequestHook] = (),
+        invalid_requests: Optional[InvalidRequestBudget] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        asset_cache: Optional[AssetCache] = None,
     ) -> None:
-        super().__init__()
+        super().__init__(
+            ratelimiter=ratelimiter, hooks=hooks, invalid_requests=invalid_requests,
+            circuit_breaker=circuit_breaker, asset_cache=asset_cache
+        )
+
+        if keep_warm is not None and warmup_connections <= 0:
+            raise ValueError("'keep_warm' requires 'warmup_connections' to be set")
 
         self._stack = contextlib.AsyncExitStack()
 
@@ -64,17 +144,34 @@ class HTTPXRequester(Requester):
 
         self._session = httpx.AsyncClient(
             headers={**default_headers, **headers},
-            proxies=proxy, follow_redirects=True, timeout=timeout
+            proxies=proxy, follow_redirects=True, timeout=timeout,
+            http1=not (http2 and base_url.startswith('http://')), http2=http2,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            )
         )
-        self._ratelimiter = ratelimiter if ratelimiter is not None else DictRatelimiter()
         self._base_url = base_url
 
+        self._warmup_connections = warmup_connections
+        self._keep_warm = keep_warm
+        self._last_request = time.perf_counter()
+
     async def __aenter__(self) -> Self:
         await super().__aenter__()
 
         try:
             await self._stack.enter_async_context(self._session)
             await self._stack.enter_async_context(self._ratelimiter)
+
+            if self._warmup_connections > 0:
+                tasks = await self._stack.enter_async_context(anyio.create_task_group())
+                # The exit stack is LIFO, so this is called before the task
+                # group waits for its tasks to finish.
+                self._stack.callback(tasks.cancel_scope.cancel)
+
+                tasks.start_soon(self._keep_connections_warm)
         except BaseException:
             # If any of the __aenter__s fails in the above block the finalizer
             # won't be called correctly. This is important to handle if we get
@@ -120,6 +217,43 @@ class HTTPXRequester(Requester):
 
         return agent
 
+    async def warm_up(self, connections: int = 1) -> None:
+        """Open connections to the base URL ahead of making requests.
+
+        This makes lightweight `HEAD` requests concurrently, which means that
+        the connection pool will have that many connections open when using
+        HTTP/1.1. The responses are discarded, and errors are only logged.
+
+        Parameters:
+            connections: The number of connections to open.
+        """
+        async def ping() -> None:
+            try:
+                res = await self.session.head(self._base_url + '/gateway')
+                await res.aclose()
+            except httpx.HTTPError as exc:
+                _log.debug(f'Failed to warm up connection to {self._base_url}: {exc!r}')
+
+        async with anyio.create_task_group() as tasks:
+            for _ in range(connections):
+                tasks.start_soon(ping)
+
+    async def _keep_connections_warm(self) -> None:
+        await self.warm_up(self._warmup_connections)
+
+        if self._keep_warm is None:
+            return
+
+        while True:
+            idle = time.perf_counter() - self._last_request
+            if idle < self._keep_warm:
+                await anyio.sleep(self._keep_warm - idle)
+                continue
+
+            _log.debug('Keeping connections warm after being idle')
+            self._last_request = time.perf_counter()
+            await self.warm_up(self._warmup_connections)
+
     async def _request(
         self,
         route: Route,
@@ -127,53 +261,53 @@ class HTTPXRequester(Requester):
         ratelimit: Callable[[Mapping[str, str]], Awaitable[object]],
         *,
         json: Optional[Any] = None,
+        content: Optional[bytes] = None,
         data: Optional[Dict[Any, Any]] = None,
         files: Optional[HTTPXFiles] = None,
         params: Optional[Dict[str, Any]] = None,
-        auth: Optional[Tuple[Union[str, bytes], Union[str, bytes]]] = None
+        auth: Optional[Tuple[Union[str, bytes], Union[str, bytes]]] = None,
+        raw: bool = False,
+        event: Optional[RequestEvent] = None
     ) -> Optional[Any]:
-        """Make one attempt at a successful request.
+        """Make one attempt at a successful request with HTTPX.
 
-        Parameters:
-            route: The route to make the request to.
-            headers: Headers to use when making the request.
-            ratelimit: Ratelimit lock for this route.
-            json: Dictionary to serialize to JSON and send as the request body.
-            data: Dictionary to send as a multipart form-data request body.
-            files: Additional files to include in the request.
-            params: Query string parameters for the request.
-            auth:
-                Tuple with two items: (username, password) to authorize with
-                using BASIC. This parameter is not often used, as Discord
-                primarily authenticates using the Authorization header.
-
-        Raises:
-            Forbidden: The request received a 403 Forbidden response.
-            NotFound: The request received a 404 Not Found response.
-            ServerException:
-                The request received a 500, 502, 503 or 504 response.
-            Ratelimited: The request received a 429 Too Many Requests response.
-            HTTPException:
-                The request received a non-successful unknown response. Simply
-                indicates a general failure.
-
-        Returns:
-            The JSON deserialized body of the response, or None if the request
-            was unsuccessful and should be retried.
+        See `_RetryingRequester._request()` for the parameters and exceptions.
         """
+        body: Union[bytes, _MultipartStream, None] = content
+
         if json is not None:
-            content = dump_json(json)
+            body = dump_json(json)
             headers = {'Content-Type': 'application/json', **headers}
-        else:
-            content = None
-
+        elif files is not None and any(_is_streamed(f) for _, f in _file_items(files)):
+            # HTTPX reads files into memory, so these are streamed by us
+            body = _MultipartStream(data, files)
+            headers = {'Content-Type': body.content_type, **headers}
+
+            length = body.length
+            if length is not None:
+                headers['Content-Length'] = str(length)
+
+            data = files = None
+        elif data is not None and files is None:
+            # Without files HTTPX URL-encodes the data, which formats bytes
+            # (such as payload_json from dump_json()) with str().
+            data = {k: v.decode('utf-8') if isinstance(v, bytes) else v for k, v in data.items()}
+
+        start = self._last_request = time.perf_counter()
         res = await self.session.request(
             route.method, self._base_url + route.url,
-            headers=headers, content=content, data=data, files=files, auth=auth, params=params
+            headers=headers, content=body, data=data, files=files, auth=auth, params=params
         )
 
+        if event is not None:
+            event.status_code = res.status_code
+            event.latency = time.perf_counter() - start
+            event.bytes_sent = int(res.request.headers.get('Content-Length', 0))
+
         # Update rate limit information if we have received it, as well as do
         # any form of ratelimit handling.
+        self._invalid_requests.record(res.status_code, res.headers)
+
         await ratelimit(res.headers)
 
         if res.status_code in {403, 404, 500, 502, 503, 504}:
@@ -189,16 +323,25 @@ class HTTPXRequester(Requester):
                 raise ServerException(res.status_code, res.headers)
 
         # The status code is now either 300> or >= 200 or 429
-        text = (await res.aread()).decode(encoding='utf-8')
+        body = await res.aread()
+
+        if event is not None:
+            event.latency = time.perf_counter() - start
+            event.bytes_received = len(body)
+
+        if raw and 300 > res.status_code >= 200:
+            return RawResponse(res.status_code, res.headers, body)
 
         # This is for the typing, because load_json returns Any and screws a
         # lot of things up..
         payload: Union[Dict[str, Any], str] = ''
 
+        # The JSON parser accepts bytes directly, which saves decoding (and
+        # copying) the whole body to a string first.
         if res.headers.get('Content-Type') == 'application/json':
-            payload = load_json(text)
+            payload = load_json(body)
         else:
-            payload = text
+            payload = body.decode('utf-8')
 
         # Successful request
         if 300 > res.status_code >= 200:
@@ -210,104 +353,6 @@ class HTTPXRequester(Requester):
 
         raise RequestException(res.status_code, res.headers, payload)
 
-    async def request(
-        self,
-        route: Route,
-        *,
-        reason: str = MISSING,
-        json: Optional[Any] = None,
-        data: Optional[Dict[Any, Any]] = None,
-        files: Optional[HTTPXFiles] = None,
-        params: Optional[Dict[str, Any]] = None,
-        auth: Optional[Tuple[Union[str, bytes], Union[str, bytes]]] = None,
-        headers: Optional[Mapping[str, str]] = None
-    ) -> Any:
-        """Send a request to the Discord API, respecting rate limits.
-
-        If the `json`, `data` or `params` keyword-arguments contains values
-        that are MISSING, they will be removed before being passed to HTTPX.
-
-        This function returns a deserialized JSON object if Content-Type is
-        `application/json`, otherwise a string. Commonly it is known by the
-        caller itself what the response will be, in which case it will be
-        a burden to narrow down the type unneccesarily. For that reason this
-        function is annotated as returning `Any`.
-
-        Parameters:
-            route: The route to make the request to.
-            reason:
-                The reason to insert into the Audit Log for this change, not
-                supported by all endpoints.
-            json: Dictionary to serialize to JSON and send as the request body.
-            data: Dictionary to send as a multipart form-data request body.
-            files: Additional files to include in the request.
-            params: Query string parameters for the request.
-            headers: Headers to use when making the request.
-            auth:
-                Tuple with two items: (username, password) to authorize with
-                using BASIC. This parameter is not used, as Discord primarily
-                authenticates using the Authorization header.
-            headers: Headers to send in the request.
-
-        Raises:
-            Forbidden: The request received a 403 Forbidden response.
-            NotFound: The request received a 404 Not Found response.
-            ServerException:
-                The request received a 503 Service Unavailable response, this
-                is different from 500, 502 or 504 responses as they are
-                gracefully retried.
-            HTTPException:
-                The request received a non-successful unknown response. Simply
-                indicates a general failure, can also be raised if no attempt
-                at the request was successful.
-
-        Returns:
-            The JSON deserialized body of the response.
-        """
-
-        # Clean up MISSING values
-        if isinstance(json, dict):
-            json = self._clean_dict(json)
-        if data is not None:
-            data = self._clean_dict(data)
-        if params is not None:
-            params = self._clean_dict(params)
-
-        rheaders = dict(headers or {})
-        if reason is not MISSING:
-            rheaders['X-Audit-Log-Reason'] = urlquote(reason, safe='/ ')
-
-        for attempt in range(3):
-            async with self._ratelimiter(route, RatelimiterContext()) as rl:
-                try:
-                    res = await self._request(
-                        route, rheaders, rl,
-                        json=json, data=data, files=files, params=params,
-                        auth=auth
-                    )
-                except httpx.RequestError as error:
-                    if attempt < 3:
-                        _log.warning(
-                            f'Request to {route} failed with a HTTPX RequestError;'
-                            f' retrying request (attempt {attempt}).'
-                        )
-                        # Exponentially backoff and try again
-                        await anyio.sleep(1 + attempt * 2)
-                        continue
-
-                    # Even the last attempt failed, so we want to make sure it
-                    # reaches the user.
-                    raise error
-
-                return res
-
-            # If we reach here, that means that an exception happened and the
-            # ratelimiter silenced it. It is up to the ratelimiter to log a
-            # message with higher severity depending on the reason it did so.
-            _log.info(f'Retrying request to {route} (attempt {attempt}).')
-
-        raise HTTPException(f'All attempts at {route} were unsuccessful.')
-
     async def _bypass_request(
         self,
         method: str,
@@ -354,17 +399,52 @@ class HTTPXRequester(Requester):
 
     # Asset endpoint
 
-    async def read_asset(self, url: str, *, size: int = MISSING) -> bytes:
-        """Read the bytes of a CDN asset.
+    def read_asset_stream(
+        self,
+        url: str,
+        *,
+        size: int = MISSING,
+        max_size: Optional[int] = None,
+        chunk_size: int = 64 * 1024
+    ) -> AssetStream:
+        """Stream the bytes of a CDN asset in chunks.
+
+        Unlike `read_asset()` the asset is never held in memory as a whole,
+        which is useful when processing or saving large attachments.
 
         Parameters:
             url: The full URL to the asset.
             size: The value of the 'size' query parameter.
+            max_size:
+                The maximum size of the asset in bytes. If the asset is
+                larger, `AssetTooLarge` is raised as soon as this is known.
+            chunk_size: The size of the chunks to read.
 
         Returns:
-            The CDN asset read as bytes.
+            An asynchronous iterator of the chunks of the asset, which can
+            also be used as an asynchronous context manager.
         """
-        return await self._bypass_request('GET', url, params={'size': size})
+        async def open() -> httpx.Response:
+            res = await self.session.send(
+                self.session.build_request('GET', url, params=self._clean_dict({'size': size})),
+                stream=True
+            )
+
+            if not 300 > res.status_code >= 200:
+                await res.aclose()
+
+                if res.status_code == 403:
+                    raise Forbidden(res.status_code, res.headers)
+                elif res.status_code == 404:
+                    raise NotFound(res.status_code, res.headers)
+                elif res.status_code == 503:
+                    raise ServerException(res.status_code, res.headers)
+                else:
+                    raise RequestException(res.status_code, res.headers)
+
+            return res
+
+        return AssetStream(url, open, max_size=max_size, chunk_size=chunk_size)
 
 
 class APIClient(endpoints.ApplicationCommandEndpoints, endpoints.ChannelEndpoints,
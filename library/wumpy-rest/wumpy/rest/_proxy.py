@@ -0,0 +1,517 @@
+import argparse
+import logging
+import math
+import os
+import re
+from types import TracebackType
+from typing import Any, Dict, List, Mapping, Optional, Tuple, Type, Union
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+import anyio
+import anyio.abc
+import h11
+from typing_extensions import Self
+
+from ._config import RatelimiterContext
+from ._errors import CircuitOpen, HTTPException, RequestException
+from ._impl import HTTPXRequester
+from ._requester import Requester
+from ._route import Route
+from ._utils import dump_json
+
+__all__ = (
+    'PassthroughRatelimiter',
+    'RatelimitProxy',
+)
+
+
+_log = logging.getLogger(__name__)
+
+
+# The version prefix is optional, so that clients using any API version are
+# forwarded to the version the proxy's requester uses.
+API_PREFIX = re.compile(r'^/api(/v\d+)?')
+
+# Request headers forwarded by the proxy, everything else (most importantly
+# Authorization) is set by the proxy's requester.
+FORWARDED_HEADERS = frozenset({'content-type', 'x-audit-log-reason'})
+
+# The paths of the endpoints, which incoming paths are matched against so
+# that requests through the proxy are ratelimited the same way (with the same
+# routes) as when made directly.
+ROUTES = (
+    '/applications/{application_id}/commands',
+    '/applications/{application_id}/commands/{command_id}',
+    '/applications/{application_id}/guilds/{guild_id}/commands',
+    '/applications/{application_id}/guilds/{guild_id}/commands/permissions',
+    '/applications/{application_id}/guilds/{guild_id}/commands/{command_id}',
+    '/applications/{application_id}/guilds/{guild_id}/commands/{command_id}/permissions',
+    '/channels/{channel_id}',
+    '/channels/{channel_id}/followers',
+    '/channels/{channel_id}/invites',
+    '/channels/{channel_id}/messages',
+    '/channels/{channel_id}/messages/bulk-delete',
+    '/channels/{channel_id}/messages/{message_id}',
+    '/channels/{channel_id}/messages/{message_id}/crosspost',
+    '/channels/{channel_id}/messages/{message_id}/reactions',
+    '/channels/{channel_id}/messages/{message_id}/reactions/{emoji}',
+    '/channels/{channel_id}/messages/{message_id}/reactions/{emoji}/@me',
+    '/channels/{channel_id}/messages/{message_id}/reactions/{emoji}/{user_id}',
+    '/channels/{channel_id}/messages/{message_id}/threads',
+    '/channels/{channel_id}/permissions/{overwrite_id}',
+    '/channels/{channel_id}/pins',
+    '/channels/{channel_id}/pins/{message_id}',
+    '/channels/{channel_id}/thread-members',
+    '/channels/{channel_id}/thread-members/@me',
+    '/channels/{channel_id}/thread-members/{user_id}',
+    '/channels/{channel_id}/threads',
+    '/channels/{channel_id}/threads/archived/public',
+    '/channels/{channel_id}/typing',
+    '/channels/{channel_id}/webhooks',
+    '/gateway',
+    '/gateway/bot',
+    '/guilds',
+    '/guilds/templates/{template_code}',
+    '/guilds/{guild_id}',
+    '/guilds/{guild_id}/audit-logs',
+    '/guilds/{guild_id}/auto-moderation/rules',
+    '/guilds/{guild_id}/auto-moderation/rules/{automod_rule}',
+    '/guilds/{guild_id}/bans',
+    '/guilds/{guild_id}/bans/{user_id}',
+    '/guilds/{guild_id}/channels',
+    '/guilds/{guild_id}/emojis',
+    '/guilds/{guild_id}/emojis/{emoji_id}',
+    '/guilds/{guild_id}/integrations',
+    '/guilds/{guild_id}/integrations/{integration_id}',
+    '/guilds/{guild_id}/invites',
+    '/guilds/{guild_id}/members',
+    '/guilds/{guild_id}/members/@me/nick',
+    '/guilds/{guild_id}/members/search',
+    '/guilds/{guild_id}/members/{user_id}',
+    '/guilds/{guild_id}/members/{user_id}/roles/{role_id}',
+    '/guilds/{guild_id}/mfa',
+    '/guilds/{guild_id}/preview',
+    '/guilds/{guild_id}/prune',
+    '/guilds/{guild_id}/regions',
+    '/guilds/{guild_id}/roles',
+    '/guilds/{guild_id}/roles/{role_id}',
+    '/guilds/{guild_id}/scheduled-events',
+    '/guilds/{guild_id}/scheduled-events/{scheduled_event}',
+    '/guilds/{guild_id}/scheduled-events/{scheduled_event}/users',
+    '/guilds/{guild_id}/stickers',
+    '/guilds/{guild_id}/stickers/{sticker_id}',
+    '/guilds/{guild_id}/templates',
+    '/guilds/{guild_id}/templates/{template_code}',
+    '/guilds/{guild_id}/threads/active',
+    '/guilds/{guild_id}/vanity-url',
+    '/guilds/{guild_id}/voice-states/@me',
+    '/guilds/{guild_id}/voice-states/{user_id}',
+    '/guilds/{guild_id}/webhooks',
+    '/guilds/{guild_id}/welcome-screen',
+    '/guilds/{guild_id}/widget',
+    '/guilds/{guild_id}/widget.json',
+    '/interactions/{interaction_id}/{interaction_token}/callback',
+    '/invites/{invite_code}',
+    '/stage-instances',
+    '/stage-instances/{channel_id}',
+    '/sticker-packs',
+    '/stickers/{sticker_id}',
+    '/users/@me',
+    '/users/@me/channels',
+    '/users/@me/guilds',
+    '/users/@me/guilds/{guild_id}',
+    '/users/{user_id}',
+    '/voice/regions',
+    '/webhooks/{application_id}/{interaction_token}',
+    '/webhooks/{application_id}/{interaction_token}/messages/@original',
+    '/webhooks/{application_id}/{interaction_token}/messages/{message_id}',
+    '/webhooks/{webhook_id}',
+    '/webhooks/{webhook_id}/{webhook_token}',
+    '/webhooks/{webhook_id}/{webhook_token}/messages/@original',
+    '/webhooks/{webhook_id}/{webhook_token}/messages/{message_id}',
+)
+
+# Interaction tokens start with the base64 encoding of 'interaction:', which
+# is the only way to tell interaction followups apart from webhooks by path.
+PARAM_PATTERNS = {
+    'interaction_token': r'aW50ZXJhY3Rpb246[^/]*',
+}
+
+# Segments followed by an ID which is a major parameter, used for paths that
+# do not match any of the routes above.
+ID_NAMES = {
+    'channels': 'channel_id',
+    'guilds': 'guild_id',
+    'webhooks': 'webhook_id',
+}
+
+
+def _compile_route(path: str) -> 're.Pattern[str]':
+    def param(match: 're.Match[str]') -> str:
+        name = match.group(1)
+
+        if name in PARAM_PATTERNS:
+            pattern = PARAM_PATTERNS[name]
+        elif name.endswith('_id'):
+            pattern = r'\d+'
+        else:
+            pattern = r'[^/]+'
+
+        return f'(?P<{name}>{pattern})'
+
+    return re.compile(re.sub(r'\\\{(\w+)\\\}', param, re.escape(path)) + '$')
+
+
+def _route_specificity(path: str) -> Tuple[int, int]:
+    segments = path.split('/')
+
+    literals = sum('{' not in segment for segment in segments)
+    constrained = sum(
+        segment[1:-1] in PARAM_PATTERNS or segment.endswith('_id}')
+        for segment in segments
+    )
+    return literals, constrained
+
+
+# The routes by their first segment, with the most specific routes first so
+# that for example 'bulk-delete' is not matched as a message ID.
+_routes: Dict[str, List[Tuple[str, 're.Pattern[str]']]] = {}
+for _path in sorted(ROUTES, key=_route_specificity, reverse=True):
+    _routes.setdefault(_path.split('/')[1], []).append((_path, _compile_route(_path)))
+
+
+def _parse_route(method: str, path: str) -> Route:
+    """Reconstruct the route of a path, for the ratelimiter to key on.
+
+    The path is matched against the paths of the endpoints (see `ROUTES`),
+    so that the route is the same as when the request is made directly. For
+    unknown paths only the IDs are replaced with placeholders, named after
+    the major parameter they are or their position.
+
+    Raises:
+        ValueError: The path contains braces, which no endpoint has.
+    """
+    path = '/' + path.strip('/')
+    if '{' in path or '}' in path:
+        raise ValueError(f'Invalid path: {path!r}')
+
+    for template, pattern in _routes.get(path.split('/')[1], ()):
+        match = pattern.match(path)
+        if match is None:
+            continue
+
+        return Route(method, template, **{
+            name: int(value) if name.endswith('_id') else unquote(value)
+            for name, value in match.groupdict().items()
+        })
+
+    template: List[str] = []
+    params: Dict[str, Union[str, int]] = {}
+
+    segments = path.split('/')
+    for i, segment in enumerate(segments):
+        if not segment.isdigit():
+            template.append(segment)
+            continue
+
+        name = ID_NAMES.get(segments[i - 1], f'param{i}')
+        params[name] = int(segment)
+        template.append('{' + name + '}')
+
+    return Route(method, '/'.join(template), **params)
+
+
+class _PassthroughLock:
+    __slots__ = ()
+
+    async def __aenter__(self) -> Any:
+        return _update
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_val: Optional[BaseException],
+        exc_tb: Optional[TracebackType]
+    ) -> None:
+        pass
+
+
+async def _update(headers: Mapping[str, str]) -> None:
+    pass
+
+
+class PassthroughRatelimiter:
+    """Ratelimiter that lets all requests through immediately.
+
+    This is meant for clients of `RatelimitProxy`, which applies the
+    ratelimits centrally. Requests are also not retried on errors, as the
+    proxy has already done so before responding.
+    """
+
+    __slots__ = ()
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_val: Optional[BaseException],
+        exc_tb: Optional[TracebackType]
+    ) -> None:
+        pass
+
+    def __call__(self, route: Route, ctx: RatelimiterContext) -> _PassthroughLock:
+        return _PassthroughLock()
+
+
+class RatelimitProxy:
+    """Local HTTP server forwarding requests to Discord, ratelimiting them.
+
+    When multiple processes share the same token, they all have to respect
+    the same global ratelimit and buckets without knowing about each other.
+    Instead, they can all make their requests through the proxy which uses
+    one requester (and therefore one ratelimiter) for all of them.
+
+    The proxy accepts the same paths as the Discord API and authorizes the
+    requests with its own token, so clients do not need to know the token.
+    Clients should use `PassthroughRatelimiter` since the proxy only
+    responds once the request has been ratelimited and retried.
+
+    Examples:
+
+        ```python
+        async with RatelimitProxy(token, port=8080):
+            await anyio.sleep_forever()
+        ```
+
+        In each client process:
+
+        ```python
+        api = APIClient(
+            base_url='http://127.0.0.1:8080/api/v10',
+            ratelimiter=PassthroughRatelimiter()
+        )
+        ```
+
+        The proxy can also be started from the command line, reading the
+        token from the `DISCORD_TOKEN` environment variable:
+
+        ```bash
+        wumpy-rest-proxy --port 8080
+        ```
+
+    Attributes:
+        host: The host the server listens on.
+        requester: The requester used to forward the requests.
+    """
+
+    host: str
+    requester: Requester
+
+    __slots__ = ('host', 'requester', '_port', '_listener', '_tasks')
+
+    def __init__(
+        self,
+        token: Optional[str] = None,
+        *,
+        host: str = '127.0.0.1',
+        port: int = 8080,
+        requester: Optional[Requester] = None
+    ) -> None:
+        if requester is None:
+            requester = HTTPXRequester(token)
+
+        self.host = host
+        self.requester = requester
+
+        self._port = port
+        self._listener: Optional[anyio.abc.SocketListener] = None
+        self._tasks: Optional[anyio.abc.TaskGroup] = None
+
+    async def __aenter__(self) -> Self:
+        await self.requester.__aenter__()
+
+        try:
+            self._listener = await anyio.create_tcp_listener(
+                local_host=self.host, local_port=self._port
+            )
+
+            self._tasks = await anyio.create_task_group().__aenter__()
+            self._tasks.start_soon(self._listener.serve, self._serve)
+        except BaseException as exc:
+            if self._listener is not None:
+                await self._listener.aclose()
+
+            await self.requester.__aexit__(type(exc), exc, exc.__traceback__)
+            raise
+
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_val: Optional[BaseException],
+        exc_tb: Optional[TracebackType]
+    ) -> None:
+        assert self._tasks is not None and self._listener is not None
+
+        try:
+            self._tasks.cancel_scope.cancel()
+            await self._tasks.__aexit__(exc_type, exc_val, exc_tb)
+            await self._listener.aclose()
+        finally:
+            await self.requester.__aexit__(exc_type, exc_val, exc_tb)
+
+    @property
+    def port(self) -> int:
+        """The port the server is listening on.
+
+        If the proxy was created with port 0, this is the port picked by the
+        operating system once the server has started.
+        """
+        if self._listener is None:
+            return self._port
+
+        return self._listener.extra(anyio.abc.SocketAttribute.local_port)
+
+    @property
+    def base_url(self) -> str:
+        """The base URL clients should use to make requests through the proxy."""
+        return f'http://{self.host}:{self.port}/api/v10'
+
+    async def handle(
+        self,
+        method: str,
+        target: str,
+        headers: Mapping[str, str],
+        body: bytes
+    ) -> Tuple[int, Dict[str, str], bytes]:
+        """Forward a request received by the proxy.
+
+        Parameters:
+            method: The HTTP method of the request.
+            target: The path and query string of the request.
+            headers: The headers of the request, with lowercase names.
+            body: The body of the request.
+
+        Returns:
+            A tuple of the status code, headers and body of the response.
+        """
+        parts = urlsplit(target)
+
+        path = API_PREFIX.sub('', parts.path)
+        try:
+            route = _parse_route(method, path)
+        except ValueError as exc:
+            return 400, {'Content-Type': 'text/plain'}, str(exc).encode('utf-8')
+
+        forwarded = {k: v for k, v in headers.items() if k in FORWARDED_HEADERS}
+
+        try:
+            res = await self.requester.request(
+                route, content=body or None, headers=forwarded,
+                params=dict(parse_qsl(parts.query, keep_blank_values=True)) or None,
+                raw=True
+            )
+        except RequestException as exc:
+            res_headers = {}
+            if 'Retry-After' in exc.headers:
+                res_headers['Retry-After'] = exc.headers['Retry-After']
+
+            if isinstance(exc.data, (dict, list)):
+                res_headers['Content-Type'] = 'application/json'
+                return exc.status_code, res_headers, dump_json(exc.data)
+            elif exc.data:
+                res_headers['Content-Type'] = 'text/plain'
+                return exc.status_code, res_headers, exc.data.encode('utf-8')
+
+            return exc.status_code, res_headers, b''
+        except CircuitOpen as exc:
+            return 503, {
+                'Content-Type': 'text/plain', 'Retry-After': str(math.ceil(exc.retry_after))
+            }, str(exc).encode('utf-8')
+        except HTTPException as exc:
+            return 502, {'Content-Type': 'text/plain'}, str(exc).encode('utf-8')
+        except Exception as exc:
+            _log.exception(f'Failed to forward request to {route}')
+            return 502, {'Content-Type': 'text/plain'}, repr(exc).encode('utf-8')
+
+        res_headers = {}
+        if 'Content-Type' in res.headers:
+            res_headers['Content-Type'] = res.headers['Content-Type']
+
+        return res.status_code, res_headers, res.content
+
+    async def _serve(self, stream: anyio.abc.SocketStream) -> None:
+        conn = h11.Connection(h11.SERVER)
+
+        async with stream:
+            while True:
+                request: Optional[h11.Request] = None
+                body: List[bytes] = []
+
+                while True:
+                    try:
+                        event = conn.next_event()
+                    except h11.RemoteProtocolError:
+                        return
+
+                    if event is h11.NEED_DATA:
+                        try:
+                            conn.receive_data(await stream.receive())
+                        except (anyio.EndOfStream, anyio.BrokenResourceError):
+                            return
+                    elif isinstance(event, h11.Request):
+                        request = event
+                    elif isinstance(event, h11.Data):
+                        body.append(event.data)
+                    elif isinstance(event, h11.EndOfMessage):
+                        break
+                    else:
+                        return
+
+                assert request is not None
+                status, headers, content = await self.handle(
+                    request.method.decode('ascii'), request.target.decode('ascii'),
+                    {k.decode('ascii'): v.decode('latin-1') for k, v in request.headers},
+                    b''.join(body)
+                )
+                headers['Content-Length'] = str(len(content))
+
+                try:
+                    data = conn.send(h11.Response(status_code=status, headers=list(headers.items())))
+                    if content:
+                        data += conn.send(h11.Data(data=content))
+                    data += conn.send(h11.EndOfMessage())
+
+                    await stream.send(data)
+                except (anyio.EndOfStream, anyio.BrokenResourceError):
+                    return
+
+                if conn.our_state is h11.MUST_CLOSE:
+                    return
+
+                conn.start_next_cycle()
+
+
+def main() -> None:
+    """Run the proxy from the command line."""
+    parser = argparse.ArgumentParser(description='Run a local ratelimiting Discord API proxy.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--backend', choices=('asyncio', 'trio'), default='asyncio')
+    args = parser.parse_args()
+
+    token = os.environ.get('DISCORD_TOKEN')
+    if token is None:
+        parser.error('the DISCORD_TOKEN environment variable is not set')
+
+    logging.basicConfig(level=logging.INFO)
+
+    async def run() -> None:
+        async with RatelimitProxy(token, host=args.host, port=args.port) as proxy:
+            _log.info(f'Proxy listening on {proxy.base_url}')
+            await anyio.sleep_forever()
+
+    anyio.run(run, backend=args.backend)
@@ -1,11 +1,12 @@
+import heapq
 import logging
+import math
 import time
-from contextlib import asynccontextmanager
 from datetime import datetime, timezone
 from types import TracebackType
 from typing import (
-    AsyncContextManager, AsyncGenerator, Awaitable, Callable, Dict, Mapping,
-    Optional, Type
+    AsyncContextManager, Awaitable, Callable, Dict, List, Mapping, Optional,
+    Tuple, Type
 )
 from weakref import WeakValueDictionary
 
@@ -13,6 +14,7 @@ import anyio
 import anyio.lowlevel
 from typing_extensions import Protocol, Self
 
+from ._buckets import KNOWN_BUCKETS
 from ._config import RatelimiterContext
 from ._errors import RateLimited, ServerException
 from ._route import Route
@@ -61,6 +63,73 @@ class Ratelimiter(Protocol):
         ...
 
 
+class _PriorityLock:
+    """Lock which is handed to waiters by priority, rather than first-come.
+
+    Waiters with the same priority are served in the order they started
+    waiting. Ownership of the lock is handed directly to the next waiter on
+    release, so that another task cannot steal it inbetween.
+    """
+
+    _locked: bool
+    _waiters: List[Tuple[int, int, anyio.Event]]
+    _counter: int
+
+    __slots__ = ('_locked', '_waiters', '_counter')
+
+    def __init__(self) -> None:
+        self._locked = False
+
+        # Heap of (-priority, counter, event) so that the highest priority,
+        # and then the earliest waiter, is popped first.
+        self._waiters = []
+        self._counter = 0
+
+    @property
+    def locked(self) -> bool:
+        return self._locked
+
+    @property
+    def waiting(self) -> int:
+        """The amount of tasks waiting to acquire the lock."""
+        return len(self._waiters)
+
+    async def acquire(self, priority: int = 0) -> None:
+        """Acquire the lock, waiting for it by the priority if necessary."""
+        await anyio.lowlevel.checkpoint_if_cancelled()
+
+        if not self._locked:
+            self._locked = True
+            await anyio.lowlevel.cancel_shielded_checkpoint()
+            return
+
+        event = anyio.Event()
+        entry = (-priority, self._counter, event)
+        self._counter += 1
+
+        heapq.heappush(self._waiters, entry)
+        try:
+            await event.wait()
+        except BaseException:
+            if event.is_set():
+                # The lock was handed to us at the same time as we were
+                # cancelled, we need to pass it on to the next waiter.
+                self.release()
+            else:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+            raise
+
+    def release(self) -> None:
+        """Release the lock, handing it to the waiter with highest priority."""
+        if self._waiters:
+            # The lock stays locked, we hand it directly to the waiter
+            _, _, event = heapq.heappop(self._waiters)
+            event.set()
+        else:
+            self._locked = False
+
+
 class Ratelimit:
     """A special type of timed semaphore.
 
@@ -71,7 +140,7 @@ class Ratelimit:
     information from the ratelimit headers. The purpose of the lock is to be
     able to queue tasks trying to acquire the ratelimit, because if one task
     needs to sleep until the next reset then all the following tasks needs to
-    do so as well.
+    do so as well. Tasks waiting on the lock are served by their priority.
 
     The two events are used a bit differently, the first is used to completely
     lock the ratelimit in the case that a 429 response is received. The second
@@ -90,21 +159,22 @@ class Ratelimit:
     # from Discord, which in of itself will be handled correctly. This is not
     # the end of the day really.
 
-    _lock: anyio.Lock
+    _lock: _PriorityLock
     _ratelimited: anyio.Event
     _event: anyio.Event
 
     _limit: int
     _remaining: int
     _reset_at: Optional[float]
+    _ratelimited_until: Optional[float]
 
     __slots__ = (
         '_lock', '_ratelimited', '_event', '_limit', '_remaining', '_reset_at',
-        '_in_progress', '__weakref__'
+        '_ratelimited_until', '_in_progress', '__weakref__'
     )
 
     def __init__(self, limit: int = 1, remaining: int = 1) -> None:
-        self._lock = anyio.Lock()
+        self._lock = _PriorityLock()
 
         self._ratelimited = anyio.Event()
         self._ratelimited.set()
@@ -114,6 +184,7 @@ class Ratelimit:
         self._limit = limit
         self._remaining = remaining
         self._reset_at = None
+        self._ratelimited_until = None
 
         self._in_progress = 0
 
@@ -165,6 +236,43 @@ class Ratelimit:
         self._event.set()
         self._event = anyio.Event()
 
+    def estimate_wait(self) -> float:
+        """Estimate how long a new task would have to wait to acquire.
+
+        The estimate takes the tasks already waiting into account, as they
+        will be served first (unless they have a lower priority).
+
+        Returns:
+            The expected amount of seconds to wait. This is `math.inf` if the
+            wait spans more windows than can be estimated.
+        """
+        now = time.perf_counter()
+
+        if not self._ratelimited.is_set():
+            if self._ratelimited_until is None:
+                return math.inf
+
+            wait = max(self._ratelimited_until - now, 0.0)
+        else:
+            wait = 0.0
+
+        # The task currently holding the lock is also waiting for a token
+        ahead = self._lock.waiting + self._lock.locked
+        if self._remaining - ahead >= 1:
+            return wait
+
+        if self._reset_at is None:
+            # We are waiting for ratelimit information from a request that is
+            # in-progress, which should arrive shortly.
+            return wait
+
+        # Discord does not tell us the length of the window, so we cannot
+        # estimate the wait if it spans more than until the next reset.
+        if ahead - self._remaining >= self._limit:
+            return math.inf
+
+        return max(wait, self._reset_at - now)
+
     def acquire_nowait(self) -> None:
         """Acquire the semaphore, raising an error if blocking is necessary."""
         if self._lock.locked or not self._ratelimited.is_set():
@@ -183,14 +291,26 @@ class Ratelimit:
 
         raise anyio.WouldBlock
 
-    async def acquire(self) -> None:
-        """Decrement the semaphore value, blocking if necessary."""
-        await anyio.lowlevel.checkpoint_if_cancelled()
+    async def acquire(self, priority: int = 0) -> None:
+        """Decrement the semaphore value, blocking if necessary.
+
+        Parameters:
+            priority:
+                The priority of this task when waiting, tasks with a higher
+                priority are woken up first.
+        """
+        # This is the fast path when there are tokens available, which is
+        # completely synchronous to avoid the overhead of checkpoints.
+        if self._remaining >= 1 and not self._lock.locked and self._ratelimited.is_set():
+            self._remaining -= 1
+            self._in_progress += 1
+            return
 
         try:
             self.acquire_nowait()
         except anyio.WouldBlock:
-            async with self._lock:
+            await self._lock.acquire(priority)
+            try:
                 await self._ratelimited.wait()
 
                 # We have to repeat all code inside of acquire_nowait() because
@@ -242,8 +362,8 @@ class Ratelimit:
                     self._in_progress += 1
                     self._remaining = self._limit - self._in_progress
                     self._reset_at = None
-        else:
-            await anyio.lowlevel.cancel_shielded_checkpoint()
+            finally:
+                self._lock.release()
 
     def release(self) -> None:
         self._in_progress -= 1
@@ -266,99 +386,211 @@ class Ratelimit:
             self._event.set()
             self._event = anyio.Event()
 
-    def lock(self) -> None:
-        self._ratelimited = anyio.Event()
+    def refund(self) -> None:
+        """Release the semaphore, giving back the token as it wasn't used."""
+        self._remaining = min(self._limit, self._remaining + 1)
+        self.release()
+
+        # Tasks waiting for ratelimit information can use the token instead
+        if self._reset_at is None:
+            self._event.set()
+            self._event = anyio.Event()
+
+    def lock(self, duration: Optional[float] = None) -> None:
+        # Multiple requests in-flight may be ratelimited at the same time, if
+        # the event was replaced the tasks waiting for it would never be woken
+        # up - similar to GlobalRatelimit.lock().
+        if self._ratelimited.is_set():
+            self._ratelimited = anyio.Event()
+
+        if duration is not None:
+            until = time.perf_counter() + duration
+            if self._ratelimited_until is None or until > self._ratelimited_until:
+                self._ratelimited_until = until
 
     def unlock(self) -> None:
         self._ratelimited.set()
+        self._ratelimited_until = None
 
 
 class _RouteRatelimit:
-    """Proxy implementing the rest of the ratelimiter protocol."""
+    """Proxy implementing the rest of the ratelimiter protocol.
 
-    __slots__ = ('_lock', '_parent', '_route', 'deferred')
+    This is an asynchronous context manager implemented as a class rather
+    than with `@asynccontextmanager`, since the generator machinery adds a
+    noticeable overhead to each request.
+    """
+
+    __slots__ = ('_lock', '_parent', '_route', '_ctx', '_global', 'deferred')
 
-    def __init__(self, parent: 'DictRatelimiter', lock: Ratelimit, route: Route) -> None:
+    def __init__(
+        self,
+        parent: 'DictRatelimiter',
+        lock: Ratelimit,
+        route: Route,
+        ctx: RatelimiterContext
+    ) -> None:
         self._parent = parent
         self._lock = lock
         self._route = route
+        self._ctx = ctx
+
+        self._global = parent.global_limited(route)
 
         self.deferred = False
 
-    @asynccontextmanager
-    async def acquire(self, ctx: RatelimiterContext) -> AsyncGenerator[
-        Callable[[Mapping[str, str]], Awaitable[object]], None
-    ]:
+    async def __aenter__(self) -> Callable[[Mapping[str, str]], Awaitable[object]]:
+        ctx = self._ctx
+
+        remaining = ctx.remaining()
+        if remaining is None:
+            await self._acquire(ctx)
+            return self.update
+
+        expected = self._lock.estimate_wait()
+        if self._global:
+            expected = max(expected, self._parent.estimate_wait())
+        if expected > remaining:
+            raise RateLimited(429, {})
+
+        acquired = False
+
+        # The estimate is only an estimate, to make sure we never wait past the
+        # deadline we also need to time out the actual waiting.
+        with anyio.move_on_after(remaining):
+            await self._acquire(ctx)
+            acquired = True
+
+        if not acquired:
+            raise RateLimited(408, {})
+
+        return self.update
+
+    async def _acquire(self, ctx: RatelimiterContext) -> None:
+        start = time.perf_counter()
+
         if ctx.abort_if_ratelimited:
             try:
                 self._lock.acquire_nowait()
             except anyio.WouldBlock:
                 raise RateLimited(429, {})
         else:
-            await self._lock.acquire()
+            await self._lock.acquire(ctx.priority)
 
-        await self._parent.wait()
+        acquired = time.perf_counter()
+        ctx.bucket_wait = acquired - start
+
+        if not self._global:
+            return
 
         try:
-            yield self.update
-        except ServerException as exc:
-            if exc.status_code == 503:
-                raise
+            await self._parent.wait(ctx.priority)
+        except BaseException:
+            self._lock.release()
+            raise
 
-            _log.warning(
-                f'Unconditionally backing off after receiving {exc.status_code}-response'
-            )
-            # For status code 500, 502 and 504 its best to exponentially sleep
-            await anyio.sleep(1 + exc.attempt * 2)
-
-        except RateLimited as exc:
-            if ctx.abort_if_ratelimited:
-                raise
-
-            # The data is somewhat duplicated, which means we can try our best
-            # to find it in different places.
-            if isinstance(exc.data, dict):
-                retry = exc.data.get('retry_after', 1 + exc.attempt * 2)
-                globally = exc.data.get('global', False)
-            else:
-                try:
-                    retry = exc.headers['X-RateLimit-Reset-After']
-                except KeyError:
-                    retry = 1 + exc.attempt * 2
-
-                try:
-                    globally = exc.headers['X-RateLimit-Scope'] == 'global'
-                except KeyError:
-                    globally = False
-
-            # If this is a global ratelimit we should lock all requests from
-            # attempting to access any endpoint.
-            if globally:
-                _log.warning(
-                    f'Request to {self._route} hit the global ratelimit;'
-                    f' retrying in {retry} seconds.'
-                )
-                self._parent.lock()
-            else:
-                _log.warning(
-                    f'Request to {self._route} was ratelimited; retrying in {retry} seconds.'
-                )
+        ctx.global_wait = time.perf_counter() - acquired
 
-            self._lock.lock()
-            try:
-                await anyio.sleep(float(retry))
-            finally:
-                self._lock.unlock()
+    def abandon(self) -> None:
+        """Exit the ratelimiter without having made the request.
 
-                if globally:
-                    self._parent.unlock()
+        Unlike exiting normally, the tokens taken when entering are given
+        back so that another request can use them.
+        """
+        self._lock.refund()
+        if self._global:
+            self._parent.refund()
 
-            _log.debug(f'Finished sleeping from ratelimit for {self._route}')
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_val: Optional[BaseException],
+        exc_tb: Optional[TracebackType]
+    ) -> Optional[bool]:
+        try:
+            if isinstance(exc_val, ServerException):
+                return await self._handle_server_error(exc_val)
+            elif isinstance(exc_val, RateLimited):
+                return await self._handle_ratelimited(exc_val)
         finally:
             self._lock.release()
 
+        return None
+
+    async def _handle_server_error(self, exc: ServerException) -> bool:
+        if exc.status_code == 503:
+            return False
+
+        # For status code 500, 502 and 504 its best to exponentially sleep
+        backoff = 1 + exc.attempt * 2
+
+        remaining = self._ctx.remaining()
+        if remaining is not None and backoff > remaining:
+            return False
+
+        _log.warning(
+            f'Unconditionally backing off after receiving {exc.status_code}-response'
+        )
+        await anyio.sleep(backoff)
+        return True
+
+    async def _handle_ratelimited(self, exc: RateLimited) -> bool:
+        ctx = self._ctx
+
+        if ctx.abort_if_ratelimited:
+            return False
+
+        # The data is somewhat duplicated, which means we can try our best
+        # to find it in different places.
+        if isinstance(exc.data, dict):
+            retry = exc.data.get('retry_after', 1 + exc.attempt * 2)
+            globally = exc.data.get('global', False)
+        else:
+            try:
+                retry = exc.headers['X-RateLimit-Reset-After']
+            except KeyError:
+                retry = 1 + exc.attempt * 2
+
+            try:
+                globally = exc.headers['X-RateLimit-Scope'] == 'global'
+            except KeyError:
+                globally = False
+
+        # The deadline is shared between all attempts of the request, so
+        # retries cannot add up to more than the maximum wait.
+        remaining = ctx.remaining()
+        if remaining is not None and float(retry) > remaining:
+            return False
+
+        # If this is a global ratelimit we should lock all requests from
+        # attempting to access any endpoint.
+        if globally:
+            _log.warning(
+                f'Request to {self._route} hit the global ratelimit;'
+                f' retrying in {retry} seconds.'
+            )
+            self._parent.lock()
+        else:
+            _log.warning(
+                f'Request to {self._route} was ratelimited; retrying in {retry} seconds.'
+            )
+
+        self._lock.lock(float(retry))
+        try:
+            await anyio.sleep(float(retry))
+        finally:
+            self._lock.unlock()
+
+            if globally:
+                self._parent.unlock()
+
+        _log.debug(f'Finished sleeping from ratelimit for {self._route}')
+        return True
+
     async def update(self, headers: Mapping[str, str]) -> None:
         """Update the ratelimiter with the rate limit headers from Discord."""
+        locks = [self._lock]
+
         try:
             bucket = headers['X-RateLimit-Bucket']
         except KeyError:
@@ -366,67 +598,128 @@ class _RouteRatelimit:
         else:
             # Update the ratelimiter with the bucket and remove the fallback
             # if present currently.
-            self._lock = self._parent.set_lock(self._route, bucket, self._lock)
+            lock = self._parent.set_lock(self._route, bucket, self._lock)
 
-        try:
-            limit = headers['X-RateLimit-Limit']
-        except KeyError:
-            pass
-        else:
-            self._lock.limit = int(limit)
+            # The bucket may already have a lock, which was learnt through
+            # another route or request. The lock acquired by this request
+            # still needs to be updated though, since there may be tasks
+            # waiting on it that would otherwise never be woken up.
+            if lock is not self._lock:
+                locks.append(lock)
 
-        try:
-            remaining = headers['X-RateLimit-Remaining']
-        except KeyError:
-            pass
-        else:
-            self._lock.remaining = int(remaining)
+        limit = headers.get('X-RateLimit-Limit')
+        remaining = headers.get('X-RateLimit-Remaining')
+        reset = headers.get('X-RateLimit-Reset')
 
-        try:
-            reset = headers['X-RateLimit-Reset']
-        except KeyError:
-            return
-        else:
-            self._lock.reset_at = datetime.fromtimestamp(float(reset), timezone.utc)
+        if limit is not None and bucket is not None:
+            self._parent.limits[bucket] = int(limit)
+
+        for lock in locks:
+            if limit is not None:
+                lock.limit = int(limit)
+
+            if remaining is not None:
+                lock.remaining = int(remaining)
+
+            if reset is None:
+                continue
+
+            lock.reset_at = datetime.fromtimestamp(float(reset), timezone.utc)
+
+            if lock.remaining <= 0 and lock.reset_at is not None:
+                # The lock would otherwise be deallocated as soon as no request
+                # is using it, losing the fact that the bucket is exhausted.
+                self._parent.keep_alive(lock, lock.reset_at - time.perf_counter())
 
 
 class GlobalRatelimit:
-    """Ratelimit lock for respecting the global ratelimit."""
+    """Token bucket for respecting the global ratelimit.
+
+    The bucket holds up to `rate` tokens and is continuously refilled at a
+    rate of `rate` tokens per second. When there are tokens available, and no
+    other tasks waiting, a token is taken synchronously without any locking.
+
+    Tasks that do have to wait are queued by their priority.
+    """
 
     _event: anyio.Event
-    _lock: anyio.Lock
+    _lock: _PriorityLock
 
-    _reset: Optional[float]
-    _value: int
+    _rate: int
+    _tokens: float
+    _updated: float
 
-    __slots__ = ('_event', '_lock', '_reset', '_rate', '_value')
+    __slots__ = ('_event', '_lock', '_rate', '_tokens', '_updated')
 
     def __init__(self, rate: int) -> None:
         self._event = anyio.Event()
         self._event.set()
 
-        self._lock = anyio.Lock()
+        self._lock = _PriorityLock()
 
-        self._reset = None
         self._rate = rate
-        self._value = rate
+        self._tokens = rate
+        self._updated = time.perf_counter()
 
-    async def wait(self) -> None:
-        async with self._lock:
-            await self._event.wait()
+    def _refill(self) -> float:
+        now = time.perf_counter()
 
-            if self._reset is None or self._reset < time.perf_counter():
-                self._reset = time.perf_counter() + 1
-                self._value = self._rate - 1
+        tokens = self._tokens + (now - self._updated) * self._rate
+        self._tokens = tokens if tokens < self._rate else self._rate
+        self._updated = now
 
-            elif self._value <= 0:
-                _log.debug('Avoiding global ratelimit by sleeping until reset.')
+        return self._tokens
 
-                await anyio.sleep(self._reset - time.perf_counter())
-                self._reset = time.perf_counter() + 1
-                self._value = self._rate - 1
-            else:
-                self._value -= 1
+    def acquire_nowait(self) -> None:
+        """Take a token, raising an error if waiting is necessary."""
+        if self._lock.locked or not self._event.is_set() or self._refill() < 1:
+            raise anyio.WouldBlock
+
+        self._tokens -= 1
+
+    async def wait(self, priority: int = 0) -> None:
+        # Fast path, see acquire_nowait(). This is inlined because it is run
+        # for every single request.
+        if not self._lock.locked and self._event.is_set() and self._refill() >= 1:
+            self._tokens -= 1
+            return
+
+        await self._lock.acquire(priority)
+        try:
+            while True:
+                await self._event.wait()
+
+                tokens = self._refill()
+                if tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                _log.debug('Avoiding global ratelimit by sleeping until a token is available.')
+                # Rounding may leave the bucket a tiny fraction short of a
+                # token, so this sleeps at least a microsecond to not spin.
+                await anyio.sleep(max((1 - tokens) / self._rate, 1e-6))
+        finally:
+            self._lock.release()
+
+    def refund(self) -> None:
+        """Give back a token which was taken without making a request."""
+        self._tokens = min(self._rate, self._refill() + 1)
+
+    def estimate_wait(self) -> float:
+        """Estimate how long a new task would have to wait for the ratelimit.
+
+        Returns:
+            The expected amount of seconds to wait. This is `math.inf` if the
+            ratelimit is currently locked.
+        """
+        if not self._event.is_set():
+            return math.inf
+
+        # The task currently holding the lock is also waiting for a token
+        ahead = self._lock.waiting + self._lock.locked
+
+        missing = ahead + 1 - self._refill()
+        return missing / self._rate if missing > 0 else 0.0
 
     def lock(self) -> None:
         # If the event isn't set, then another task has already locked the
@@ -448,12 +741,24 @@ class DictRatelimiter:
     (weakref)dictionaries in-memory, this means that they can't be shared
     across processes (such as to another shard).
 
-    There is one parameter that can be passed on instantiation, which is the
-    amount of requests that can be made each second according to the global
-    ratelimit.
+    The amount of requests that can be made each second according to the
+    global ratelimit can be passed on instantiation.
+
+    Before the first response, the ratelimiter does not know which bucket a
+    route belongs to or the limit of the bucket, so requests would have to be
+    made one at a time. To avoid this, the ratelimiter starts out with the
+    `known_buckets` mapping endpoints to a bucket and its limit. By default
+    this is a built-in table with conservative limits for common endpoints,
+    but what the ratelimiter has learned can be persisted with
+    `learned_buckets()` and passed back in when restarting:
+
+    ```python
+    ratelimiter = DictRatelimiter(known_buckets={**KNOWN_BUCKETS, **learned})
+    ```
 
     Attributes:
         buckets: A dictionary of endpoints to their ratelimit buckets.
+        limits: A dictionary of buckets to their last known limit.
         limiters:
             A weak dictionary of buckets + their major parameters to the
             underlying ratelimit locks.
@@ -466,15 +771,28 @@ class DictRatelimiter:
     global_rate: int
 
     buckets: Dict[str, str]
+    limits: Dict[str, int]
     locks: 'WeakValueDictionary[str, Ratelimit]'
     fallbacks: 'WeakValueDictionary[str, Ratelimit]'
 
-    __slots__ = ('_tasks', '_global_rl', 'global_rate', 'buckets', 'locks', 'fallbacks')
+    __slots__ = (
+        '_tasks', '_global_rl', 'global_rate', 'buckets', 'limits', 'locks', 'fallbacks'
+    )
 
-    def __init__(self, global_rate: int = 50) -> None:
+    def __init__(
+        self,
+        global_rate: int = 50,
+        *,
+        known_buckets: Mapping[str, Tuple[str, int]] = KNOWN_BUCKETS
+    ) -> None:
         self.global_rate = global_rate
 
         self.buckets = {}  # Route endpoint to X-RateLimit-Bucket
+        self.limits = {}  # X-RateLimit-Bucket to X-RateLimit-Limit
+
+        for endpoint, (bucket, limit) in known_buckets.items():
+            self.buckets[endpoint] = bucket
+            self.limits[bucket] = limit
 
         # By using a WeakValueDictionary, Python can deallocate locks if
         # they're not in any way used (waiting, or acquired). This way we
@@ -526,20 +844,28 @@ class DictRatelimiter:
         """
         bucket = self.buckets.get(route.endpoint)
         if not bucket:
-            _log.debug(
-                f'Using fallback ratelimit lock {route.endpoint + route.major_params}'
-            )
+            _log.debug(f'Using fallback ratelimit lock {route.key}')
             # Fallback until we get X-RateLimit-Bucket information with the
             # 'bucket' parameter called in set_lock()
-            lock = self.fallbacks.setdefault(
-                route.endpoint + route.major_params, Ratelimit()
-            )
-            return _RouteRatelimit(self, lock, route).acquire(ctx)
+            lock = self.fallbacks.get(route.key)
+            if lock is None:
+                lock = Ratelimit()
+                self.fallbacks[route.key] = lock
+
+            return _RouteRatelimit(self, lock, route, ctx)
 
         # We have more accurate bucket information we can use together with the
-        # major parameters..
-        lock = self.locks.setdefault(bucket + route.major_params, Ratelimit())
-        return _RouteRatelimit(self, lock, route).acquire(ctx)
+        # major parameters. We avoid setdefault() here as it would create a
+        # new lock (with its events) for every single request.
+        lock = self.locks.get(bucket + route.major_params)
+        if lock is None:
+            # Each major parameter has its own window of the bucket, so the
+            # first requests can be made concurrently up to the limit.
+            limit = self.limits.get(bucket, 1)
+            lock = Ratelimit(limit, limit)
+            self.locks[bucket + route.major_params] = lock
+
+        return _RouteRatelimit(self, lock, route, ctx)
 
     def set_lock(
         self,
@@ -558,11 +884,96 @@ class DictRatelimiter:
             The lock for the bucket. This is either another lock if the bucket
             already had a lock, or the one passed into the method.
         """
-        self.fallbacks.pop(route.endpoint + route.major_params, None)
+        self.fallbacks.pop(route.key, None)
 
         self.buckets[route.endpoint] = bucket
         return self.locks.setdefault(bucket + route.major_params, lock)
 
+    def learned_buckets(self) -> Dict[str, Tuple[str, int]]:
+        """Get the buckets and limits of endpoints that the ratelimiter knows.
+
+        The result can be serialized as JSON and passed as `known_buckets`
+        to another ratelimiter, so that it does not need to learn them again.
+
+        Returns:
+            A mapping of endpoints (see `Route.endpoint`) to their bucket and
+            the limit of the bucket.
+        """
+        return {
+            endpoint: (bucket, self.limits[bucket])
+            for endpoint, bucket in self.buckets.items() if bucket in self.limits
+        }
+
+    def get_key(self, route: Route) -> str:
+        """Get the key of the ratelimit lock that a route would use.
+
+        Two routes with the same key share the same ratelimit lock, this is
+        either the bucket (if known) or the endpoint, followed by the major
+        parameters.
+
+        Parameters:
+            route: The route to get the key for.
+
+        Returns:
+            The key of the lock in either `locks` or `fallbacks`.
+        """
+        bucket = self.buckets.get(route.endpoint)
+        if not bucket:
+            return route.key
+
+        return bucket + route.major_params
+
+    def get_limit(self, route: Route) -> Optional[int]:
+        """Get the known limit of the ratelimit lock for a route.
+
+        Parameters:
+            route: The route to get the limit of.
+
+        Returns:
+            The limit of the bucket the route belongs to, or None if no
+            ratelimit information has been received for the route yet.
+        """
+        bucket = self.buckets.get(route.endpoint)
+        if not bucket:
+            return None
+
+        return self.limits.get(bucket)
+
+    def global_limited(self, route: Route) -> bool:
+        """Check whether a route is subject to the global ratelimit.
+
+        Interaction responses and followups are authorized with the token of
+        the interaction and are not counted towards the global ratelimit.
+        Skipping it means that these latency-sensitive requests are never
+        delayed by other requests saturating the global ratelimit.
+
+        Parameters:
+            route: The route to check.
+
+        Returns:
+            Whether requests to the route need to wait for the global ratelimit.
+        """
+        return 'interaction_token' not in route.params
+
+    def keep_alive(self, lock: Ratelimit, duration: float) -> None:
+        """Keep a ratelimit lock from being deallocated for a duration.
+
+        Locks are only weakly referenced and are deallocated once they are not
+        being used by any request. This is used to keep a lock around while
+        it holds important information, such as the bucket being exhausted.
+
+        Parameters:
+            lock: The ratelimit lock to keep a reference to.
+            duration: The amount of seconds to keep the lock around for.
+        """
+        if duration > 0:
+            self._tasks.start_soon(self._hold, lock, duration)
+
+    @staticmethod
+    async def _hold(lock: Ratelimit, duration: float) -> None:
+        # The lock is referenced by this coroutine's frame while sleeping
+        await anyio.sleep(duration)
+
     def lock(self) -> None:
         """Globally lock all locks across the ratelimiter."""
         self._global_rl.lock()
@@ -571,6 +982,22 @@ class DictRatelimiter:
         """Unlock all locks across the ratelimiter."""
         self._global_rl.unlock()
 
-    async def wait(self) -> None:
-        """Wait for the global ratelimit to send a request."""
-        await self._global_rl.wait()
+    def estimate_wait(self) -> float:
+        """Estimate how long a new request would wait for the global ratelimit.
+
+        Returns:
+            The expected amount of seconds to wait.
+        """
+        return self._global_rl.estimate_wait()
+
+    async def wait(self, priority: int = 0) -> None:
+        """Wait for the global ratelimit to send a request.
+
+        Parameters:
+            priority: The priority of the request when waiting.
+        """
+        await self._global_rl.wait(priority)
+
+    def refund(self) -> None:
+        """Give back a global token taken by `wait()` without making a request."""
+        self._global_rl.refund()
@@ -1,29 +1,77 @@
+import contextlib
+import logging
+import os
 from abc import ABC, abstractmethod
 from contextvars import ContextVar, Token
 from types import TracebackType
 from typing import (
-    IO, Any, Dict, Mapping, Optional, Sequence, Tuple, Type, Union
+    IO, Any, AsyncIterable, Awaitable, Callable, ClassVar, Dict, Iterable,
+    Mapping, Optional, Sequence, Tuple, Type, Union
 )
+from urllib.parse import quote as urlquote
 
+import anyio
 from typing_extensions import Self
 
+from ._asset import AssetStream
+from ._breaker import CircuitBreaker
+from ._budget import InvalidRequestBudget
+from ._cache import AssetCache
+from ._config import RatelimiterContext
+from ._errors import (
+    AssetTooLarge, CircuitOpen, HTTPException, RateLimited, RequestException,
+    ServerException
+)
+from ._files import File
+from ._hooks import RequestEvent, RequestHook, _dispatch
+from ._ratelimiter import DictRatelimiter, Ratelimiter
 from ._route import Route
 from ._utils import MISSING
 
 __all__ = (
+    'RawResponse',
     'Requester',
 )
 
 
+_log = logging.getLogger(__name__)
+
+
 _current_api: ContextVar['Requester'] = ContextVar('_current_api')
 
 # The following type variables are adapted from HTTPX because of a conversion
-# done from a RequestFiles -> HTTPXFiles (the latter which HTTPX understands)
-FileContent = Union[IO[bytes], bytes]
+# done from a RequestFiles -> HTTPXFiles (the latter which HTTPX understands).
+# Paths, asynchronous iterables and File instances are streamed by the
+# requesters instead of being passed to HTTPX.
+FileContent = Union[IO[bytes], bytes, File, 'os.PathLike[str]', AsyncIterable[bytes]]
 RequestFiles = Sequence[FileContent]
 HTTPXFiles = Union[Mapping[str, FileContent], Sequence[Tuple[str, FileContent]]]
 
 
+class RawResponse:
+    """Successful response returned as-is by requests made with `raw=True`.
+
+    Attributes:
+        status_code: The status code of the response.
+        headers: The headers of the response.
+        content: The body of the response, not decoded or parsed.
+    """
+
+    status_code: int
+    headers: Mapping[str, str]
+    content: bytes
+
+    __slots__ = ('status_code', 'headers', 'content')
+
+    def __init__(self, status_code: int, headers: Mapping[str, str], content: bytes) -> None:
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    def __repr__(self) -> str:
+        return f'<RawResponse status_code={self.status_code} content={len(self.content)} bytes>'
+
+
 class Requester(ABC):
     """Base for making requests to Discord's API, respecting ratelimits.
 
@@ -84,11 +132,13 @@ class Requester(ABC):
         *,
         reason: str = MISSING,
         json: Optional[Any] = None,
+        content: Optional[bytes] = None,
         data: Optional[Dict[Any, Any]] = None,
         files: Optional[HTTPXFiles] = None,
         params: Optional[Dict[str, Any]] = None,
         auth: Optional[Tuple[Union[str, bytes], Union[str, bytes]]] = None,
-        headers: Optional[Mapping[str, str]] = None
+        headers: Optional[Mapping[str, str]] = None,
+        raw: bool = False
     ) -> Any:
         """Send a request to the Discord API, respecting rate limits.
 
@@ -107,8 +157,11 @@ class Requester(ABC):
                 The reason to insert into the Audit Log for this change, not
                 supported by all endpoints.
             json: Dictionary to serialize to JSON and send as the request body.
+            content: Raw bytes to send as the request body.
             data: Dictionary to send as a multipart form-data request body.
-            files: Additional files to include in the request.
+            files:
+                Additional files to include in the request. Files given as
+                paths, asynchronous iterables or `File` are streamed.
             params: Query string parameters for the request.
             headers: Headers to use when making the request.
             auth:
@@ -116,6 +169,9 @@ class Requester(ABC):
                 using BASIC. This parameter is not used, as Discord primarily
                 authenticates using the Authorization header.
             headers: Headers to send in the request.
+            raw:
+                Whether to return a successful response as a `RawResponse`,
+                with its status code, headers and undecoded body.
 
         Raises:
             Forbidden: The request received a 403 Forbidden response.
@@ -133,3 +189,426 @@ class Requester(ABC):
             The JSON deserialized body of the response.
         """
         ...
+
+
+class _RetryingRequester(Requester):
+    """Base for requesters making requests through a ratelimiter.
+
+    This implements `request()` with the attempt loop shared by the
+    requesters: shedding requests, the circuit breaker, hooks and retrying
+    failed attempts. Subclasses only implement `_request()` which makes a
+    single attempt, and set `_network_errors` to the exceptions their HTTP
+    client raises when the connection fails.
+
+    Reading CDN assets is shared the same way, on top of the subclasses'
+    `_bypass_request()` and `read_asset_stream()`.
+    """
+
+    # Exceptions meaning that the request failed because of the connection,
+    # these are retried after backing off.
+    _network_errors: ClassVar[Tuple[Type[Exception], ...]] = (OSError,)
+
+    _ratelimiter: Ratelimiter
+    _hooks: Tuple[RequestHook, ...]
+    _invalid_requests: InvalidRequestBudget
+    _circuit_breaker: CircuitBreaker
+    _asset_cache: Optional[AssetCache]
+
+    __slots__ = (
+        '_ratelimiter', '_hooks', '_invalid_requests', '_circuit_breaker', '_asset_cache',
+    )
+
+    def __init__(
+        self,
+        *,
+        ratelimiter: Optional[Ratelimiter] = None,
+        hooks: Iterable[RequestHook] = (),
+        invalid_requests: Optional[InvalidRequestBudget] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        asset_cache: Optional[AssetCache] = None,
+    ) -> None:
+        super().__init__()
+
+        self._ratelimiter = ratelimiter if ratelimiter is not None else DictRatelimiter()
+
+        self._hooks = tuple(hooks)
+        self._invalid_requests = (
+            invalid_requests if invalid_requests is not None else InvalidRequestBudget()
+        )
+        self._circuit_breaker = (
+            circuit_breaker if circuit_breaker is not None else CircuitBreaker()
+        )
+        self._asset_cache = asset_cache
+
+    @property
+    def ratelimiter(self) -> Ratelimiter:
+        """The ratelimiter used for requests made by this requester."""
+        return self._ratelimiter
+
+    @property
+    def invalid_requests(self) -> InvalidRequestBudget:
+        """The counter of invalid requests made by this requester."""
+        return self._invalid_requests
+
+    @property
+    def circuit_breaker(self) -> CircuitBreaker:
+        """The circuit breaker and retry budget of this requester."""
+        return self._circuit_breaker
+
+    @property
+    def asset_cache(self) -> Optional[AssetCache]:
+        """The cache used by `read_asset()`, if any."""
+        return self._asset_cache
+
+    @abstractmethod
+    async def _request(
+        self,
+        route: Route,
+        headers: Dict[str, str],
+        ratelimit: Callable[[Mapping[str, str]], Awaitable[object]],
+        *,
+        json: Optional[Any] = None,
+        content: Optional[bytes] = None,
+        data: Optional[Dict[Any, Any]] = None,
+        files: Optional[HTTPXFiles] = None,
+        params: Optional[Dict[str, Any]] = None,
+        auth: Optional[Tuple[Union[str, bytes], Union[str, bytes]]] = None,
+        raw: bool = False,
+        event: Optional[RequestEvent] = None
+    ) -> Optional[Any]:
+        """Make one attempt at a successful request.
+
+        Parameters:
+            route: The route to make the request to.
+            headers: Headers to use when making the request.
+            ratelimit: Ratelimit lock for this route.
+            json: Dictionary to serialize to JSON and send as the request body.
+            content: Raw bytes to send as the request body.
+            data: Dictionary to send as a multipart form-data request body.
+            files: Additional files to include in the request.
+            params: Query string parameters for the request.
+            auth:
+                Tuple with two items: (username, password) to authorize with
+                using BASIC. This parameter is not often used, as Discord
+                primarily authenticates using the Authorization header.
+            raw: Whether to return a successful response as a `RawResponse`.
+            event: The event to record information about the attempt in.
+
+        Raises:
+            Forbidden: The request received a 403 Forbidden response.
+            NotFound: The request received a 404 Not Found response.
+            ServerException:
+                The request received a 500, 502, 503 or 504 response.
+            Ratelimited: The request received a 429 Too Many Requests response.
+            HTTPException:
+                The request received a non-successful unknown response. Simply
+                indicates a general failure.
+
+        Returns:
+            The JSON deserialized body of the response, or None if the request
+            was unsuccessful and should be retried.
+        """
+        ...
+
+    async def request(
+        self,
+        route: Route,
+        *,
+        reason: str = MISSING,
+        json: Optional[Any] = None,
+        content: Optional[bytes] = None,
+        data: Optional[Dict[Any, Any]] = None,
+        files: Optional[HTTPXFiles] = None,
+        params: Optional[Dict[str, Any]] = None,
+        auth: Optional[Tuple[Union[str, bytes], Union[str, bytes]]] = None,
+        headers: Optional[Mapping[str, str]] = None,
+        raw: bool = False
+    ) -> Any:
+        """Send a request to the Discord API, respecting rate limits.
+
+        If the `json`, `data` or `params` keyword-arguments contains values
+        that are MISSING, they will be removed before being passed to HTTPX.
+
+        This function returns a deserialized JSON object if Content-Type is
+        `application/json`, otherwise a string. Commonly it is known by the
+        caller itself what the response will be, in which case it will be
+        a burden to narrow down the type unneccesarily. For that reason this
+        function is annotated as returning `Any`.
+
+        If `raw` is set the response is instead returned as a `RawResponse`
+        with the body not decoded or parsed, which is useful when forwarding
+        it unchanged.
+
+        Parameters:
+            route: The route to make the request to.
+            reason:
+                The reason to insert into the Audit Log for this change, not
+                supported by all endpoints.
+            json: Dictionary to serialize to JSON and send as the request body.
+            content: Raw bytes to send as the request body.
+            data: Dictionary to send as a multipart form-data request body.
+            files: Additional files to include in the request.
+            params: Query string parameters for the request.
+            auth:
+                Tuple with two items: (username, password) to authorize with
+                using BASIC. This parameter is not used, as Discord primarily
+                authenticates using the Authorization header.
+            headers: Headers to send in the request.
+            raw:
+                Whether to return a successful response as a `RawResponse`,
+                with its status code, headers and undecoded body.
+
+        Raises:
+            Forbidden: The request received a 403 Forbidden response.
+            NotFound: The request received a 404 Not Found response.
+            ServerException:
+                The request received a 503 Service Unavailable response, this
+                is different from 500, 502 or 504 responses as they are
+                gracefully retried.
+            HTTPException:
+                The request received a non-successful unknown response. Simply
+                indicates a general failure, can also be raised if no attempt
+                at the request was successful.
+
+        Returns:
+            The JSON deserialized body of the response.
+        """
+
+        # Clean up MISSING values
+        if isinstance(json, dict):
+            json = self._clean_dict(json)
+        if data is not None:
+            data = self._clean_dict(data)
+        if params is not None:
+            params = self._clean_dict(params)
+
+        rheaders = dict(headers or {})
+        if reason is not MISSING:
+            rheaders['X-Audit-Log-Reason'] = urlquote(reason, safe='/ ')
+
+        # The context is shared by all attempts so that they share the
+        # deadline of max_wait(), see RatelimiterContext.remaining().
+        ctx = RatelimiterContext()
+        for attempt in range(3):
+            # Retries are shed as well, since they are likely to be invalid
+            # requests themselves if the previous attempt was.
+            if self._invalid_requests.should_shed(ctx.priority):
+                _log.debug(f'Shedding request to {route} to avoid invalid request ban.')
+                raise RateLimited(429, {})
+
+            retry_after = self._circuit_breaker.allow(route)
+            if retry_after is not None:
+                raise CircuitOpen(route.endpoint, retry_after)
+
+            event = RequestEvent(route, attempt) if self._hooks else None
+            failure: Optional[Exception] = None
+            network_error: Optional[Exception] = None
+            attempted = False
+
+            # The timings are set by the ratelimiter for each attempt
+            ctx.bucket_wait = ctx.global_wait = 0.0
+
+            try:
+                async with self._ratelimiter(route, ctx) as rl:
+                    attempted = True
+                    try:
+                        res = await self._request(
+                            route, rheaders, rl,
+                            json=json, content=content, data=data, files=files,
+                            params=params, auth=auth, raw=raw, event=event
+                        )
+                    except Exception as error:
+                        if event is not None:
+                            event.set_error(error)
+
+                        if not isinstance(error, (ServerException, *self._network_errors)):
+                            if isinstance(error, RequestException):
+                                self._circuit_breaker.record_success(route)
+                            raise
+
+                        self._circuit_breaker.record_failure(route)
+
+                        # 503 responses are not retried by the ratelimiter
+                        if isinstance(error, ServerException) and error.status_code == 503:
+                            raise
+
+                        if attempt >= 2 or not self._circuit_breaker.retry(route):
+                            # Leave the ratelimiter without the error, so that
+                            # it doesn't back off and silence it for a retry.
+                            failure = error
+                        elif isinstance(error, self._network_errors):
+                            # Backing off is done once the ratelimiter has
+                            # been left, so that its lock isn't held meanwhile.
+                            network_error = error
+                        else:
+                            # The ratelimiter backs off and silences the error
+                            raise
+                    else:
+                        self._circuit_breaker.record_success(route)
+                        return res
+            finally:
+                # Attempts aborted by the ratelimiter never made a request
+                if event is not None and attempted:
+                    _dispatch(self._hooks, event, ctx)
+
+            if failure is not None:
+                raise failure
+
+            if network_error is not None:
+                # Exponentially backoff and try again, within max_wait()
+                backoff = 1 + attempt * 2
+
+                remaining = ctx.remaining()
+                if remaining is not None and backoff > remaining:
+                    raise RateLimited(408, {}) from network_error
+
+                _log.warning(
+                    f'Request to {route} failed with {network_error!r};'
+                    f' retrying request (attempt {attempt}).'
+                )
+                await anyio.sleep(backoff)
+                continue
+
+            # If we reach here, that means that an exception happened and the
+            # ratelimiter silenced it. It is up to the ratelimiter to log a
+            # message with higher severity depending on the reason it did so.
+            _log.info(f'Retrying request to {route} (attempt {attempt}).')
+
+        raise HTTPException(f'All attempts at {route} were unsuccessful.')
+
+    # Asset endpoint
+
+    @abstractmethod
+    async def _bypass_request(
+        self,
+        method: str,
+        url: str,
+        *,
+        json: Optional[Any] = None,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> bytes:
+        """Bypass retrying, ratelimit handling and json serialization.
+
+        Parameters:
+            method: The HTTP method to use.
+            url: The URL to make the request to.
+            json: JSON body for the request.
+            params: Query string parameters to use in the request.
+
+        Returns:
+            The response body read as bytes.
+        """
+        ...
+
+    @abstractmethod
+    def read_asset_stream(
+        self,
+        url: str,
+        *,
+        size: int = MISSING,
+        max_size: Optional[int] = None,
+        chunk_size: int = 64 * 1024
+    ) -> AssetStream:
+        """Stream the bytes of a CDN asset in chunks.
+
+        Unlike `read_asset()` the asset is never held in memory as a whole,
+        which is useful when processing or saving large attachments.
+
+        Parameters:
+            url: The full URL to the asset.
+            size: The value of the 'size' query parameter.
+            max_size:
+                The maximum size of the asset in bytes. If the asset is
+                larger, `AssetTooLarge` is raised as soon as this is known.
+            chunk_size: The size of the chunks to read.
+
+        Returns:
+            An asynchronous iterator of the chunks of the asset, which can
+            also be used as an asynchronous context manager.
+        """
+        ...
+
+    async def read_asset(
+        self,
+        url: str,
+        *,
+        size: int = MISSING,
+        max_size: Optional[int] = None
+    ) -> bytes:
+        """Read the bytes of a CDN asset.
+
+        Parameters:
+            url: The full URL to the asset.
+            size: The value of the 'size' query parameter.
+            max_size:
+                The maximum size of the asset in bytes. If the asset is
+                larger, `AssetTooLarge` is raised without reading the rest.
+
+        If the requester has an asset cache, the asset is looked up in it
+        first and stored in it once downloaded.
+
+        Returns:
+            The CDN asset read as bytes.
+        """
+        cache = self._asset_cache
+        if cache is not None:
+            key = cache.key(url, self._clean_dict({'size': size}))
+            content = await cache.get(key)
+
+            if content is not None:
+                if max_size is not None and len(content) > max_size:
+                    raise AssetTooLarge(url, max_size)
+                return content
+
+        if max_size is None:
+            content = await self._bypass_request('GET', url, params={'size': size})
+        else:
+            async with self.read_asset_stream(url, size=size, max_size=max_size) as stream:
+                content = b''.join([chunk async for chunk in stream])
+
+        if cache is not None:
+            await cache.put(key, content)
+
+        return content
+
+    async def save_asset(
+        self,
+        url: str,
+        path: Union[str, 'os.PathLike[str]'],
+        *,
+        size: int = MISSING,
+        max_size: Optional[int] = None
+    ) -> int:
+        """Download a CDN asset to a file.
+
+        The asset is first written to a temporary file next to `path`, which
+        is renamed once the download has completed. This means that `path`
+        never contains a partially downloaded asset.
+
+        Parameters:
+            url: The full URL to the asset.
+            path: The path of the file to write the asset to.
+            size: The value of the 'size' query parameter.
+            max_size:
+                The maximum size of the asset in bytes. If the asset is
+                larger, `AssetTooLarge` is raised and nothing is saved.
+
+        Returns:
+            The amount of bytes written.
+        """
+        path = os.fspath(path)
+        partial = path + '.part'
+
+        try:
+            async with self.read_asset_stream(url, size=size, max_size=max_size) as stream:
+                async with await anyio.open_file(partial, 'wb') as file:
+                    async for chunk in stream:
+                        await file.write(chunk)
+
+            os.replace(partial, path)
+        except BaseException:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(partial)
+            raise
+
+        return stream.received
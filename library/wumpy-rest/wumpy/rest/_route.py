@@ -1,11 +1,65 @@
-from typing import Dict, Union
+import hashlib
+import string
+import sys
+import time
+from typing import Dict, Optional, Tuple, Union
 from urllib.parse import quote as urlquote
 
+from ._utils import snowflake_timestamp
+
 __all__ = (
     'Route',
 )
 
 
+# Messages older than this are ratelimited separately when deleted
+OLD_MESSAGE_AGE = 14 * 24 * 60 * 60
+
+
+# Parameters which make up the major parameter, in order of priority
+MAJOR_PARAMS = ('webhook_id', 'interaction_token', 'channel_id', 'guild_id')
+
+
+class _RouteTemplate:
+    """Information about a path shared by all routes to it.
+
+    Templates are interned by method and path, so that the endpoint string
+    and the parsing of the path is only done once for each endpoint rather
+    than for every request.
+    """
+
+    __slots__ = ('endpoint', 'fields', 'major', 'old_delete')
+
+    def __init__(self, method: str, path: str) -> None:
+        self.endpoint = sys.intern(f'{method} {path}')
+
+        self.fields = tuple(
+            field for _, field, _, _ in string.Formatter().parse(path) if field
+        )
+        self.major = tuple(param for param in MAJOR_PARAMS if param in self.fields)
+        self.old_delete = (
+            method == 'DELETE' and path == '/channels/{channel_id}/messages/{message_id}'
+        )
+
+
+_templates: Dict[Tuple[str, str], _RouteTemplate] = {}
+
+# The maximum amount of interned templates. There are far fewer endpoints,
+# but paths from elsewhere (such as requests to the proxy) are arbitrary and
+# should not grow the cache forever.
+MAX_TEMPLATES = 1024
+
+
+def _get_template(method: str, path: str) -> _RouteTemplate:
+    template = _templates.get((method, path))
+    if template is None:
+        template = _RouteTemplate(method, path)
+        if len(_templates) < MAX_TEMPLATES:
+            _templates[(method, path)] = template
+
+    return template
+
+
 class Route:
     """A route that a request should be made to.
 
@@ -13,6 +67,10 @@ class Route:
     used to figure out ratelimit handling. If the request made should have a
     request body this should be passed to the requester.
 
+    The computed properties (such as `url` and `major_params`) are cached
+    after first being accessed, so the attributes should not be modified
+    after the route has been created.
+
     Attributes:
         method: The HTTP method to use.
         path: The path to the endpoint, concatenated to the `BASE` url.
@@ -25,7 +83,12 @@ class Route:
     path: str
     params: Dict[str, Union[str, int]]
 
-    __slots__ = ('method', 'path', 'params')
+    _template: _RouteTemplate
+    _url: Optional[str]
+    _major_params: Optional[str]
+    _key: Optional[str]
+
+    __slots__ = ('method', 'path', 'params', '_template', '_url', '_major_params', '_key')
 
     def __init__(self, method: str, path: str, **params: Union[str, int]) -> None:
         self.method = method
@@ -33,6 +96,11 @@ class Route:
 
         self.params = params
 
+        self._template = _get_template(method, path)
+        self._url = None
+        self._major_params = None
+        self._key = None
+
     def __eq__(self, other: object) -> bool:
         return isinstance(other, Route) and self.endpoint == other.endpoint
 
@@ -51,28 +119,64 @@ class Route:
 
         This needs to be appended to the base URL after formatting.
         """
-        return self.path.format_map(
-            # Replace special characters with the %xx escapes
-            {k: urlquote(v) if isinstance(v, str) else v for k, v in self.params.items()}
-        )
+        if self._url is None:
+            if self._template.fields:
+                self._url = self.path.format_map(
+                    # Replace special characters with the %xx escapes
+                    {k: urlquote(v) if isinstance(v, str) else v for k, v in self.params.items()}
+                )
+            else:
+                self._url = self.path
+
+        return self._url
 
     @property
     def endpoint(self) -> str:
         """Return the Discord endpoint this route will request."""
-        return f'{self.method} {self.path}'
+        return self._template.endpoint
 
     @property
     def major_params(self) -> str:
-        """Return a string of the formatted major parameters."""
-        param = (
-            self.params.get('webhook_id')
-            or self.params.get('channel_id')
-            or self.params.get('guild_id')
-        )
+        """Return a string of the formatted major parameters.
+
+        Deleting messages older than 14 days is ratelimited separately (and
+        more strictly) by Discord, so these routes get an additional `:old`
+        suffix to not share a lock with deletes of newer messages.
+        """
+        if self._major_params is not None:
+            return self._major_params
+
+        param = None
+        for name in self._template.major:
+            param = self.params.get(name)
+            if param:
+                if name == 'interaction_token':
+                    # The token is a secret, which should not end up in lock
+                    # keys and logs. A digest of it is just as unique.
+                    param = hashlib.blake2b(str(param).encode(), digest_size=8).hexdigest()
+                break
+
+        if not param:
+            self._major_params = ''
+        elif (
+            self._template.old_delete
+            and time.time() - snowflake_timestamp(self.params['message_id'])
+            > OLD_MESSAGE_AGE
+        ):
+            self._major_params = f':{param}:old'
+        else:
+            self._major_params = f':{param}'
+
+        return self._major_params
 
-        if param:
-            # TODO: Discord handles messages over 14 days differently in terms
-            # of ratelimiting because it is more costly.
-            return f':{param}'
+    @property
+    def key(self) -> str:
+        """Return the endpoint followed by the major parameters.
+
+        Routes with the same key are always ratelimited together, and this is
+        used to key ratelimit locks before the bucket of the route is known.
+        """
+        if self._key is None:
+            self._key = self.endpoint + self.major_params
 
-        return ''
+        return self._key
@@ -0,0 +1,324 @@
+import logging
+from collections import deque
+from types import TracebackType
+from typing import (
+    Deque, Dict, List, Optional, Sequence, SupportsInt, Tuple, Type
+)
+
+import anyio
+import anyio.abc
+from discord_typings import EmbedData
+from typing_extensions import Self
+
+from ._errors import Forbidden, NotFound
+from ._utils import MISSING
+from .endpoints import WebhookEndpoints
+
+__all__ = (
+    'WebhookSender',
+)
+
+
+_log = logging.getLogger(__name__)
+
+
+# The limits Discord puts on a single message
+MAX_CONTENT = 2000
+MAX_EMBEDS = 10
+
+
+_Key = Tuple[int, str, Optional[int]]
+
+
+class _Queued:
+    __slots__ = ('content', 'embeds')
+
+    def __init__(self, content: Optional[str], embeds: Sequence[EmbedData]) -> None:
+        self.content = content
+        self.embeds = embeds
+
+
+class _Queue:
+    """Queued messages of a webhook, keeping running totals of their size.
+
+    The totals are what `send()` compares against to decide whether a
+    message is full, which would otherwise walk the whole queue each time.
+    """
+
+    __slots__ = ('items', 'length', 'embeds')
+
+    def __init__(self) -> None:
+        self.items: Deque[_Queued] = deque()
+
+        # The length of the content if all messages were merged (including a
+        # newline for each), and the amount of embeds.
+        self.length = 0
+        self.embeds = 0
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def append(self, item: _Queued) -> None:
+        self.items.append(item)
+        self.length += len(item.content or '') + 1
+        self.embeds += len(item.embeds)
+
+    def popleft(self) -> _Queued:
+        item = self.items.popleft()
+        self.length -= len(item.content or '') + 1
+        self.embeds -= len(item.embeds)
+        return item
+
+    def clear(self) -> None:
+        self.items.clear()
+        self.length = 0
+        self.embeds = 0
+
+
+def _pack(queue: _Queue) -> Tuple[Optional[str], List[EmbedData], int]:
+    """Pop as many queued messages as fit into a single message.
+
+    Returns:
+        The content and embeds of the message, and how many queued messages
+        were merged into it.
+    """
+    content: List[str] = []
+    length = -1  # The first line has no newline before it
+    embeds: List[EmbedData] = []
+    count = 0
+
+    while queue:
+        item = queue.items[0]
+
+        new_length = length + (len(item.content) + 1 if item.content else 0)
+        if count > 0 and (
+            new_length > MAX_CONTENT or len(embeds) + len(item.embeds) > MAX_EMBEDS
+        ):
+            break
+
+        queue.popleft()
+        count += 1
+
+        if item.content:
+            content.append(item.content)
+            length = new_length
+        embeds.extend(item.embeds)
+
+    return '\n'.join(content) or None, embeds, count
+
+
+class WebhookSender:
+    """Queue messages for webhooks and send them merged together.
+
+    Each webhook has a strict ratelimit bucket, which high-volume senders such
+    as logging handlers quickly exhaust. Messages passed to `send()` are
+    queued per webhook instead, and flushed every `interval` seconds - or as
+    soon as enough is queued to fill a message. When flushing, queued
+    messages are merged into as few messages as possible, with their content
+    separated by newlines and up to 10 embeds and 2000 characters each.
+
+    The sender has to be entered as an asynchronous context manager, which
+    runs the flushing in the background and flushes what is left when
+    exiting:
+
+    ```python
+    async with WebhookSender(api, interval=5) as sender:
+        sender.send(webhook, token, content='Deployment started')
+        ...
+    ```
+
+    Attributes:
+        api: The requester to execute the webhooks with.
+        interval: Seconds between flushes of the queued messages.
+        max_queued:
+            The maximum amount of messages queued per webhook. Once reached,
+            the oldest queued message is dropped for each new message.
+        sent: The amount of requests made to execute webhooks.
+        merged: The amount of messages merged into another message's request.
+        dropped: The amount of messages dropped because the queue was full.
+        failed: The amount of messages which failed to be sent.
+    """
+
+    api: WebhookEndpoints
+    interval: float
+    max_queued: int
+
+    sent: int
+    merged: int
+    dropped: int
+    failed: int
+
+    _queues: Dict[_Key, _Queue]
+    _wakeup: Optional[anyio.Event]
+    _tasks: Optional[anyio.abc.TaskGroup]
+    _flushing: anyio.Lock
+
+    __slots__ = (
+        'api', 'interval', 'max_queued', 'sent', 'merged', 'dropped', 'failed',
+        '_queues', '_wakeup', '_tasks', '_flushing',
+    )
+
+    def __init__(
+        self,
+        api: WebhookEndpoints,
+        *,
+        interval: float = 2.0,
+        max_queued: int = 1000
+    ) -> None:
+        self.api = api
+        self.interval = interval
+        self.max_queued = max_queued
+
+        self.sent = 0
+        self.merged = 0
+        self.dropped = 0
+        self.failed = 0
+
+        self._queues = {}
+        self._wakeup = None
+        self._tasks = None
+        self._flushing = anyio.Lock()
+
+    def __repr__(self) -> str:
+        return (
+            f'<WebhookSender queued={self.queued} sent={self.sent}'
+            f' merged={self.merged} dropped={self.dropped}>'
+        )
+
+    @property
+    def queued(self) -> int:
+        """The amount of messages currently queued, across all webhooks."""
+        return sum(len(queue) for queue in self._queues.values())
+
+    async def __aenter__(self) -> Self:
+        if self._tasks is not None:
+            raise RuntimeError('Cannot enter the same WebhookSender twice')
+
+        self._wakeup = anyio.Event()
+        self._tasks = anyio.create_task_group()
+        await self._tasks.__aenter__()
+
+        self._tasks.start_soon(self._run)
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_val: Optional[BaseException],
+        exc_tb: Optional[TracebackType]
+    ) -> None:
+        assert self._tasks is not None
+
+        self._tasks.cancel_scope.cancel()
+        try:
+            await self._tasks.__aexit__(exc_type, exc_val, exc_tb)
+        finally:
+            self._tasks = None
+
+        # Don't lose what is left in the queues when exiting normally
+        if exc_type is None:
+            await self.flush()
+
+    def send(
+        self,
+        webhook: SupportsInt,
+        token: str,
+        *,
+        thread: Optional[SupportsInt] = None,
+        content: Optional[str] = None,
+        embeds: Sequence[EmbedData] = ()
+    ) -> None:
+        """Queue a message to be sent by the webhook.
+
+        Parameters:
+            webhook: The ID of the webhook to execute.
+            token: The token of the webhook.
+            thread: The thread to post the message in.
+            content: The content of the message.
+            embeds: The embeds of the message.
+        """
+        if self._tasks is None or self._wakeup is None:
+            raise RuntimeError("Cannot send messages before entering the 'WebhookSender'")
+
+        if not content and not embeds:
+            raise TypeError("one of 'content' or 'embeds' is required")
+        if content and len(content) > MAX_CONTENT:
+            raise ValueError(f'content cannot be longer than {MAX_CONTENT} characters')
+        if len(embeds) > MAX_EMBEDS:
+            raise ValueError(f'cannot send more than {MAX_EMBEDS} embeds in one message')
+
+        key = (int(webhook), token, int(thread) if thread is not None else None)
+
+        queue = self._queues.get(key)
+        if queue is None:
+            queue = self._queues[key] = _Queue()
+
+        if len(queue) >= self.max_queued:
+            queue.popleft()
+            self.dropped += 1
+
+        queue.append(_Queued(content, embeds))
+
+        # There is enough queued to fill a message, which will not get any
+        # better from waiting for the interval.
+        if not self._wakeup.is_set() and (
+            queue.embeds >= MAX_EMBEDS or queue.length > MAX_CONTENT
+        ):
+            self._wakeup.set()
+
+    async def _run(self) -> None:
+        while True:
+            assert self._wakeup is not None
+
+            with anyio.move_on_after(self.interval):
+                await self._wakeup.wait()
+
+            self._wakeup = anyio.Event()
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Send all queued messages.
+
+        Different webhooks are flushed concurrently, since they have separate
+        ratelimits. If the queues are already being flushed - for example in
+        the background - this waits for that flush to finish first, so that
+        messages are never sent out of order.
+        """
+        async with self._flushing:
+            async with anyio.create_task_group() as tasks:
+                for key, queue in self._queues.items():
+                    if queue:
+                        tasks.start_soon(self._flush_queue, key, queue)
+
+            # Forget webhooks that are no longer being used
+            for key in [key for key, queue in self._queues.items() if not queue]:
+                del self._queues[key]
+
+    async def _flush_queue(self, key: _Key, queue: _Queue) -> None:
+        webhook, token, thread = key
+
+        while queue:
+            content, embeds, count = _pack(queue)
+
+            try:
+                await self.api.execute_webhook(
+                    webhook, token,
+                    thread=thread if thread is not None else MISSING,
+                    content=content if content is not None else MISSING,
+                    embeds=embeds or MISSING
+                )
+            except (Forbidden, NotFound) as exc:
+                # The webhook has been deleted or its token is wrong, so the
+                # rest of the queue would fail too.
+                _log.warning(f'Failed to send messages to webhook {webhook}: {exc!r}')
+                self.failed += count + len(queue)
+                queue.clear()
+                return
+            except Exception as exc:
+                # Leave the rest of the queue for the next flush
+                _log.warning(f'Failed to send {count} messages to webhook {webhook}: {exc!r}')
+                self.failed += count
+                return
+
+            self.sent += 1
+            self.merged += count - 1
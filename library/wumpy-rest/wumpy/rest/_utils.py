@@ -1,4 +1,4 @@
-from typing import Any, Callable
+from typing import Any, Callable, SupportsInt, Union
 
 from typing_extensions import Final, final
 
@@ -6,24 +6,57 @@ __all__ = (
     'MISSING',
 )
 
-dump_json: Callable[[Any], str]
-load_json: Callable[[str], Any]
+# Both functions work with bytes to avoid unnecessary copies: orjson produces
+# and parses UTF-8 bytes directly, which is also what goes over the wire.
+dump_json: Callable[[Any], bytes]
+load_json: Callable[[Union[str, bytes]], Any]
 
 try:
     import orjson
 
-    def orjson_compat(obj: Any) -> str:
-        return orjson.dumps(obj).decode('utf-8')
-    dump_json = orjson_compat
+    dump_json = orjson.dumps
     load_json = orjson.loads
 
 except ImportError:
     import json
 
-    dump_json = json.dumps
+    def json_compat(obj: Any) -> bytes:
+        return json.dumps(obj).encode('utf-8')
+    dump_json = json_compat
     load_json = json.loads
 
 
+# The first second of 2015, the epoch used for Discord's snowflakes (in ms)
+DISCORD_EPOCH = 1420070400000
+
+
+def snowflake_timestamp(snowflake: SupportsInt) -> float:
+    """Get the UNIX timestamp (in seconds) a snowflake was created at.
+
+    Parameters:
+        snowflake: The snowflake to read the timestamp of.
+
+    Returns:
+        The number of seconds since the UNIX epoch.
+    """
+    return ((int(snowflake) >> 22) + DISCORD_EPOCH) / 1000
+
+
+def timestamp_snowflake(timestamp: float) -> int:
+    """Create the lowest snowflake of a UNIX timestamp.
+
+    This is useful for paginating by time, since Discord only reads the
+    timestamp of the snowflakes passed as `before` or `after`.
+
+    Parameters:
+        timestamp: The number of seconds since the UNIX epoch.
+
+    Returns:
+        The lowest snowflake created at the timestamp.
+    """
+    return max(int(timestamp * 1000) - DISCORD_EPOCH, 0) << 22
+
+
 @final
 class MissingType(object):
     """Representing an optional default when no value has been passed.
@@ -1,3 +1,4 @@
+import time
 from typing import (
     Any, Dict, Iterable, List, Optional, SupportsInt, Union, overload
 )
@@ -10,9 +11,10 @@ from discord_typings import (
 )
 from typing_extensions import Literal
 
+from .._bulk import BulkExecutor, BulkOperation, BulkResult
 from .._requester import Requester, RequestFiles
-from .._route import Route
-from .._utils import MISSING, dump_json
+from .._route import OLD_MESSAGE_AGE, Route
+from .._utils import MISSING, dump_json, timestamp_snowflake
 
 __all__ = (
     'ChannelEndpoints',
@@ -645,6 +647,73 @@ class ChannelEndpoints(Requester):
             ), json={'messages': [int(m) for m in messages]}, reason=reason
         )
 
+    async def purge_messages(
+        self,
+        channel: SupportsInt,
+        messages: Iterable[SupportsInt],
+        *,
+        reason: str = MISSING,
+        max_concurrency: int = 50
+    ) -> BulkResult:
+        """Delete any amount of messages, as quickly as possible.
+
+        Messages newer than 2 weeks are deleted in chunks of 100 with
+        `bulk_delete_messages()`. Older messages cannot be bulk-deleted, so
+        they are deleted one by one. These single deletes are ratelimited
+        separately from the bulk deletes, so both are made concurrently with
+        a `BulkExecutor`.
+
+        This method can only be called with guild channels and requires the
+        `MANAGE_MESSAGES` permission.
+
+        Parameters:
+            channel: The ID of the channel the messages are in.
+            messages: The IDs of the messages to delete, duplicates are ignored.
+            reason: The audit log reason for deleting the messages.
+            max_concurrency: The maximum amount of requests in-flight at once.
+
+        Returns:
+            The result of the bulk execution. Each operation is either a bulk
+            delete or a single delete, failed operations are collected in
+            `failures` rather than raised.
+        """
+        channel = int(channel)
+
+        # Leave a margin, since the messages may pass the limit while the
+        # purge is running (or because of clock drift with Discord).
+        cutoff = timestamp_snowflake(time.time() - OLD_MESSAGE_AGE + 60)
+
+        # Newest first, so that the messages closest to the cutoff are
+        # deleted before they pass it.
+        ids = sorted({int(m) for m in messages}, reverse=True)
+        recent = [m for m in ids if m >= cutoff]
+        single = [m for m in ids if m < cutoff]
+
+        operations = []
+        for i in range(0, len(recent), 100):
+            chunk = recent[i:i + 100]
+            if len(chunk) == 1:
+                # Bulk deleting requires at least 2 messages
+                single.insert(0, chunk[0])
+                continue
+
+            operations.append(BulkOperation(
+                Route(
+                    'POST', '/channels/{channel_id}/messages/bulk-delete',
+                    channel_id=channel
+                ), json={'messages': chunk}, reason=reason
+            ))
+
+        for message in single:
+            operations.append(BulkOperation(
+                Route(
+                    'DELETE', '/channels/{channel_id}/messages/{message_id}',
+                    channel_id=channel, message_id=message
+                ), reason=reason
+            ))
+
+        return await BulkExecutor(self, max_concurrency=max_concurrency).run(operations)
+
     async def set_permission(
         self,
         channel: SupportsInt,
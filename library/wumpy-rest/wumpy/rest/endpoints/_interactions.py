@@ -23,7 +23,7 @@ class InteractionEndpoints(Requester):
     @overload
     async def create_interaction_response(
         self,
-        application: SupportsInt,
+        interaction: SupportsInt,
         token: str,
         type: Literal[1, 5, 6]
     ) -> None:
@@ -32,7 +32,7 @@ class InteractionEndpoints(Requester):
     @overload
     async def create_interaction_response(
         self,
-        application: SupportsInt,
+        interaction: SupportsInt,
         token: str,
         type: Literal[8],
         *,
@@ -43,7 +43,7 @@ class InteractionEndpoints(Requester):
     @overload
     async def create_interaction_response(
         self,
-        application: SupportsInt,
+        interaction: SupportsInt,
         token: str,
         type: Literal[9],
         *,
@@ -56,7 +56,7 @@ class InteractionEndpoints(Requester):
     @overload
     async def create_interaction_response(
         self,
-        application: SupportsInt,
+        interaction: SupportsInt,
         token: str,
         type: Literal[4, 7],
         *,
@@ -73,7 +73,7 @@ class InteractionEndpoints(Requester):
 
     async def create_interaction_response(
         self,
-        application: SupportsInt,
+        interaction: SupportsInt,
         token: str,
         type: int,
         *,
@@ -95,6 +95,9 @@ class InteractionEndpoints(Requester):
         Depending on the overload and type of interaction used, see the
         different set of parameters you can pass.
 
+        Unlike the other endpoints for interactions, this takes the ID of the
+        interaction rather than the ID of the application.
+
         Parameters:
             choices: The suggested autocomplete choices.
 
@@ -145,8 +148,8 @@ class InteractionEndpoints(Requester):
 
         return await self.request(
             Route(
-                'POST', '/webhooks/{application_id}/{interaction_token}}/callback',
-                application_id=int(application), interaction_token=token
+                'POST', '/interactions/{interaction_id}/{interaction_token}/callback',
+                interaction_id=int(interaction), interaction_token=token
             ),
             data=data, files=httpxfiles
         )
@@ -299,7 +302,7 @@ class InteractionEndpoints(Requester):
 
         return await self.request(
             Route(
-                'POST', '/webhooks/{application_id}/{interaction_token}}',
+                'POST', '/webhooks/{application_id}/{interaction_token}',
                 application_id=int(application), interaction_token=token
             ),
             data=data, files=httpxfiles
@@ -235,7 +235,7 @@ class WebhookEndpoints(Requester):
         json = {
             'content': content,
             'username': username,
-            'avatar_url': str(avatar_url),
+            'avatar_url': str(avatar_url) if avatar_url is not MISSING else MISSING,
             'tts': tts,
             'embeds': embeds,
             'components': components,
@@ -254,7 +254,7 @@ class WebhookEndpoints(Requester):
 
         ret = await self.request(
             Route(
-                'POST', '/webhooks/{webhook_id}/{webhook_token}}',
+                'POST', '/webhooks/{webhook_id}/{webhook_token}',
                 webhook_id=int(webhook), webhook_token=token
             ),
             data=data, files=httpxfiles, params=params
@@ -0,0 +1,91 @@
+import json
+from typing import AsyncIterator, List, Tuple
+
+import anyio
+import anyio.abc
+import h11
+import pytest
+
+
+class Server:
+    """Minimal HTTP/1.1 server recording requests and echoing them back."""
+
+    def __init__(self, listener: anyio.abc.SocketListener) -> None:
+        self.listener = listener
+        self.requests: List[Tuple[str, str, bytes]] = []
+        self.connections = 0
+
+    @property
+    def base_url(self) -> str:
+        port = self.listener.extra(anyio.abc.SocketAttribute.local_port)
+        return f'http://127.0.0.1:{port}/api/v10'
+
+    async def serve(self, stream: anyio.abc.SocketStream) -> None:
+        self.connections += 1
+        conn = h11.Connection(h11.SERVER)
+
+        async with stream:
+            while True:
+                request = None
+                body = b''
+
+                while True:
+                    event = conn.next_event()
+                    if event is h11.NEED_DATA:
+                        try:
+                            conn.receive_data(await stream.receive())
+                        except (anyio.EndOfStream, anyio.BrokenResourceError):
+                            return
+                    elif isinstance(event, h11.Request):
+                        request = event
+                    elif isinstance(event, h11.Data):
+                        body += event.data
+                    elif isinstance(event, h11.EndOfMessage):
+                        break
+                    else:
+                        return
+
+                assert request is not None
+                method, target = request.method.decode(), request.target.decode()
+                self.requests.append((method, target, body))
+
+                if target.endswith('/missing'):
+                    status = 404
+                elif target.endswith('/error'):
+                    status = 500
+                elif target.endswith('/created'):
+                    status = 201
+                else:
+                    status = 200
+                content_type = 'text/plain' if target.endswith('/text') else 'application/json'
+                content = json.dumps({
+                    'method': method, 'target': target,
+                    'headers': {k.decode(): v.decode() for k, v in request.headers},
+                }).encode()
+
+                try:
+                    await stream.send(conn.send(h11.Response(status_code=status, headers=[
+                        ('Content-Type', content_type),
+                        ('Content-Length', str(len(content))),
+                        ('X-RateLimit-Bucket', 'abc123'),
+                    ])))
+                    if method != 'HEAD':
+                        await stream.send(conn.send(h11.Data(data=content)))
+                    await stream.send(conn.send(h11.EndOfMessage()))
+                except anyio.BrokenResourceError:
+                    # The client closed the connection without reading the
+                    # response, for example because it was too large.
+                    return
+                conn.start_next_cycle()
+
+
+@pytest.fixture
+async def server() -> AsyncIterator[Server]:
+    """Local HTTP server echoing back the requests made to it."""
+    async with await anyio.create_tcp_listener(local_host='127.0.0.1') as listener:
+        server = Server(listener)
+
+        async with anyio.create_task_group() as tasks:
+            tasks.start_soon(listener.serve, server.serve)
+            yield server
+            tasks.cancel_scope.cancel()
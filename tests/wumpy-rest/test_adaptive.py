@@ -0,0 +1,178 @@
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, List, Mapping
+
+import anyio
+import pytest
+from wumpy.rest import (
+    AdaptiveLimit, AdaptiveRatelimiter, DictRatelimiter,
+    PassthroughRatelimiter, RateLimited, Route
+)
+from wumpy.rest._config import RatelimiterContext
+
+
+class TestAdaptiveLimit:
+    def test_grows_when_saturated(self) -> None:
+        limit = AdaptiveLimit(2)
+
+        limit.acquire_nowait()
+        limit.record_success(0.1)
+        # Only half the window was in use
+        assert limit.limit == 2
+
+        limit.acquire_nowait()
+        limit.record_success(0.1)
+        assert limit.limit == 2.5
+
+    def test_shrinks_once_per_round_trip(self) -> None:
+        limit = AdaptiveLimit(16)
+
+        started = time.perf_counter()
+        limit.record_congestion(started)
+        limit.record_congestion(started)
+        assert limit.limit == 8
+
+        limit.record_congestion(time.perf_counter())
+        assert limit.limit == 4
+
+    def test_latency_congestion(self) -> None:
+        limit = AdaptiveLimit(8, min_limit=2)
+
+        limit.record_success(0.1)
+        limit.record_success(0.5)
+        assert limit.limit == 4
+        assert limit.baseline is not None and limit.baseline < 0.11
+
+    @pytest.mark.anyio
+    async def test_priority(self) -> None:
+        limit = AdaptiveLimit(1)
+        order: List[int] = []
+
+        async def waiter(priority: int) -> None:
+            await limit.acquire(priority)
+            order.append(priority)
+            limit.release()
+
+        await limit.acquire()
+        async with anyio.create_task_group() as tasks:
+            for priority in (0, 10, 5):
+                tasks.start_soon(waiter, priority)
+                await anyio.sleep(0.01)
+
+            limit.release()
+
+        assert order == [10, 5, 0]
+
+
+def channel_route(channel: int) -> Route:
+    return Route('GET', '/channels/{channel_id}', channel_id=channel)
+
+
+class TestAdaptiveRatelimiter:
+    @pytest.mark.anyio
+    async def test_concurrency_limited(self) -> None:
+        running = 0
+        peak = 0
+
+        async def request(ratelimiter: AdaptiveRatelimiter, channel: int) -> None:
+            nonlocal running, peak
+
+            async with ratelimiter(channel_route(channel), RatelimiterContext()) as update:
+                running += 1
+                peak = max(peak, running)
+                await anyio.sleep(0.01)
+                running -= 1
+                await update({})
+
+        async with AdaptiveRatelimiter(PassthroughRatelimiter(), route_initial=3) as ratelimiter:
+            async with anyio.create_task_group() as tasks:
+                for channel in range(20):
+                    tasks.start_soon(request, ratelimiter, channel)
+
+        # The window grows while it is saturated, but never all at once
+        limit = ratelimiter.routes['GET /channels/{channel_id}'].limit
+        assert 3 < limit < 20
+        assert 3 <= peak <= int(limit)
+
+    @pytest.mark.anyio
+    async def test_ratelimited_shrinks(self) -> None:
+        headers: Mapping[str, Any] = {'X-RateLimit-Scope': 'global'}
+
+        async with AdaptiveRatelimiter(PassthroughRatelimiter(), initial=8) as ratelimiter:
+            with pytest.raises(RateLimited):
+                async with ratelimiter(channel_route(1), RatelimiterContext()) as update:
+                    await update(headers)
+                    raise RateLimited(429, headers)
+
+        assert ratelimiter.global_limit.limit == 4
+        assert ratelimiter.routes['GET /channels/{channel_id}'].limit == 2
+
+    @pytest.mark.anyio
+    async def test_exhausted_bucket_holds_no_slots(self) -> None:
+        # Requests waiting for one channel's exhausted bucket should not hold
+        # the endpoint's window from requests to other channels.
+        exhausted = {
+            'X-RateLimit-Bucket': 'abc123',
+            'X-RateLimit-Limit': '5',
+            'X-RateLimit-Remaining': '0',
+            'X-RateLimit-Reset': str(time.time() + 10),
+        }
+
+        async def request(ratelimiter: AdaptiveRatelimiter, channel: int) -> None:
+            async with ratelimiter(channel_route(channel), RatelimiterContext()) as update:
+                await update(exhausted)
+
+        async with AdaptiveRatelimiter(DictRatelimiter(), initial=4) as ratelimiter:
+            await request(ratelimiter, 1)
+
+            async with anyio.create_task_group() as tasks:
+                for _ in range(8):
+                    tasks.start_soon(request, ratelimiter, 1)
+                await anyio.wait_all_tasks_blocked()
+
+                with anyio.fail_after(1):
+                    await request(ratelimiter, 2)
+
+                tasks.cancel_scope.cancel()
+
+        assert ratelimiter.global_limit.in_flight == 0
+        assert ratelimiter.routes['GET /channels/{channel_id}'].in_flight == 0
+
+    @pytest.mark.anyio
+    async def test_full_window_holds_no_bucket(self) -> None:
+        # Requests waiting for a slot of the window should not hold their
+        # bucket, which other requests to it could use.
+        entered = 0
+
+        class CountingRatelimiter(PassthroughRatelimiter):
+            @asynccontextmanager
+            async def __call__(self, route: Route, ctx: RatelimiterContext) -> AsyncIterator[Any]:
+                nonlocal entered
+
+                entered += 1
+                try:
+                    async with super().__call__(route, ctx) as update:
+                        yield update
+                finally:
+                    entered -= 1
+
+        release = anyio.Event()
+
+        async def request(ratelimiter: AdaptiveRatelimiter, channel: int) -> None:
+            async with ratelimiter(channel_route(channel), RatelimiterContext()) as update:
+                await release.wait()
+                await update({})
+
+        async with AdaptiveRatelimiter(CountingRatelimiter(), route_initial=1) as ratelimiter:
+            async with anyio.create_task_group() as tasks:
+                for channel in range(3):
+                    tasks.start_soon(request, ratelimiter, channel)
+                await anyio.wait_all_tasks_blocked()
+
+                # Only the request holding the slot holds its bucket
+                assert entered == 1
+
+                with anyio.fail_after(1):
+                    release.set()
+
+        assert entered == 0
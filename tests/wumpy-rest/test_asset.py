@@ -0,0 +1,71 @@
+import json
+from pathlib import Path
+
+import pytest
+from conftest import Server
+from wumpy.rest import AssetTooLarge, H11Requester, HTTPXRequester, NotFound
+
+REQUESTERS = [HTTPXRequester, H11Requester]
+
+
+@pytest.mark.parametrize('requester', REQUESTERS)
+class TestAssetStream:
+    @pytest.mark.anyio
+    async def test_stream(self, server: Server, requester: type) -> None:
+        async with requester() as api:
+            url = server.base_url + '/avatar.png'
+
+            expected = await api.read_asset(url)
+            stream = api.read_asset_stream(url, chunk_size=16)
+            chunks = [chunk async for chunk in stream]
+
+        assert b''.join(chunks) == expected
+        assert all(len(chunk) <= 16 for chunk in chunks)
+        assert stream.received == len(expected) == stream.size
+
+    @pytest.mark.anyio
+    async def test_max_size(self, server: Server, requester: type) -> None:
+        async with requester() as api:
+            with pytest.raises(AssetTooLarge):
+                await api.read_asset(server.base_url + '/avatar.png', max_size=10)
+
+            assert await api.read_asset(server.base_url + '/avatar.png', max_size=10_000)
+
+    @pytest.mark.anyio
+    async def test_not_found(self, server: Server, requester: type) -> None:
+        async with requester() as api:
+            with pytest.raises(NotFound):
+                async with api.read_asset_stream(server.base_url + '/missing'):
+                    pass
+
+    @pytest.mark.anyio
+    async def test_save(self, server: Server, tmp_path: Path, requester: type) -> None:
+        path = tmp_path / 'avatar.png'
+
+        async with requester() as api:
+            written = await api.save_asset(server.base_url + '/avatar.png', path)
+
+            with pytest.raises(AssetTooLarge):
+                await api.save_asset(server.base_url + '/other.png', tmp_path / 'b', max_size=10)
+
+        assert path.stat().st_size == written
+        assert [p.name for p in tmp_path.iterdir()] == ['avatar.png']
+
+    @pytest.mark.anyio
+    async def test_connection_reused(self, server: Server, requester: type) -> None:
+        async with requester() as api:
+            for _ in range(3):
+                async with api.read_asset_stream(server.base_url + '/avatar.png') as stream:
+                    async for _ in stream:
+                        pass
+
+        assert server.connections == 1
+
+    @pytest.mark.anyio
+    async def test_model_read(self, server: Server, requester: type) -> None:
+        models = pytest.importorskip('wumpy.models', exc_type=ImportError)
+
+        async with requester():
+            content = await models.Asset(server.base_url + '/avatar.png').read(max_size=10_000)
+
+        assert json.loads(content)['target'] == '/api/v10/avatar.png'
@@ -0,0 +1,88 @@
+import time
+
+import pytest
+from conftest import Server
+from wumpy.rest import (
+    CircuitBreaker, CircuitOpen, CircuitState, H11Requester, HTTPXRequester,
+    NotFound, Route, ServerException
+)
+
+ERROR = Route('GET', '/error')
+
+
+class TestCircuitBreaker:
+    def test_opens(self) -> None:
+        breaker = CircuitBreaker(failure_threshold=3)
+
+        for _ in range(3):
+            assert breaker.allow(ERROR) is None
+            breaker.record_failure(ERROR)
+
+        assert breaker.state(ERROR.endpoint) is CircuitState.OPEN
+        assert breaker.allow(ERROR) is not None
+        assert breaker.opened == 1
+        assert breaker.rejected == 1
+
+    def test_success_resets(self) -> None:
+        breaker = CircuitBreaker(failure_threshold=2)
+
+        breaker.record_failure(ERROR)
+        breaker.record_success(ERROR)
+        breaker.record_failure(ERROR)
+
+        assert breaker.state(ERROR.endpoint) is CircuitState.CLOSED
+
+    def test_half_open(self) -> None:
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01)
+        breaker.record_failure(ERROR)
+
+        time.sleep(0.02)
+        assert breaker.state(ERROR.endpoint) is CircuitState.HALF_OPEN
+
+        # Only one trial request is let through
+        assert breaker.allow(ERROR) is None
+        assert breaker.allow(ERROR) is not None
+
+        breaker.record_failure(ERROR)
+        assert breaker.state(ERROR.endpoint) is CircuitState.OPEN
+
+        time.sleep(0.02)
+        assert breaker.allow(ERROR) is None
+
+        breaker.record_success(ERROR)
+        assert breaker.state(ERROR.endpoint) is CircuitState.CLOSED
+        assert breaker.open_endpoints == {}
+
+    def test_retry_budget(self) -> None:
+        breaker = CircuitBreaker(retry_ratio=0.5, max_retries=1)
+
+        assert breaker.retry(ERROR)
+        assert not breaker.retry(ERROR)
+        assert breaker.retries_denied == 1
+
+        breaker.allow(ERROR)
+        breaker.allow(ERROR)
+        assert breaker.retry(ERROR)
+
+
+class TestRequester:
+    @pytest.mark.anyio
+    @pytest.mark.parametrize('requester', [HTTPXRequester, H11Requester])
+    async def test_fails_fast(self, server: Server, requester: type) -> None:
+        breaker = CircuitBreaker(failure_threshold=2, max_retries=0)
+
+        async with requester(base_url=server.base_url, circuit_breaker=breaker) as api:
+            for _ in range(2):
+                with pytest.raises(ServerException):
+                    await api.request(ERROR)
+
+            with pytest.raises(CircuitOpen):
+                await api.request(ERROR)
+
+            # Other routes are unaffected, and client errors don't count
+            with pytest.raises(NotFound):
+                await api.request(Route('GET', '/missing'))
+
+        assert len(server.requests) == 3
+        assert breaker.retries_denied == 1
+        assert set(breaker.open_endpoints) == {ERROR.endpoint}
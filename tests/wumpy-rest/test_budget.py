@@ -0,0 +1,65 @@
+import time
+
+import pytest
+from conftest import Server
+from wumpy.rest import (
+    HTTPXRequester, InvalidRequestBudget, Priority, RateLimited, Route,
+    abort_if_ratelimited, request_priority
+)
+
+
+class TestInvalidRequestBudget:
+    def test_record(self) -> None:
+        budget = InvalidRequestBudget()
+
+        assert budget.record(403, {})
+        assert budget.record(429, {'X-RateLimit-Scope': 'user'})
+        assert not budget.record(429, {'X-RateLimit-Scope': 'shared'})
+        assert not budget.record(404, {})
+
+        assert budget.count == 2
+
+    def test_window(self) -> None:
+        budget = InvalidRequestBudget(window=0.06)
+        budget.add(5)
+        assert budget.count == 5
+
+        time.sleep(0.07)
+        assert budget.count == 0
+
+    def test_should_shed(self) -> None:
+        budget = InvalidRequestBudget(100, shed_at=0.5, block_at=0.9)
+
+        budget.add(49)
+        assert not budget.should_shed(Priority.BACKGROUND)
+
+        budget.add(1)
+        assert budget.should_shed(Priority.BACKGROUND)
+        assert not budget.should_shed(Priority.NORMAL)
+
+        budget.add(40)
+        assert budget.should_shed(Priority.INTERACTIVE)
+
+    def test_invalid_thresholds(self) -> None:
+        with pytest.raises(ValueError):
+            InvalidRequestBudget(shed_at=0.9, block_at=0.5)
+
+
+class TestShedding:
+    @pytest.mark.anyio
+    async def test_shed_background(self, server: Server) -> None:
+        budget = InvalidRequestBudget(10, shed_at=0.5)
+        budget.add(5)
+
+        async with HTTPXRequester(base_url=server.base_url, invalid_requests=budget) as api:
+            with request_priority(Priority.BACKGROUND):
+                with pytest.raises(RateLimited):
+                    await api.request(Route('GET', '/gateway'))
+
+                with abort_if_ratelimited() as abort:
+                    await api.request(Route('GET', '/gateway'))
+                assert abort.aborted
+
+            await api.request(Route('GET', '/gateway'))
+
+        assert len(server.requests) == 1
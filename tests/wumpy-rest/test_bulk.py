@@ -0,0 +1,153 @@
+import time
+from typing import Any, Dict, List
+
+import anyio
+import pytest
+from wumpy.rest import (
+    BulkExecutor, BulkOperation, BulkProgress, DictRatelimiter, NotFound,
+    Requester, Route
+)
+from wumpy.rest._utils import timestamp_snowflake
+from wumpy.rest.endpoints import ChannelEndpoints
+
+
+class RecordingRequester(Requester):
+    def __init__(self, ratelimiter: DictRatelimiter) -> None:
+        super().__init__()
+
+        self.ratelimiter = ratelimiter
+        self.running = 0
+        self.peak = 0
+        self.requested: List[Route] = []
+
+    async def request(self, route: Route, **kwargs: Any) -> Any:
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await anyio.sleep(0.01)
+        finally:
+            self.running -= 1
+
+        self.requested.append(route)
+
+        if route.params.get('user_id') == 0:
+            raise NotFound(404, {})
+
+        # Simulate the ratelimiter learning about the bucket
+        self.ratelimiter.buckets[route.endpoint] = 'abc123'
+        self.ratelimiter.limits['abc123'] = 5
+        return route.params['user_id']
+
+
+def role_route(guild: int, user: int) -> Route:
+    return Route(
+        'PUT', '/guilds/{guild_id}/members/{user_id}/roles/{role_id}',
+        guild_id=guild, user_id=user, role_id=1
+    )
+
+
+class TestBulkExecutor:
+    @pytest.mark.anyio
+    async def test_results_ordered(self) -> None:
+        api = RecordingRequester(DictRatelimiter())
+
+        result = await BulkExecutor(api).run(
+            BulkOperation(role_route(1, user)) for user in range(1, 21)
+        )
+
+        assert result.results == list(range(1, 21))
+        assert result.failures == []
+        assert result.progress.completed == 20
+
+    @pytest.mark.anyio
+    async def test_failures_collected(self) -> None:
+        api = RecordingRequester(DictRatelimiter())
+
+        result = await BulkExecutor(api).run(
+            BulkOperation(role_route(1, user)) for user in range(0, 3)
+        )
+
+        assert len(result.failures) == 1
+        assert isinstance(result.failures[0][1], NotFound)
+        assert result.results == [None, 1, 2]
+        assert result.progress.failed == 1
+
+    @pytest.mark.anyio
+    async def test_bucket_limit(self) -> None:
+        api = RecordingRequester(DictRatelimiter())
+
+        await BulkExecutor(api).run(
+            BulkOperation(role_route(1, user)) for user in range(1, 31)
+        )
+
+        # The first request is made alone, after which the limit is known
+        assert api.peak == 5
+
+    @pytest.mark.anyio
+    async def test_major_params_parallel(self) -> None:
+        api = RecordingRequester(DictRatelimiter())
+
+        await BulkExecutor(api).run(
+            BulkOperation(role_route(guild, 1)) for guild in range(1, 11)
+        )
+
+        assert api.peak == 10
+
+    @pytest.mark.anyio
+    async def test_progress(self) -> None:
+        api = RecordingRequester(DictRatelimiter())
+        reported: List[int] = []
+
+        await BulkExecutor(api, on_progress=lambda p: reported.append(p.done)).run(
+            BulkOperation(role_route(1, user)) for user in range(1, 6)
+        )
+
+        assert reported == [1, 2, 3, 4, 5]
+
+    @pytest.mark.anyio
+    async def test_progress_error(self, caplog: pytest.LogCaptureFixture) -> None:
+        api = RecordingRequester(DictRatelimiter())
+
+        def on_progress(progress: BulkProgress) -> None:
+            raise RuntimeError('broken callback')
+
+        result = await BulkExecutor(api, on_progress=on_progress).run(
+            BulkOperation(role_route(1, user)) for user in range(1, 6)
+        )
+
+        assert result.results == [1, 2, 3, 4, 5]
+        assert 'Exception in bulk progress callback' in caplog.text
+
+
+class PurgeRequester(ChannelEndpoints):
+    def __init__(self) -> None:
+        super().__init__()
+
+        self.ratelimiter = DictRatelimiter()
+        self.requested: List[Dict[str, Any]] = []
+
+    async def request(self, route: Route, **kwargs: Any) -> Any:
+        self.requested.append({'route': route, **kwargs})
+
+
+class TestPurgeMessages:
+    @pytest.mark.anyio
+    async def test_chunked_by_age(self) -> None:
+        api = PurgeRequester()
+
+        recent = [timestamp_snowflake(time.time() - 60) + i for i in range(201)]
+        old = [timestamp_snowflake(time.time() - 30 * 24 * 60 * 60) + i for i in range(3)]
+
+        result = await api.purge_messages(1, recent + old + recent[:10])
+        assert result.failures == []
+
+        bulk = [r['json']['messages'] for r in api.requested if r['route'].method == 'POST']
+        assert sorted(len(chunk) for chunk in bulk) == [100, 100]
+
+        single = {
+            r['route'].params['message_id'] for r in api.requested
+            if r['route'].method == 'DELETE'
+        }
+        # The oldest recent message is left alone in its chunk
+        assert single == {min(recent), *old}
+        assert set().union(*bulk) | single == set(recent + old)
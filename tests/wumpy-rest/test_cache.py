@@ -0,0 +1,87 @@
+import os
+from pathlib import Path
+
+import pytest
+from conftest import Server
+from wumpy.rest import AssetCache, HTTPXRequester
+
+A = AssetCache.key('https://cdn.discordapp.com/a.png')
+B = AssetCache.key('https://cdn.discordapp.com/b.png')
+C = AssetCache.key('https://cdn.discordapp.com/c.png')
+
+
+class TestAssetCache:
+    def test_key_normalized(self) -> None:
+        assert AssetCache.key('https://CDN.discordapp.com/a.png?size=64&x=1') == (
+            AssetCache.key('https://cdn.discordapp.com/a.png?x=1', {'size': 64})
+        )
+        assert AssetCache.key('https://cdn.discordapp.com/a.png?') == (
+            AssetCache.key('https://cdn.discordapp.com/a.png')
+        )
+        assert AssetCache.key('https://cdn.discordapp.com/a.png?size=64') != (
+            AssetCache.key('https://cdn.discordapp.com/a.png?size=128')
+        )
+
+    @pytest.mark.anyio
+    async def test_disk_eviction(self, tmp_path: Path) -> None:
+        cache = AssetCache(tmp_path, max_size=25, memory_size=0)
+
+        await cache.put(A, b'a' * 10)
+        await cache.put(B, b'b' * 10)
+        assert await cache.get(A) == b'a' * 10
+
+        # B is the least recently used
+        await cache.put(C, b'c' * 10)
+        assert await cache.get(B) is None
+        assert sorted(os.listdir(tmp_path)) == sorted([A, C])
+
+    @pytest.mark.anyio
+    async def test_persisted(self, tmp_path: Path) -> None:
+        await AssetCache(tmp_path).put(A, b'abc')
+
+        cache = AssetCache(tmp_path)
+        assert await cache.get(A) == b'abc'
+        assert cache.hits == 1
+
+    @pytest.mark.anyio
+    async def test_memory_tier(self, tmp_path: Path) -> None:
+        cache = AssetCache(tmp_path, memory_size=10)
+        await cache.put(A, b'abc')
+
+        os.remove(tmp_path / A)
+        assert await cache.get(A) == b'abc'
+
+        cache.clear_memory()
+        assert await cache.get(A) is None
+
+    @pytest.mark.anyio
+    async def test_other_files_kept(self, tmp_path: Path) -> None:
+        (tmp_path / 'notes.txt').write_bytes(b'x' * 100)
+        (tmp_path / 'video.mp4.part').write_bytes(b'x' * 100)
+        (tmp_path / (B + '.part')).write_bytes(b'x' * 100)
+
+        cache = AssetCache(tmp_path, max_size=25, memory_size=0)
+        await cache.put(A, b'a' * 10)
+        await cache.put(C, b'c' * 20)
+
+        # Only files of the cache are evicted, and its own partial files removed
+        assert sorted(os.listdir(tmp_path)) == sorted([C, 'notes.txt', 'video.mp4.part'])
+
+    @pytest.mark.anyio
+    async def test_invalid_key(self, tmp_path: Path) -> None:
+        with pytest.raises(ValueError):
+            await AssetCache(tmp_path).put('../escape', b'abc')
+
+
+class TestReadAsset:
+    @pytest.mark.anyio
+    async def test_cached(self, server: Server, tmp_path: Path) -> None:
+        cache = AssetCache(tmp_path)
+
+        async with HTTPXRequester(asset_cache=cache) as api:
+            first = await api.read_asset(server.base_url + '/icon.png', size=64)
+            second = await api.read_asset(server.base_url + '/icon.png?size=64')
+
+        assert first == second
+        assert len(server.requests) == 1
+        assert (cache.hits, cache.misses) == (1, 1)
@@ -0,0 +1,157 @@
+import socket
+import time
+from typing import List
+
+import anyio
+import pytest
+from wumpy.rest import (
+    DictRatelimiter, HTTPXRequester, Priority, RateLimited, RatelimiterContext,
+    Route, ServerException, max_wait, request_priority
+)
+from wumpy.rest._ratelimiter import _PriorityLock
+
+
+class TestRequestPriority:
+    def test_default(self) -> None:
+        assert RatelimiterContext().priority == Priority.NORMAL
+
+    def test_nested(self) -> None:
+        with request_priority(Priority.BACKGROUND):
+            assert RatelimiterContext().priority == Priority.BACKGROUND
+
+            with request_priority(Priority.INTERACTIVE):
+                assert RatelimiterContext().priority == Priority.INTERACTIVE
+
+            assert RatelimiterContext().priority == Priority.BACKGROUND
+
+        assert RatelimiterContext().priority == Priority.NORMAL
+
+    def test_snapshot(self) -> None:
+        with request_priority(Priority.INTERACTIVE):
+            ctx = RatelimiterContext()
+
+        assert ctx.priority == Priority.INTERACTIVE
+
+
+class TestPriorityLock:
+    @pytest.mark.anyio
+    async def test_order(self) -> None:
+        lock = _PriorityLock()
+        order: List[int] = []
+
+        async def waiter(priority: int) -> None:
+            await lock.acquire(priority)
+            order.append(priority)
+            lock.release()
+
+        await lock.acquire()
+
+        async with anyio.create_task_group() as tasks:
+            for priority in (0, -10, 10, 0, 5):
+                tasks.start_soon(waiter, priority)
+                await anyio.wait_all_tasks_blocked()
+
+            lock.release()
+
+        assert order == [10, 5, 0, 0, -10]
+        assert not lock.locked
+
+    @pytest.mark.anyio
+    async def test_cancelled_waiter(self) -> None:
+        lock = _PriorityLock()
+
+        await lock.acquire()
+
+        with anyio.move_on_after(0.01):
+            await lock.acquire(10)
+
+        lock.release()
+        assert not lock.locked
+
+
+class TestMaxWait:
+    route = Route('GET', '/channels/{channel_id}', channel_id=41771983423143937)
+
+    def test_nested(self) -> None:
+        assert RatelimiterContext().max_wait is None
+
+        with max_wait(2):
+            with max_wait(5):
+                assert RatelimiterContext().max_wait == 2
+
+            with max_wait(1):
+                assert RatelimiterContext().max_wait == 1
+
+    async def exhaust(self, ratelimiter: DictRatelimiter, reset_after: float) -> None:
+        async with ratelimiter(self.route, RatelimiterContext()) as update:
+            await update({
+                'X-RateLimit-Bucket': 'abc123',
+                'X-RateLimit-Limit': '1',
+                'X-RateLimit-Remaining': '0',
+                'X-RateLimit-Reset': str(time.time() + reset_after),
+            })
+
+    @pytest.mark.anyio
+    async def test_fail_fast(self) -> None:
+        async with DictRatelimiter() as ratelimiter:
+            await self.exhaust(ratelimiter, 10)
+
+            start = time.perf_counter()
+            with max_wait(1) as deadline:
+                async with ratelimiter(self.route, RatelimiterContext()):
+                    pytest.fail('Request was not aborted')
+
+            assert deadline.aborted
+            assert time.perf_counter() - start < 0.5
+
+    @pytest.mark.anyio
+    async def test_within_deadline(self) -> None:
+        async with DictRatelimiter() as ratelimiter:
+            await self.exhaust(ratelimiter, 0.05)
+
+            with max_wait(1) as deadline:
+                async with ratelimiter(self.route, RatelimiterContext()):
+                    pass
+
+            assert not deadline.aborted
+
+    @pytest.mark.anyio
+    async def test_retries_share_deadline(self) -> None:
+        retry = {'retry_after': 0.15, 'global': False}
+
+        async with DictRatelimiter() as ratelimiter:
+            with max_wait(0.25) as deadline:
+                ctx = RatelimiterContext()
+                for attempt in range(3):
+                    async with ratelimiter(self.route, ctx):
+                        raise RateLimited(429, {}, retry, attempt=attempt)
+
+            # The first retry fits within the deadline, the second does not
+            assert deadline.aborted
+            assert attempt == 1
+
+    @pytest.mark.anyio
+    async def test_backoff_respects_deadline(self) -> None:
+        async with DictRatelimiter() as ratelimiter:
+            start = time.perf_counter()
+            with pytest.raises(ServerException):
+                with max_wait(0.5):
+                    async with ratelimiter(self.route, RatelimiterContext()):
+                        raise ServerException(500, {}, None)
+
+            assert time.perf_counter() - start < 0.5
+
+    @pytest.mark.anyio
+    async def test_network_backoff_respects_deadline(self) -> None:
+        # A port which nothing listens on, so that connecting fails
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            port = sock.getsockname()[1]
+
+        async with HTTPXRequester(base_url=f'http://127.0.0.1:{port}/api/v10') as api:
+            start = time.perf_counter()
+            with max_wait(0.5) as deadline:
+                await api.request(self.route)
+
+            assert deadline.aborted
+            assert time.perf_counter() - start < 0.5
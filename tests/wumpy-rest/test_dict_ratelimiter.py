@@ -0,0 +1,152 @@
+import time
+
+import anyio
+import pytest
+from wumpy.rest import (
+    KNOWN_BUCKETS, DictRatelimiter, RatelimiterContext, Route
+)
+from wumpy.rest._ratelimiter import Ratelimit
+
+
+def messages(channel_id: int) -> Route:
+    return Route('GET', '/channels/{channel_id}/messages', channel_id=channel_id)
+
+
+def headers(remaining: int) -> dict:
+    return {
+        'X-RateLimit-Bucket': 'abc123',
+        'X-RateLimit-Limit': '5',
+        'X-RateLimit-Remaining': str(remaining),
+        'X-RateLimit-Reset': str(time.time() + 0.05),
+    }
+
+
+class TestRatelimit:
+    @pytest.mark.anyio
+    async def test_concurrently_locked(self) -> None:
+        # Multiple requests may be ratelimited at the same time, which should
+        # not lose track of tasks waiting for the first one.
+        lock = Ratelimit()
+        lock.lock(0.1)
+
+        with anyio.fail_after(1):
+            async with anyio.create_task_group() as tasks:
+                tasks.start_soon(lock.acquire)
+                await anyio.wait_all_tasks_blocked()
+
+                lock.lock(0.1)
+                lock.unlock()
+
+    @pytest.mark.anyio
+    async def test_refund(self) -> None:
+        lock = Ratelimit(limit=2, remaining=2)
+
+        await lock.acquire()
+        await lock.acquire()
+        lock.refund()
+
+        # The refunded token can be used without waiting for a reset
+        lock.acquire_nowait()
+        assert lock.remaining == 0
+
+
+class TestKnownBuckets:
+    @pytest.mark.anyio
+    async def test_first_requests_concurrent(self) -> None:
+        entered = 0
+
+        async def request(ratelimiter: DictRatelimiter, channel_id: int) -> None:
+            nonlocal entered
+
+            async with ratelimiter(messages(channel_id), RatelimiterContext()) as update:
+                entered += 1
+                await anyio.sleep(0.05)
+                await update(headers(4))
+
+        async with DictRatelimiter() as ratelimiter:
+            async with anyio.create_task_group() as tasks:
+                for _ in range(5):
+                    tasks.start_soon(request, ratelimiter, 1)
+                await anyio.sleep(0.01)
+
+                # All of them are let through before the first response
+                assert entered == 5
+
+    @pytest.mark.anyio
+    async def test_learned_round_trip(self) -> None:
+        async with DictRatelimiter(known_buckets={}) as ratelimiter:
+            async with ratelimiter(messages(1), RatelimiterContext()) as update:
+                await update(headers(4))
+
+        learned = ratelimiter.learned_buckets()
+        assert learned == {'GET /channels/{channel_id}/messages': ('abc123', 5)}
+
+        merged = DictRatelimiter(known_buckets={**KNOWN_BUCKETS, **learned})
+        assert merged.get_key(messages(2)) == 'abc123:2'
+        assert merged.get_limit(messages(2)) == 5
+
+
+class TestBucketMigration:
+    @pytest.mark.anyio
+    async def test_fallback_waiters_woken(self) -> None:
+        # Tasks waiting on the fallback lock for a route need to be woken up
+        # even if the bucket was learnt through another major parameter in
+        # the meantime, so that the response migrates to an existing lock.
+        async with DictRatelimiter(known_buckets={}) as ratelimiter:
+            with anyio.fail_after(1):
+                async with ratelimiter(messages(1), RatelimiterContext()) as update:
+                    async with anyio.create_task_group() as tasks:
+                        for _ in range(3):
+                            tasks.start_soon(self.request, ratelimiter, messages(1))
+                        await anyio.wait_all_tasks_blocked()
+
+                        # Another channel teaches the ratelimiter the bucket, so
+                        # that the next request uses a new lock. Exhausting it
+                        # means that it is kept alive by the ratelimiter.
+                        await self.request(ratelimiter, messages(2))
+                        await self.request(ratelimiter, messages(1), remaining=0)
+
+                        await update(headers(4))
+
+    async def request(
+        self,
+        ratelimiter: DictRatelimiter,
+        route: Route,
+        *,
+        remaining: int = 4
+    ) -> None:
+        async with ratelimiter(route, RatelimiterContext()) as update:
+            await update(headers(remaining))
+
+
+class TestGlobalBypass:
+    @pytest.mark.anyio
+    async def test_interaction_skips_global(self) -> None:
+        followup = Route(
+            'POST', '/webhooks/{application_id}/{interaction_token}',
+            application_id=344404945359077377, interaction_token='abc'
+        )
+
+        async with DictRatelimiter() as ratelimiter:
+            ratelimiter.lock()
+
+            with anyio.fail_after(1):
+                async with ratelimiter(followup, RatelimiterContext()):
+                    pass
+
+            with anyio.move_on_after(0.05) as scope:
+                async with ratelimiter(messages(1), RatelimiterContext()):
+                    pass
+
+            assert scope.cancel_called
+            ratelimiter.unlock()
+
+    def test_interaction_callback(self) -> None:
+        callback = Route(
+            'POST', '/interactions/{interaction_id}/{interaction_token}/callback',
+            interaction_id=1005986010231287871, interaction_token='abc'
+        )
+        ratelimiter = DictRatelimiter()
+
+        assert not ratelimiter.global_limited(callback)
+        assert ratelimiter.buckets[callback.endpoint] == 'static:interaction-callback'
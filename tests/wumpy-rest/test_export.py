@@ -0,0 +1,79 @@
+import gzip
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import pytest
+from wumpy.rest import HistoryExporter
+from wumpy.rest._utils import timestamp_snowflake
+
+CHANNEL = 100_000_000_000_000_000
+
+
+class FakeChannelAPI:
+    def __init__(self, amount: int, *, fail_after: Optional[int] = None) -> None:
+        end = timestamp_snowflake(time.time())
+        step = (end - CHANNEL) // (amount + 1)
+        self.messages = [{'id': str(CHANNEL + step * (i + 1))} for i in range(amount)]
+
+        self.calls = 0
+        self.fail_after = fail_after
+
+    async def fetch_messages(self, channel: int, *, after: int, limit: int) -> List[Dict[str, Any]]:
+        if self.fail_after is not None and self.calls >= self.fail_after:
+            raise RuntimeError('Connection lost')
+        self.calls += 1
+
+        page = [m for m in self.messages if int(m['id']) > after][:limit]
+        # Discord returns the newest messages first
+        return page[::-1]
+
+
+def read_ids(path: str, *, compress: bool = False) -> List[int]:
+    with (gzip.open if compress else open)(path, 'rb') as file:
+        return [int(json.loads(line)['id']) for line in file]
+
+
+class TestHistoryExporter:
+    @pytest.mark.anyio
+    @pytest.mark.parametrize('compress', [False, True])
+    async def test_export(self, tmp_path: Path, compress: bool) -> None:
+        api = FakeChannelAPI(450)
+        exporter = HistoryExporter(api, tmp_path, compress=compress)  # type: ignore
+
+        assert await exporter.export_channel(CHANNEL) == 450
+
+        ids = read_ids(exporter.path(CHANNEL), compress=compress)
+        assert ids == [int(m['id']) for m in api.messages]
+        assert os.listdir(tmp_path) == [os.path.basename(exporter.path(CHANNEL))]
+
+    @pytest.mark.anyio
+    async def test_resume(self, tmp_path: Path) -> None:
+        api = FakeChannelAPI(450, fail_after=3)
+        exporter = HistoryExporter(api, tmp_path, segments=2)  # type: ignore
+
+        result = await exporter.export([CHANNEL])
+        assert isinstance(result.failures[CHANNEL], RuntimeError)
+        assert not os.path.exists(exporter.path(CHANNEL))
+
+        api.fail_after = None
+        api.calls = 0
+
+        result = await exporter.export([CHANNEL])
+        assert result.messages == {CHANNEL: 450}
+        assert read_ids(exporter.path(CHANNEL)) == [int(m['id']) for m in api.messages]
+        # Pages fetched before the failure are not fetched again
+        assert api.calls < 450 // 100 + 2
+
+    @pytest.mark.anyio
+    async def test_skip_exported(self, tmp_path: Path) -> None:
+        api = FakeChannelAPI(10)
+        exporter = HistoryExporter(api, tmp_path)  # type: ignore
+
+        await exporter.export_channel(CHANNEL)
+        api.calls = 0
+
+        assert await exporter.export_channel(CHANNEL) == 0
+        assert api.calls == 0
@@ -0,0 +1,96 @@
+import io
+import json
+from pathlib import Path
+from typing import AsyncIterator
+
+import pytest
+from conftest import Server
+from wumpy.rest import File, H11Requester, HTTPXRequester, Route
+from wumpy.rest._files import _MultipartStream
+from wumpy.rest._h11 import _encode_multipart
+
+MESSAGES = Route('POST', '/channels/{channel_id}/messages', channel_id=123)
+
+
+async def collect(body: AsyncIterator[bytes]) -> bytes:
+    return b''.join([chunk async for chunk in body])
+
+
+async def generate() -> AsyncIterator[bytes]:
+    yield b'Hello, '
+    yield b'World!'
+
+
+class TestFile:
+    @pytest.mark.anyio
+    async def test_path_chunks(self, tmp_path: Path) -> None:
+        path = tmp_path / 'image.png'
+        path.write_bytes(b'a' * 10 + b'b' * 5)
+
+        file = File(path, chunk_size=4)
+        assert file.filename == 'image.png'
+        assert file.content_type == 'image/png'
+        assert file.size == 15
+
+        # Files from paths can be read multiple times
+        for _ in range(2):
+            assert [len(c) async for c in file] == [4, 4, 4, 3]
+
+    @pytest.mark.anyio
+    async def test_stream_once(self) -> None:
+        file = File(generate())
+        assert file.size is None
+        assert await collect(file.__aiter__()) == b'Hello, World!'
+
+        with pytest.raises(RuntimeError):
+            await collect(file.__aiter__())
+
+    @pytest.mark.anyio
+    async def test_multipart_length(self, tmp_path: Path) -> None:
+        path = tmp_path / 'data.bin'
+        path.write_bytes(bytes(range(256)) * 10)
+
+        body = _MultipartStream({'payload_json': b'{}'}, [('files[0]', path)])
+        assert body.length == len(await collect(body.__aiter__()))
+
+    @pytest.mark.anyio
+    async def test_file_object_rewound(self) -> None:
+        file = io.BytesIO(b'Hello, World!')
+
+        # The body is built again for each attempt at the request
+        for _ in range(2):
+            body = _MultipartStream(None, [('files[0]', file)])
+            assert b'Hello, World!' in await collect(body.__aiter__())
+
+        for _ in range(2):
+            assert b'Hello, World!' in _encode_multipart(None, [('files[0]', file)])[1]
+
+
+class TestUpload:
+    @pytest.mark.anyio
+    @pytest.mark.parametrize('requester', [HTTPXRequester, H11Requester])
+    async def test_reused_path(self, server: Server, tmp_path: Path, requester: type) -> None:
+        path = tmp_path / 'video.mp4'
+        path.write_bytes(b'\x00\x01' * 100_000)
+        file = File(path)
+
+        async with requester(base_url=server.base_url) as api:
+            for _ in range(2):
+                res = await api.request(
+                    MESSAGES, data={'payload_json': json.dumps({'content': 'Hi'})},
+                    files=[('files[0]', file)]
+                )
+                assert res['headers']['content-length'] == str(len(server.requests[-1][2]))
+
+        for _, _, body in server.requests:
+            assert b'filename="video.mp4"' in body
+            assert b'\x00\x01' * 100_000 in body
+
+    @pytest.mark.anyio
+    @pytest.mark.parametrize('requester', [HTTPXRequester, H11Requester])
+    async def test_stream(self, server: Server, requester: type) -> None:
+        async with requester(base_url=server.base_url) as api:
+            res = await api.request(MESSAGES, files=[('files[0]', File(generate(), 'a.txt'))])
+
+        assert res['headers']['transfer-encoding'] == 'chunked'
+        assert b'Hello, World!' in server.requests[0][2]
@@ -0,0 +1,50 @@
+import sys
+from typing import NoReturn
+from unittest import mock
+
+import pytest
+from wumpy.rest._ratelimiter import GlobalRatelimit
+
+
+class TestGlobalRatelimit:
+    @pytest.mark.anyio
+    async def test_fast_path(self) -> None:
+        async def sleep(duration: float) -> NoReturn:
+            raise RuntimeError("'sleep()' should not have been called")
+
+        limiter = GlobalRatelimit(3)
+
+        with mock.patch('anyio.sleep', sleep):
+            for _ in range(3):
+                await limiter.wait()
+
+    @pytest.mark.anyio
+    @pytest.mark.skipif(sys.version_info < (3, 8), reason='AsyncMock requires Python 3.8+')
+    async def test_wait(self) -> None:
+        slept = mock.AsyncMock()
+
+        limiter = GlobalRatelimit(3)
+
+        with mock.patch('anyio.sleep', slept):
+            for _ in range(3):
+                await limiter.wait()
+
+            assert slept.call_count == 0
+
+            # The mocked sleep returns immediately without a token having been
+            # refilled, so we stop after the first call.
+            slept.side_effect = RuntimeError
+            with pytest.raises(RuntimeError):
+                await limiter.wait()
+
+            assert 0 < slept.call_args[0][0] <= 1 / 3
+
+    @pytest.mark.anyio
+    async def test_estimate(self) -> None:
+        limiter = GlobalRatelimit(3)
+        assert limiter.estimate_wait() == 0
+
+        limiter.acquire_nowait()
+        limiter.acquire_nowait()
+        limiter.acquire_nowait()
+        assert 0 < limiter.estimate_wait() <= 1 / 3
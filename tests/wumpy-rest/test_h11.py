@@ -0,0 +1,15 @@
+from wumpy.rest._h11 import _encode_multipart, _encode_params
+
+
+def test_encode_params() -> None:
+    assert _encode_params({'a': True, 'b': 1, 'c': ['x', 'y']}) == 'a=true&b=1&c=x&c=y'
+
+
+def test_encode_multipart() -> None:
+    content_type, body = _encode_multipart({'payload_json': b'{}'}, [('files[0]', b'data')])
+
+    boundary = content_type.split('boundary=')[1].encode()
+    assert body.startswith(b'--' + boundary)
+    assert b'name="payload_json"\r\n\r\n{}\r\n' in body
+    assert b'name="files[0]"; filename="upload"' in body
+    assert body.endswith(b'--' + boundary + b'--\r\n')
@@ -0,0 +1,140 @@
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, List, Mapping, Optional
+
+import pytest
+from conftest import Server
+from wumpy.rest import (
+    H11Requester, HTTPXRequester, NotFound, RateLimited, RatelimiterContext,
+    RequestEvent, Route, RouteMetrics, ServerException
+)
+
+CHANNEL = 'GET /channels/{channel_id}'
+
+
+class ScriptedRatelimiter:
+    """Ratelimiter reporting the given bucket wait for each attempt.
+
+    A wait of None aborts the attempt instead, and server errors are
+    silenced so that the request is retried.
+    """
+
+    def __init__(self, waits: List[Optional[float]]) -> None:
+        self.waits = waits
+
+    async def __aenter__(self) -> 'ScriptedRatelimiter':
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        pass
+
+    @asynccontextmanager
+    async def __call__(self, route: Route, ctx: RatelimiterContext) -> AsyncIterator[Any]:
+        wait = self.waits.pop(0)
+        if wait is None:
+            raise RateLimited(429, {})
+        elif wait:
+            ctx.bucket_wait = wait
+
+        async def update(headers: Mapping[str, str]) -> None:
+            pass
+
+        try:
+            yield update
+        except ServerException:
+            pass
+
+
+class TestRequestEvent:
+    def test_bucket_ratelimited(self) -> None:
+        event = RequestEvent(Route('GET', '/gateway'), 0)
+        event.set_error(RateLimited(429, {'X-RateLimit-Scope': 'user'}, {'global': False}))
+
+        assert event.ratelimited == 'bucket'
+
+    def test_global_ratelimited(self) -> None:
+        event = RequestEvent(Route('GET', '/gateway'), 0)
+        event.set_error(RateLimited(429, {}, {'global': True}))
+
+        assert event.ratelimited == 'global'
+
+    def test_other_error(self) -> None:
+        event = RequestEvent(Route('GET', '/gateway'), 0)
+        event.set_error(NotFound(404, {}))
+
+        assert event.ratelimited is None
+        assert isinstance(event.error, NotFound)
+
+
+class TestRouteMetrics:
+    @pytest.mark.anyio
+    @pytest.mark.parametrize('requester', [HTTPXRequester, H11Requester])
+    async def test_per_route(self, server: Server, requester: type) -> None:
+        metrics = RouteMetrics()
+
+        async with requester(base_url=server.base_url, hooks=[metrics]) as api:
+            for i in range(3):
+                await api.request(Route('GET', '/channels/{channel_id}', channel_id=i))
+
+            with pytest.raises(NotFound):
+                await api.request(Route('GET', '/missing'))
+
+        assert set(metrics.routes) == {CHANNEL, 'GET /missing'}
+
+        stats = metrics.routes[CHANNEL]
+        assert stats.requests == 3
+        assert stats.errors == 0
+        assert stats.bytes_received > 0
+        assert sum(stats.latency_counts) == 3
+
+        assert metrics.routes['GET /missing'].errors == 1
+
+    @pytest.mark.anyio
+    async def test_failing_hook(self, server: Server) -> None:
+        events: List[RequestEvent] = []
+
+        def failing(event: RequestEvent) -> None:
+            raise RuntimeError
+
+        async with HTTPXRequester(
+            base_url=server.base_url, hooks=[failing, events.append]
+        ) as api:
+            await api.request(Route('POST', '/gateway'), json={'a': 1})
+
+        assert len(events) == 1
+        assert events[0].status_code == 200
+        assert events[0].bytes_sent == len(b'{"a":1}')
+
+    @pytest.mark.anyio
+    async def test_aborted_not_dispatched(self, server: Server) -> None:
+        events: List[RequestEvent] = []
+
+        async with HTTPXRequester(
+            base_url=server.base_url, ratelimiter=ScriptedRatelimiter([None]),  # type: ignore
+            hooks=[events.append]
+        ) as api:
+            with pytest.raises(RateLimited):
+                await api.request(Route('GET', '/gateway'))
+
+        assert events == []
+        assert server.requests == []
+
+    @pytest.mark.anyio
+    async def test_waits_per_attempt(self, server: Server) -> None:
+        events: List[RequestEvent] = []
+
+        async with HTTPXRequester(
+            base_url=server.base_url, ratelimiter=ScriptedRatelimiter([1.0, 0, 0]),  # type: ignore
+            hooks=[events.append]
+        ) as api:
+            with pytest.raises(ServerException):
+                await api.request(Route('GET', '/error'))
+
+        assert [event.bucket_wait for event in events] == [1.0, 0.0, 0.0]
+
+    def test_reset(self) -> None:
+        metrics = RouteMetrics()
+        metrics(RequestEvent(Route('GET', '/gateway'), 0))
+        assert metrics.routes['GET /gateway'].requests == 1
+
+        metrics.reset()
+        assert metrics.routes == {}
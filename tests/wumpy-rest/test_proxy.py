@@ -0,0 +1,166 @@
+import json
+
+import pytest
+from conftest import Server
+from wumpy.rest import (
+    HTTPXRequester, NotFound, PassthroughRatelimiter, RatelimitProxy, Route
+)
+from wumpy.rest._proxy import _parse_route
+from wumpy.rest._route import _templates
+
+INTERACTION_TOKEN = 'aW50ZXJhY3Rpb246MTIzOmFiYw'
+
+
+class TestParseRoute:
+    def test_major_params(self) -> None:
+        route = _parse_route('GET', '/channels/41771983423143937/messages')
+
+        assert route.path == '/channels/{channel_id}/messages'
+        assert route.major_params == ':41771983423143937'
+
+    def test_ids(self) -> None:
+        route = _parse_route('PUT', '/guilds/1/members/2/roles/3')
+
+        assert route.path == '/guilds/{guild_id}/members/{user_id}/roles/{role_id}'
+        assert route.url == '/guilds/1/members/2/roles/3'
+
+    def test_literal_segments(self) -> None:
+        route = _parse_route('POST', '/channels/1/messages/bulk-delete')
+
+        assert route.path == '/channels/{channel_id}/messages/bulk-delete'
+
+    def test_tokens(self) -> None:
+        route = _parse_route('POST', '/webhooks/123/abc.def')
+
+        assert route.path == '/webhooks/{webhook_id}/{webhook_token}'
+        assert route.url == '/webhooks/123/abc.def'
+
+    def test_interaction_followup(self) -> None:
+        route = _parse_route('POST', f'/webhooks/123/{INTERACTION_TOKEN}')
+
+        assert route.path == '/webhooks/{application_id}/{interaction_token}'
+        assert route.params['interaction_token'] == INTERACTION_TOKEN
+
+    def test_reactions(self) -> None:
+        first = _parse_route('PUT', '/channels/1/messages/2/reactions/%F0%9F%91%8D/@me')
+        second = _parse_route('PUT', '/channels/1/messages/2/reactions/name:123/@me')
+
+        assert first.endpoint == second.endpoint
+        assert first.url == '/channels/1/messages/2/reactions/%F0%9F%91%8D/@me'
+
+    def test_user_reaction(self) -> None:
+        route = _parse_route('DELETE', '/channels/1/messages/2/reactions/name:123/456')
+
+        assert route.path == (
+            '/channels/{channel_id}/messages/{message_id}/reactions/{emoji}/{user_id}'
+        )
+        assert route.params == {
+            'channel_id': 1, 'message_id': 2, 'emoji': 'name:123', 'user_id': 456
+        }
+
+    def test_unknown_path(self) -> None:
+        route = _parse_route('GET', '/channels/1/unknown-endpoint/2')
+
+        assert route.path == '/channels/{channel_id}/unknown-endpoint/{param4}'
+        assert route.url == '/channels/1/unknown-endpoint/2'
+        assert route.major_params == ':1'
+
+    def test_braces(self) -> None:
+        with pytest.raises(ValueError):
+            _parse_route('GET', '/foo/{')
+
+    def test_unknown_paths_bounded(self) -> None:
+        for i in range(5000):
+            _parse_route('GET', f'/unknown-{i}')
+
+        assert len(_templates) <= 1024
+
+
+class TestRatelimitProxy:
+    @pytest.mark.anyio
+    async def test_forward(self, server: Server) -> None:
+        requester = HTTPXRequester('abc', base_url=server.base_url)
+
+        async with RatelimitProxy(port=0, requester=requester) as proxy:
+            async with HTTPXRequester(
+                base_url=proxy.base_url, ratelimiter=PassthroughRatelimiter()
+            ) as api:
+                res = await api.request(
+                    Route('POST', '/channels/{channel_id}/messages', channel_id=123),
+                    json={'content': 'Hello'}, params={'wait': True}, reason='Testing'
+                )
+
+        assert res['target'] == '/api/v10/channels/123/messages?wait=true'
+        assert res['headers']['authorization'] == 'Bot abc'
+        assert res['headers']['x-audit-log-reason'] == 'Testing'
+        assert json.loads(server.requests[0][2]) == {'content': 'Hello'}
+
+    @pytest.mark.anyio
+    async def test_error(self, server: Server) -> None:
+        requester = HTTPXRequester('abc', base_url=server.base_url)
+
+        async with RatelimitProxy(port=0, requester=requester) as proxy:
+            async with HTTPXRequester(
+                base_url=proxy.base_url, ratelimiter=PassthroughRatelimiter()
+            ) as api:
+                with pytest.raises(NotFound):
+                    await api.request(Route('GET', '/missing'))
+
+    @pytest.mark.anyio
+    async def test_malformed_path(self, server: Server) -> None:
+        requester = HTTPXRequester('abc', base_url=server.base_url)
+
+        async with RatelimitProxy(port=0, requester=requester) as proxy:
+            status, _, _ = await proxy.handle('GET', '/api/v10/foo/{', {}, b'')
+
+            async with HTTPXRequester(
+                base_url=proxy.base_url, ratelimiter=PassthroughRatelimiter()
+            ) as api:
+                # The proxy keeps serving other requests
+                await api.request(Route('GET', '/gateway'))
+
+        assert status == 400
+        assert server.requests == [('GET', '/api/v10/gateway', b'')]
+
+    @pytest.mark.anyio
+    @pytest.mark.parametrize('path,status,content_type', [
+        ('/created', 201, 'application/json'),
+        ('/text', 200, 'text/plain'),
+    ])
+    async def test_forward_response(
+        self, server: Server, path: str, status: int, content_type: str
+    ) -> None:
+        requester = HTTPXRequester('abc', base_url=server.base_url)
+
+        async with RatelimitProxy(port=0, requester=requester) as proxy:
+            async with HTTPXRequester(
+                base_url=proxy.base_url, ratelimiter=PassthroughRatelimiter()
+            ) as api:
+                res = await api.request(Route('POST', path), raw=True)
+
+        assert res.status_code == status
+        assert res.headers['Content-Type'] == content_type
+        assert json.loads(res.content)['target'] == '/api/v10' + path
+
+    @pytest.mark.anyio
+    @pytest.mark.parametrize('route', [
+        Route(
+            'DELETE', '/channels/{channel_id}/messages/{message_id}/reactions/{emoji}/{user_id}',
+            channel_id=1, message_id=2, emoji='\N{THUMBS UP SIGN}', user_id=3
+        ),
+        Route(
+            'POST', '/webhooks/{application_id}/{interaction_token}',
+            application_id=1, interaction_token=INTERACTION_TOKEN
+        ),
+    ])
+    async def test_forward_route(self, server: Server, route: Route) -> None:
+        requester = HTTPXRequester('abc', base_url=server.base_url)
+
+        async with RatelimitProxy(port=0, requester=requester) as proxy:
+            async with HTTPXRequester(
+                base_url=proxy.base_url, ratelimiter=PassthroughRatelimiter()
+            ) as api:
+                res = await api.request(route)
+
+        assert res['method'] == route.method
+        assert res['target'] == '/api/v10' + route.url
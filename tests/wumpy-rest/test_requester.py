@@ -0,0 +1,107 @@
+import json
+from urllib.parse import parse_qs
+
+import anyio
+import pytest
+from conftest import Server
+from wumpy.rest import MISSING, H11Requester, HTTPXRequester, NotFound, Route
+
+
+async def wait_for_requests(server: Server, count: int) -> None:
+    with anyio.fail_after(5):
+        while len(server.requests) < count:
+            await anyio.sleep(0.01)
+
+
+REQUESTERS = [HTTPXRequester, H11Requester]
+
+
+@pytest.mark.parametrize('requester', REQUESTERS)
+class TestRequester:
+    @pytest.mark.anyio
+    async def test_request(self, server: Server, requester: type) -> None:
+        async with requester('abc', base_url=server.base_url) as api:
+            res = await api.request(
+                Route('GET', '/channels/{channel_id}', channel_id=123),
+                params={'limit': 50, 'after': MISSING},
+                reason='Testing'
+            )
+
+        assert res['target'] == '/api/v10/channels/123?limit=50'
+        assert res['headers']['authorization'] == 'Bot abc'
+        assert res['headers']['x-audit-log-reason'] == 'Testing'
+
+    @pytest.mark.anyio
+    async def test_json_body(self, server: Server, requester: type) -> None:
+        async with requester(base_url=server.base_url) as api:
+            res = await api.request(
+                Route('POST', '/channels/{channel_id}/messages', channel_id=123),
+                json={'content': 'Hello'}
+            )
+
+        assert res['headers']['content-type'] == 'application/json'
+        assert json.loads(server.requests[0][2]) == {'content': 'Hello'}
+
+    @pytest.mark.anyio
+    async def test_persistent_connection(self, server: Server, requester: type) -> None:
+        async with requester(base_url=server.base_url) as api:
+            for _ in range(5):
+                await api.request(Route('GET', '/gateway'))
+
+        assert len(server.requests) == 5
+        assert server.connections == 1
+
+    @pytest.mark.anyio
+    async def test_raw(self, server: Server, requester: type) -> None:
+        async with requester(base_url=server.base_url) as api:
+            res = await api.request(Route('GET', '/gateway'), raw=True)
+
+        assert res.status_code == 200
+        assert res.headers['Content-Type'] == 'application/json'
+        assert json.loads(res.content)['target'] == '/api/v10/gateway'
+
+    @pytest.mark.anyio
+    async def test_not_found(self, server: Server, requester: type) -> None:
+        async with requester(base_url=server.base_url) as api:
+            with pytest.raises(NotFound) as exc:
+                await api.request(Route('GET', '/missing'))
+
+        # Headers are looked up case-insensitively
+        assert exc.value.headers['X-RateLimit-Bucket'] == 'abc123'
+
+
+class TestHTTPXRequester:
+    @pytest.mark.anyio
+    async def test_form_bytes(self, server: Server) -> None:
+        async with HTTPXRequester(base_url=server.base_url) as api:
+            await api.request(Route('POST', '/form'), data={'payload_json': b'{"a":1}'})
+
+        assert parse_qs(server.requests[0][2].decode()) == {'payload_json': ['{"a":1}']}
+
+
+class TestWarmup:
+    @pytest.mark.anyio
+    async def test_warmup_on_enter(self, server: Server) -> None:
+        async with HTTPXRequester(base_url=server.base_url, warmup_connections=2):
+            await wait_for_requests(server, 2)
+
+        assert server.requests == [('HEAD', '/api/v10/gateway', b'')] * 2
+        assert server.connections == 2
+
+    @pytest.mark.anyio
+    async def test_keep_warm(self, server: Server) -> None:
+        async with HTTPXRequester(
+            base_url=server.base_url, warmup_connections=1, keep_warm=0.05
+        ):
+            # The initial warm-up and at least one round of keeping it warm
+            await wait_for_requests(server, 2)
+
+        made = len(server.requests)
+        await anyio.sleep(0.2)
+
+        # Keeping the connections warm stops with the requester
+        assert len(server.requests) == made
+
+    def test_keep_warm_requires_warmup(self) -> None:
+        with pytest.raises(ValueError):
+            HTTPXRequester(keep_warm=30)
@@ -0,0 +1,72 @@
+import time
+
+from wumpy.rest import Route
+from wumpy.rest._utils import DISCORD_EPOCH
+
+
+def snowflake_ago(seconds: float) -> int:
+    return int((time.time() - seconds) * 1000 - DISCORD_EPOCH) << 22
+
+
+def delete_message(message: int) -> Route:
+    return Route(
+        'DELETE', '/channels/{channel_id}/messages/{message_id}',
+        channel_id=41771983423143937, message_id=message
+    )
+
+
+class TestMajorParams:
+    def test_priority(self) -> None:
+        route = Route(
+            'GET', '/guilds/{guild_id}/channels/{channel_id}',
+            guild_id=197038439483310086, channel_id=41771983423143937
+        )
+        assert route.major_params == ':41771983423143937'
+
+    def test_interaction_token(self) -> None:
+        route = Route(
+            'POST', '/webhooks/{application_id}/{interaction_token}',
+            application_id=344404945359077377, interaction_token='abc'
+        )
+        other = Route(
+            'POST', '/webhooks/{application_id}/{interaction_token}',
+            application_id=344404945359077377, interaction_token='def'
+        )
+
+        # Tokens are secrets and should not be part of the key
+        assert 'abc' not in route.key
+        assert route.major_params
+        assert route.major_params != other.major_params
+
+    def test_no_params(self) -> None:
+        assert Route('GET', '/users/@me').major_params == ''
+
+    def test_new_message_delete(self) -> None:
+        assert delete_message(snowflake_ago(60)).major_params == ':41771983423143937'
+
+    def test_old_message_delete(self) -> None:
+        old = delete_message(snowflake_ago(15 * 24 * 60 * 60))
+        assert old.major_params == ':41771983423143937:old'
+
+    def test_old_message_fetch(self) -> None:
+        route = Route(
+            'GET', '/channels/{channel_id}/messages/{message_id}',
+            channel_id=41771983423143937, message_id=snowflake_ago(15 * 24 * 60 * 60)
+        )
+        assert route.major_params == ':41771983423143937'
+
+
+class TestRouteTemplate:
+    def test_interned(self) -> None:
+        first = Route('GET', '/channels/{channel_id}', channel_id=1)
+        second = Route('GET', '/channels/{channel_id}', channel_id=2)
+        assert first.endpoint is second.endpoint
+        assert first.key == 'GET /channels/{channel_id}:1'
+
+    def test_url(self) -> None:
+        route = Route(
+            'POST', '/webhooks/{application_id}/{interaction_token}',
+            application_id=344404945359077377, interaction_token='a/b c'
+        )
+        assert route.url == '/webhooks/344404945359077377/a/b%20c'
+        assert Route('GET', '/users/@me').url == '/users/@me'
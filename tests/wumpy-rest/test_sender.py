@@ -0,0 +1,129 @@
+import json
+from typing import Any, Dict, List
+from urllib.parse import parse_qs
+
+import anyio
+import pytest
+from conftest import Server
+from wumpy.rest import MISSING, APIClient, NotFound, WebhookSender
+
+
+class RecordingWebhooks:
+    def __init__(self) -> None:
+        self.executed: List[Dict[str, Any]] = []
+
+    async def execute_webhook(self, webhook: int, token: str, **kwargs: Any) -> None:
+        if webhook == 0:
+            raise NotFound(404, {})
+
+        self.executed.append({'webhook': webhook, **kwargs})
+
+
+class SlowWebhooks(RecordingWebhooks):
+    def __init__(self) -> None:
+        super().__init__()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def execute_webhook(self, webhook: int, token: str, **kwargs: Any) -> None:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await anyio.sleep(0.05)
+            await super().execute_webhook(webhook, token, **kwargs)
+        finally:
+            self.in_flight -= 1
+
+
+class TestWebhookSender:
+    @pytest.mark.anyio
+    async def test_merged(self) -> None:
+        api = RecordingWebhooks()
+
+        async with WebhookSender(api, interval=60) as sender:  # type: ignore
+            for i in range(30):
+                sender.send(1, 'token', content=f'Line {i}')
+            sender.send(2, 'token', embeds=[{'title': 'Alert'}])
+
+        assert len(api.executed) == 2
+        executed = {e['webhook']: e for e in api.executed}
+        assert executed[1]['content'] == '\n'.join(f'Line {i}' for i in range(30))
+        assert executed[1]['embeds'] is MISSING
+        assert executed[2]['content'] is MISSING
+        assert sender.sent == 2
+        assert sender.merged == 29
+
+    @pytest.mark.anyio
+    async def test_limits(self) -> None:
+        api = RecordingWebhooks()
+
+        async with WebhookSender(api, interval=60) as sender:  # type: ignore
+            for _ in range(3):
+                sender.send(1, 'token', content='a' * 999)
+            for _ in range(12):
+                sender.send(2, 'token', embeds=[{'title': 'Alert'}])
+
+        contents = [len(e['content']) for e in api.executed if e['webhook'] == 1]
+        embeds = [len(e['embeds']) for e in api.executed if e['webhook'] == 2]
+        assert contents == [1999, 999]
+        assert embeds == [10, 2]
+
+    @pytest.mark.anyio
+    async def test_flushed_when_full(self) -> None:
+        api = RecordingWebhooks()
+
+        async with WebhookSender(api, interval=60) as sender:  # type: ignore
+            for _ in range(10):
+                sender.send(1, 'token', embeds=[{'title': 'Alert'}])
+
+            with anyio.fail_after(1):
+                while not api.executed:
+                    await anyio.sleep(0.01)
+
+        assert len(api.executed) == 1
+
+    @pytest.mark.anyio
+    async def test_concurrent_flush(self) -> None:
+        api = SlowWebhooks()
+
+        async with WebhookSender(api, interval=60) as sender:  # type: ignore
+            for i in range(6):
+                sender.send(1, 'token', content=f'{i}' * 999)
+
+            # Wait for the background flush to start sending
+            with anyio.fail_after(1):
+                while not api.in_flight:
+                    await anyio.sleep(0.01)
+
+            await sender.flush()
+
+        assert api.max_in_flight == 1
+        assert [e['content'][0] for e in api.executed] == ['0', '2', '4']
+
+    @pytest.mark.anyio
+    async def test_payload(self, server: Server) -> None:
+        async with APIClient(base_url=server.base_url) as api:
+            async with WebhookSender(api, interval=60) as sender:
+                sender.send(1, 'token', content='Hello')
+                sender.send(1, 'token', content='World')
+
+        [(method, target, body)] = server.requests
+        assert (method, target) == ('POST', '/api/v10/webhooks/1/token?wait=false')
+        payload = json.loads(parse_qs(body.decode())['payload_json'][0])
+        assert payload == {'content': 'Hello\nWorld'}
+
+    @pytest.mark.anyio
+    async def test_dropped_and_failed(self) -> None:
+        api = RecordingWebhooks()
+
+        async with WebhookSender(api, interval=60, max_queued=5) as sender:  # type: ignore
+            for i in range(8):
+                sender.send(0, 'token', content=f'Line {i}')
+
+        assert sender.dropped == 3
+        assert sender.failed == 5
+        assert sender.queued == 0
+
+    def test_not_entered(self) -> None:
+        with pytest.raises(RuntimeError):
+            WebhookSender(RecordingWebhooks()).send(1, 'token', content='Hello')  # type: ignore
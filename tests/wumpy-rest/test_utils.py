@@ -0,0 +1,14 @@
+from wumpy.rest._utils import dump_json, load_json, snowflake_timestamp
+
+
+def test_json_bytes() -> None:
+    payload = {'content': 'Hello, wörld!', 'embeds': [{'title': None}]}
+
+    dumped = dump_json(payload)
+    assert isinstance(dumped, bytes)
+    assert load_json(dumped) == payload
+
+
+def test_snowflake_timestamp() -> None:
+    # Example snowflake from the Discord documentation
+    assert snowflake_timestamp(175928847299117063) == 1462015105.796